@@ -0,0 +1 @@
+# Offline benchmarks for the portal's data and render paths; run as `python -m benchmarks.<name>`.
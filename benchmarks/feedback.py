@@ -0,0 +1,59 @@
+# Feedback log under a burst of concurrent submissions.
+#
+#   python -m benchmarks.feedback [--sessions 50] [--events 2000]
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from core.feedback import DOWN, UP, FeedbackLog
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Burst-write the feedback log from many threads")
+    parser.add_argument("--sessions", type=int, default=50, help="concurrent writer threads")
+    parser.add_argument("--events", type=int, default=2000, help="events per session")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log = FeedbackLog(os.path.join(tmp, "feedback.sqlite3"))
+        latencies = []
+        lock = threading.Lock()
+
+        def session(n):
+            own = []
+            for i in range(args.events):
+                start = time.perf_counter()
+                log.record(i, "customer_draft", random.choice([UP, UP, DOWN]), "",
+                           draft_hash=f"{n}-{i}", model="sonar", prompt_version=random.choice(["v1", "v2"]))
+                own.append(time.perf_counter() - start)
+            with lock:
+                latencies.extend(own)
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=session, args=(n,)) for n in range(args.sessions)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        queued = time.perf_counter() - start
+        log.flush()
+        durable = time.perf_counter() - start
+
+        latencies.sort()
+        total = len(latencies)
+        print(f"{total} events from {args.sessions} sessions")
+        print(f"  record() p50 {latencies[total // 2] * 1e6:.1f} µs, p99 {latencies[int(total * 0.99)] * 1e6:.1f} µs")
+        print(f"  all queued after {queued:.2f}s, on disk after {durable:.2f}s ({total / durable:,.0f} events/s)")
+
+        start = time.perf_counter()
+        rates = log.approval_rates()
+        print(f"  approval_rates over {len(log)} rows in {(time.perf_counter() - start) * 1000:.1f} ms")
+        for row in rates:
+            print(f"    {row['prompt_version']}: {row['votes']} votes, {row['approval_rate']:.0%} approval")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# Bulk ingestion throughput per file format and store backend.
+#
+# Writes N synthetic incidents as CSV, JSONL and Parquet to a scratch directory
+# and streams each file into a fresh store, reporting rows/s and peak RSS.
+#
+#   python -m benchmarks.ingest [--rows 1000000] [--chunk-rows 100000]
+import argparse
+import os
+import tempfile
+import time
+
+from core.ingest import CHUNK_ROWS, ingest
+from core.store import open_store
+from core.synthetic import generate_incidents
+from core.tracing import memory_peak_rss
+
+WRITERS = {
+    "csv": lambda df, path: df.to_csv(path, index=False),
+    "jsonl": lambda df, path: df.to_json(path, orient="records", lines=True, date_format="iso"),
+    "parquet": lambda df, path: df.to_parquet(path, index=False),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk incident ingestion")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="ingest-bench-")
+    df = generate_incidents(args.rows)
+    files = {}
+    for format, write in WRITERS.items():
+        files[format] = os.path.join(scratch, f"incidents.{format}")
+        write(df, files[format])
+        print(f"{format:<8} {os.path.getsize(files[format]) / 2**20:8.1f} MiB")
+    del df
+
+    print(f"{'backend':<8} {'format':<8} {'rows':>10} {'seconds':>8} {'rows/s':>10}")
+    for backend in ["sqlite", "memory"]:
+        for format, path in files.items():
+            store = open_store(backend, os.path.join(scratch, f"{format}.sqlite3"))
+            start = time.perf_counter()
+            report = ingest(store, path, chunk_rows=args.chunk_rows)
+            elapsed = time.perf_counter() - start
+            print(f"{backend:<8} {format:<8} {report.loaded:>10,} {elapsed:>8.2f} {report.loaded / elapsed:>10,.0f}")
+            del store
+        peak = memory_peak_rss()
+        if peak is not None:
+            print(f"  peak RSS after {backend} loads: {peak / 2**20:,.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# LLM client behaviour against the local stub: connection reuse, retries and async fan-out.
+#
+#   python -m benchmarks.llm_client [--requests 50] [--latency 0.05]
+import argparse
+import asyncio
+import time
+
+from benchmarks.stub_llm import start_stub_server
+from core.llm import LLMClient, LLMError
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<40} {time.perf_counter() - start:>8.3f}s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exercise the LLM client against a local stub server")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    server = start_stub_server(latency=args.latency)
+    client = LLMClient("stub-key", url=server.url, backoff_base=0.01)
+    try:
+        timed(f"{args.requests} sequential calls", lambda: [client.complete("ping") for _ in range(args.requests)])
+
+        async def fan_out():
+            return await asyncio.gather(*(client.acomplete("ping") for _ in range(args.requests)))
+        timed(f"{args.requests} concurrent async calls", lambda: asyncio.run(fan_out()))
+
+        # Two 503s then success: the client should absorb them
+        server.fail_first, server.requests = 2, 0
+        timed("call surviving 2 upstream 503s", lambda: client.complete("ping"))
+        print(f"{'requests seen by stub':<40} {server.requests:>8}")
+
+        # Non-retryable status surfaces immediately
+        server.fail_first, server.fail_status, server.requests = 1, 400, 0
+        try:
+            client.complete("ping")
+        except LLMError as e:
+            print(f"{'400 raised without retry':<40} {e.status_code:>8} after {server.requests} request(s)")
+    finally:
+        client.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# Bytes per incident for the original string-typed rows vs the compact schema.
+#
+#   python -m benchmarks.memory [--sizes 100000 1000000]
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from core.schema import (
+    CREATE_TIME_FORMAT,
+    INCIDENT_ID_PREFIX,
+    INCIDENT_TYPES,
+    OWNERS,
+    SERVICES,
+    SEVERITIES,
+    STATES,
+    to_incident_frame,
+)
+
+
+def legacy_frame(num_incidents, seed=0):
+    # Same shape generate_mock_incidents used to return: every column is a Python string
+    rng = np.random.default_rng(seed)
+    base_time = pd.Timestamp.now().floor("min")
+    create_times = base_time - pd.to_timedelta(rng.integers(1, 73, num_incidents), unit="h")
+    return pd.DataFrame({
+        "Type": rng.choice(INCIDENT_TYPES, num_incidents).astype(object),
+        "Incident ID": [f"{INCIDENT_ID_PREFIX}{i}" for i in rng.integers(1000, 10_000_000, num_incidents)],
+        "Severity": rng.choice(SEVERITIES, num_incidents).astype(object),
+        "State": rng.choice(STATES, num_incidents).astype(object),
+        "Title": ["Service degradation in " + s for s in rng.choice(SERVICES, num_incidents)],
+        "Create Time": create_times.strftime(CREATE_TIME_FORMAT).astype(object),
+        "Owning Service": rng.choice(SERVICES, num_incidents).astype(object),
+        "Owner": rng.choice(OWNERS, num_incidents).astype(object),
+    })
+
+
+def bytes_per_incident(df):
+    return df.memory_usage(deep=True, index=False).sum() / len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes per incident before and after the compact schema")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'before B/row':>14} {'after B/row':>13} {'ratio':>7}")
+    for size in args.sizes:
+        before = legacy_frame(size)
+        after = to_incident_frame(before)
+        b, a = bytes_per_incident(before), bytes_per_incident(after)
+        print(f"{size:>10,} {b:>14.1f} {a:>13.1f} {b / a:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+# Render and data-path benchmarks for the portal at growing incident counts.
+#
+# Pages run headless through Streamlit's AppTest against a store preloaded
+# with N synthetic incidents; the data paths (filter + paginate, full-text
+# search, escalation flagging) are timed directly against the same store, and
+# draft generation against the local stub LLM. Import cost is measured twice:
+# cold, in a fresh interpreter per run (imports plus the first page run, as
+# after a container restart), and per rerun, by re-executing each page's
+# import statements the way Streamlit does on every rerun. Results are written as JSON; pass the
+# previous run as --baseline to flag regressions.
+#
+#   python -m benchmarks.portal [--sizes 10 1000 100000 1000000] [--baseline old.json]
+import argparse
+import ast
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+import core.data
+from benchmarks.stub_llm import start_stub_server
+from core.drafts import DraftCache, generate_draft
+from core.escalation import add_escalation_scores, is_escalation_prone, top_escalations
+from core.llm import LLMClient
+from core.store import open_store
+from core.synthetic import DEFAULT_NOW, generate_incidents
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HOME = os.path.join(ROOT, "home.py")
+DETAIL = os.path.join(ROOT, "pages", "1_Incident_Detail.py")
+METRICS = os.path.join(ROOT, "pages", "2_Metrics.py")
+DEFAULT_SIZES = [10, 1_000, 100_000, 1_000_000]
+DEFAULT_OUTPUT = os.path.join(".cache", "benchmarks", "portal.json")
+REGRESSION_RATIO = 1.25
+DETAIL_TABS = ["Summary and Discussion", "Customer Communication", "RCA and Postmortems"]
+PAGES = {"home": HOME, "detail": DETAIL, "metrics": METRICS}
+HEAVY_MODULES = ["numpy", "pandas", "requests", "pyarrow"]
+# Run in a fresh interpreter: seconds to import streamlit, to run the page's
+# import statements, and to finish the page's first run
+COLD_START = """
+import json, sys, time
+start = time.perf_counter()
+import streamlit
+from streamlit.testing.v1 import AppTest
+streamlit_loaded = time.perf_counter()
+exec(compile(sys.argv[2], sys.argv[1], "exec"), {"__name__": "page_imports"})
+imports_done = time.perf_counter()
+loaded = [name for name in sys.argv[3:] if name in sys.modules]
+app = AppTest.from_file(sys.argv[1], default_timeout=600)
+app.secrets["PERPLEXITY_API_KEY"] = "stub-key"
+app.run()
+print(json.dumps({
+    "streamlit": streamlit_loaded - start,
+    "page_imports": imports_done - streamlit_loaded,
+    "first_run": time.perf_counter() - imports_done,
+    "loaded": loaded,
+}))
+"""
+FILTERS = [
+    {},
+    {"Severity": ["Critical"]},
+    {"Severity": ["Critical", "High"], "State": ["Open", "In Progress"]},
+    {"Owning Service": ["Payment Service"], "Type": ["External"]},
+]
+SEARCHES = [
+    ("payment", {}),
+    ("lat* pay", {}),
+    ("dns", {"Severity": ["Critical"]}),
+    ("memory leak", {"Severity": ["Critical"], "State": ["Open"]}),
+]
+
+
+def timed(func, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+class Results:
+    def __init__(self):
+        self.rows = []
+
+    def add(self, name, size, samples):
+        ms = sorted(s * 1000 for s in samples)
+        row = {
+            "name": name,
+            "size": size,
+            "runs": len(ms),
+            "median_ms": round(statistics.median(ms), 3),
+            "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 3),
+            "max_ms": round(ms[-1], 3),
+        }
+        self.rows.append(row)
+        print(f"{name:<36} {size:>9,} {row['median_ms']:>11.2f} {row['p95_ms']:>11.2f}  ({row['runs']} runs)")
+        return row
+
+
+def use_store(store):
+    # Point the pages' cached store at the benchmark store and drop every cached result
+    core.data.open_store_from_env = lambda: store
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+
+def import_statements(path):
+    # Source of a script's top-level import statements
+    with open(path) as f:
+        source = f.read()
+    tree = ast.parse(source)
+    return "\n".join(ast.get_source_segment(source, node) for node in tree.body
+                     if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def bench_imports(results, runs):
+    # {page: heavy modules already loaded once the page's imports ran}
+    loaded = {}
+    for page, path in PAGES.items():
+        imports = import_statements(path)
+        cold = []
+        for _ in range(runs):
+            out = subprocess.run([sys.executable, "-c", COLD_START, path, imports, *HEAVY_MODULES], cwd=ROOT,
+                                 capture_output=True, text=True, check=True).stdout
+            cold.append(json.loads(out.splitlines()[-1]))
+        for stage in ["streamlit", "page_imports", "first_run"]:
+            results.add(f"cold_start.{page}.{stage}", 0, [sample[stage] for sample in cold])
+        loaded[page] = cold[-1]["loaded"]
+
+        code = compile(imports, path, "exec")
+        results.add(f"imports.{page}.rerun", 0, timed(lambda: exec(code, {"__name__": "page_imports"}), runs * 20))
+    for page, modules in loaded.items():
+        print(f"  {page} imports load: {', '.join(modules) or 'no heavy modules'}")
+    return loaded
+
+
+def bench_pages(results, size, store, runs):
+    home = AppTest.from_file(HOME, default_timeout=600)
+    results.add("home.first_run", size, timed(home.run, 1))
+    results.add("home.rerun", size, timed(home.run, runs))
+    if home.exception:
+        print(f"  home.py raised: {home.exception[0].value}")
+
+    incident = store.query({}, 0, 1).iloc[0]
+    detail = AppTest.from_file(DETAIL, default_timeout=600)
+    detail.secrets["PERPLEXITY_API_KEY"] = "stub-key"
+    detail.query_params["incident"] = f"INC-{incident['Incident ID']}"
+    results.add("detail.first_run", size, timed(detail.run, 1))
+    for tab in DETAIL_TABS:
+        def run_tab():
+            # AppTest does not keep the selected tab between runs, so select it every time
+            detail.session_state["detail_tab"] = tab
+            detail.run()
+        name = "detail.tab." + tab.split()[0].lower()
+        results.add(name + ".first_run", size, timed(run_tab, 1))
+        results.add(name + ".rerun", size, timed(run_tab, runs))
+        if detail.exception:
+            print(f"  {tab} raised: {detail.exception[0].value}")
+
+    metrics = AppTest.from_file(METRICS, default_timeout=600)
+    results.add("metrics.first_run", size, timed(metrics.run, 1))
+    results.add("metrics.rerun", size, timed(metrics.run, runs))
+    if metrics.exception:
+        print(f"  2_Metrics.py raised: {metrics.exception[0].value}")
+
+
+def bench_filter_paginate(results, name, size, store, runs):
+    def filter_and_paginate():
+        for filters in FILTERS:
+            store.count(filters)
+            after = None
+            for _ in range(5):
+                page, after = store.query_page(filters, after=after, limit=50)
+                if after is None:
+                    break
+    results.add(name, size, timed(filter_and_paginate, runs))
+
+
+def bench_data_paths(results, size, store, runs):
+    bench_filter_paginate(results, "store.filter_paginate", size, store, runs)
+
+    store.search("")  # builds the search index
+    for query, filters in SEARCHES:
+        name = "store.search." + query.split()[0].strip("*")
+        results.add(name, size, timed(lambda: store.search(query, filters), runs))
+
+    page, _ = store.query_page({}, limit=50)
+    results.add("escalation.flag_page", size, timed(lambda: is_escalation_prone(page), runs))
+    everything = store.query()
+    results.add("escalation.score_all", size, timed(lambda: add_escalation_scores(everything), max(1, runs // 5)))
+    scored = add_escalation_scores(everything)
+    results.add("escalation.top_10", size, timed(lambda: top_escalations(scored, 10), runs))
+
+
+def bench_drafts(results, runs, latency, now):
+    server = start_stub_server(latency=latency)
+    client = LLMClient("stub-key", url=server.url)
+    cache = DraftCache(":memory:")
+    incident = generate_incidents(1, now=now).iloc[0].to_dict()
+    try:
+        results.add("draft.generate_stub", 1, timed(lambda: generate_draft(client, incident, cache, regenerate=True), runs))
+        results.add("draft.cache_hit", 1, timed(lambda: generate_draft(client, incident, cache), runs))
+    finally:
+        client.close()
+        server.shutdown()
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(rows, baseline_path):
+    # Rows that got slower than the baseline by more than REGRESSION_RATIO
+    with open(baseline_path) as f:
+        baseline = {(row["name"], row["size"]): row for row in json.load(f)["results"]}
+    regressions = []
+    for row in rows:
+        before = baseline.get((row["name"], row["size"]))
+        if before and before["median_ms"] > 0 and row["median_ms"] / before["median_ms"] > REGRESSION_RATIO:
+            regressions.append((row, before))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark portal pages and data paths")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--backend", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("--runs", type=int, default=5, help="timed repetitions per measurement")
+    parser.add_argument("--latency", type=float, default=0.05, help="stub LLM latency in seconds")
+    parser.add_argument("--now", type=datetime.fromisoformat, default=DEFAULT_NOW,
+                        help="end of the synthetic incidents' arrival window, so runs load the same incidents")
+    parser.add_argument("--skip-pages", action="store_true", help="only time the data paths and drafts")
+    parser.add_argument("--cold-runs", type=int, default=3, help="fresh interpreters started per page for cold-start timing")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", help="previous output file to compare against")
+    args = parser.parse_args()
+
+    # Keep the pages' draft, summary and feedback files out of the working tree
+    scratch = tempfile.mkdtemp(prefix="portal-bench-")
+    for variable, name in [("DRAFT_CACHE_PATH", "drafts.sqlite3"), ("SUMMARY_CACHE_PATH", "summaries.sqlite3"),
+                           ("FEEDBACK_LOG_PATH", "feedback.sqlite3")]:
+        os.environ.setdefault(variable, os.path.join(scratch, name))
+
+    results = Results()
+    print(f"{'benchmark':<36} {'incidents':>9} {'median ms':>11} {'p95 ms':>11}")
+    loaded = bench_imports(results, args.cold_runs)
+    for size in args.sizes:
+        start = time.perf_counter()
+        store = open_store(args.backend)
+        incidents = generate_incidents(size, now=args.now)
+        store.add_incidents(incidents)
+        print(f"-- {size:,} incidents loaded in {time.perf_counter() - start:.1f}s")
+        bench_data_paths(results, size, store, args.runs)
+        if args.backend != "sqlite":
+            # Paging is also timed on an on-disk SQLite store, the backend a large deployment uses
+            sqlite_store = open_store("sqlite", os.path.join(scratch, f"incidents-{size}.sqlite3"))
+            sqlite_store.bulk_load([incidents])
+            bench_filter_paginate(results, "store.sqlite.filter_paginate", size, sqlite_store, args.runs)
+        if not args.skip_pages:
+            use_store(store)
+            bench_pages(results, size, store, args.runs)
+    bench_drafts(results, args.runs, args.latency, args.now)
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "streamlit": st.__version__,
+        "backend": args.backend,
+        "now": args.now.isoformat(),
+        "modules_loaded_by_imports": loaded,
+        "results": results.rows,
+    }
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {args.output}")
+
+    if args.baseline:
+        regressions = compare(results.rows, args.baseline)
+        for row, before in regressions:
+            print(f"REGRESSION {row['name']} @ {row['size']:,}: "
+                  f"{before['median_ms']:.2f} -> {row['median_ms']:.2f} ms")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+# Publish fan-out throughput against the stub channel adapters.
+#
+#   python -m benchmarks.publish [--subscribers 2000] [--latency 0.02] [--failure-rate 0.01]
+import argparse
+import time
+
+from core.publish import CHANNELS, DeliveryLog, PublishEngine, stub_adapters, stub_directory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fan a message out to thousands of stub subscribers")
+    parser.add_argument("--subscribers", type=int, default=2000, help="subscribers per Slack/Email/SMS channel")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per adapter call")
+    parser.add_argument("--failure-rate", type=float, default=0.01, help="share of recipients that fail")
+    parser.add_argument("--unthrottled", action="store_true", help="lift the per-channel rate limits")
+    args = parser.parse_args()
+
+    adapters = stub_adapters(latency=args.latency, failure_rate=args.failure_rate)
+    if args.unthrottled:
+        for adapter in adapters.values():
+            adapter.rate, adapter.burst = float("inf"), 1
+    directory = stub_directory({ch: args.subscribers for ch in CHANNELS if ch != "Status Page"})
+    engine = PublishEngine(adapters, directory, DeliveryLog(":memory:"))
+
+    start = time.time()
+    report = engine.publish("Benchmark message", CHANNELS, incident_id=1)
+    total = len(report.records)
+    print(f"{total} recipients in {report.elapsed:.2f}s ({total / report.elapsed:,.0f} recipients/s)")
+    for channel, counts in report.summary().items():
+        adapter = adapters[channel]
+        calls = -(-len(directory.recipients(channel)) // adapter.batch_size)
+        finished = max(r.sent_at for r in report.records if r.channel == channel) - start
+        print(f"  {channel:<12} {calls:>6} calls  {counts['delivered']:>6} delivered  "
+              f"{counts['failed']:>5} failed  done after {finished:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
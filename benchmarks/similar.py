@@ -0,0 +1,75 @@
+# Similar-incident index at scale: build time, incremental adds and top-k latency.
+#
+#   python -m benchmarks.similar [--documents 100000] [--queries 200]
+import argparse
+import random
+import time
+
+import numpy as np
+
+from core.mock_data import TIMELINE_EVENTS
+from core.schema import SERVICES
+from core.similar import SimilarityIndex, incident_document
+
+FAILURES = ["timeouts", "5xx errors", "latency spike", "memory leak", "certificate expiry", "DNS failure",
+            "connection pool exhaustion", "bad deploy", "disk full", "queue backlog", "cache stampede"]
+COMPONENTS = ["database", "load balancer", "payment gateway", "redis", "kafka", "kubernetes node",
+              "CDN", "object storage", "SMTP relay", "token signer"]
+
+
+def synthetic_incident(rng, incident_id):
+    service = rng.choice(SERVICES)
+    incident = {"Incident ID": incident_id, "Owning Service": service,
+                "Title": f"{rng.choice(FAILURES).capitalize()} in {rng.choice(COMPONENTS)} for {service}"}
+    summary = {
+        "what_we_know": [rng.choice(TIMELINE_EVENTS["finding"]).format(service=service, n=rng.randint(2, 9))
+                         for _ in range(3)],
+        "what_has_been_done": [rng.choice(TIMELINE_EVENTS["action"]).format(service=service, n=rng.randint(2, 9))
+                               for _ in range(2)],
+    }
+    return incident, summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the similar-incident index")
+    parser.add_argument("--documents", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    corpus = [synthetic_incident(rng, i) for i in range(args.documents + args.queries)]
+    index = SimilarityIndex()
+
+    start = time.perf_counter()
+    for incident, summary in corpus[:args.documents]:
+        index.add(incident["Incident ID"], *incident_document(incident, summary))
+    build = time.perf_counter() - start
+    print(f"built {len(index):,} documents in {build:.2f}s ({len(index) / build:,.0f} docs/s)")
+
+    latencies = []
+    for incident, summary in corpus[args.documents:]:
+        text, _ = incident_document(incident, summary)
+        start = time.perf_counter()
+        index.search(text, args.k)
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies) * 1000
+    print(f"top-{args.k} search: p50 {np.percentile(latencies, 50):.2f} ms, "
+          f"p99 {np.percentile(latencies, 99):.2f} ms")
+
+    # Closing an incident: add one document, then the next search rebuilds only the touched postings
+    adds, searches = [], []
+    for incident, summary in corpus[args.documents:]:
+        start = time.perf_counter()
+        index.add(incident["Incident ID"], *incident_document(incident, summary))
+        adds.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        index.search(incident["Title"], args.k)
+        searches.append(time.perf_counter() - start)
+    print(f"incremental add: p50 {np.median(adds) * 1e6:.0f} µs; "
+          f"search right after an add: p50 {np.median(searches) * 1000:.2f} ms, "
+          f"p99 {np.percentile(searches, 99) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
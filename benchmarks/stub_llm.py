@@ -0,0 +1,142 @@
+# Local stand-in for the Perplexity chat-completions endpoint.
+#
+# Simulates upstream latency and failures so the LLM client, draft caching
+# and batch jobs can be exercised offline. Run it standalone and point the
+# app at it with PERPLEXITY_URL:
+#
+#   python -m benchmarks.stub_llm --port 8765 --latency 0.3 --failure-rate 0.2
+#   PERPLEXITY_URL=http://127.0.0.1:8765/chat/completions streamlit run home.py
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, failure_rate=0.0, fail_first=0, fail_status=503, reply=None, token_delay=0.0,
+                 retry_after="0"):
+        super().__init__(address, StubLLMHandler)
+        self.latency = latency
+        self.token_delay = token_delay
+        self.failure_rate = failure_rate
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.retry_after = retry_after
+        self.reply = reply
+        self.requests = 0
+        self.connections = 0
+        self.prompt_chars = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/chat/completions"
+
+    def process_request(self, request, client_address):
+        # Counts accepted TCP connections, so tests can check that clients reuse them
+        with self._lock:
+            self.connections += 1
+        super().process_request(request, client_address)
+
+    def next_failure(self):
+        # Status code to fail this request with, or None to succeed
+        with self._lock:
+            self.requests += 1
+            count = self.requests
+        if count <= self.fail_first or random.random() < self.failure_rate:
+            return self.fail_status
+        return None
+
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, model, content):
+        # Server-sent events over chunked transfer, one word per event, like the
+        # streaming chat-completions mode
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for word in content.split(" "):
+            chunk = {"model": model, "choices": [{"index": 0, "delta": {"content": word + " "}}]}
+            self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+            time.sleep(self.server.token_delay)
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        time.sleep(self.server.latency)
+
+        status = self.server.next_failure()
+        if status is not None:
+            headers = {"Retry-After": self.server.retry_after} if status == 429 else None
+            self._send_json(status, {"error": "simulated upstream failure"}, headers)
+            return
+
+        prompt = body.get("messages", [{}])[-1].get("content", "")
+        with self.server._lock:
+            self.server.prompt_chars += len(prompt)
+        content = self.server.reply or f"Stub reply ({len(prompt)} prompt chars)."
+        if body.get("stream"):
+            self._send_stream(body.get("model"), content)
+            return
+        self._send_json(200, {
+            "model": body.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}],
+        })
+
+
+def start_stub_server(**options):
+    # Serve on a free local port from a daemon thread; call .shutdown() when done
+    server = StubLLMServer(("127.0.0.1", 0), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Perplexity chat-completions API")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of requests that fail")
+    parser.add_argument("--fail-status", type=int, default=503)
+    parser.add_argument("--token-delay", type=float, default=0.0, help="seconds between streamed tokens")
+    args = parser.parse_args()
+
+    server = StubLLMServer(
+        ("127.0.0.1", args.port),
+        latency=args.latency,
+        failure_rate=args.failure_rate,
+        fail_status=args.fail_status,
+        token_delay=args.token_delay,
+    )
+    print(f"Stub LLM listening on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# Summarization cost as an incident's timeline grows: full map-reduce versus
+# folding only the new events into the stored summary.
+#
+#   python -m benchmarks.summary [--new-events 20] [--latency 0.05]
+import argparse
+import json
+import time
+from datetime import datetime
+
+from benchmarks.stub_llm import start_stub_server
+from core.llm import LLMClient
+from core.mock_data import TIMELINE_INTERVAL, generate_mock_timeline
+from core.summary import SummaryStore, summarize_events, summarize_incident
+
+SIZES = [100, 500, 1000, 2000, 4000]
+REPLY = json.dumps({
+    "what_we_know": ["Error rate elevated"],
+    "what_has_been_done": ["Rolled back deploy"],
+    "customer_communication": ["Status page updated"],
+})
+
+
+def measure(server, func):
+    server.requests, server.prompt_chars = 0, 0
+    start = time.perf_counter()
+    func()
+    return server.requests, server.prompt_chars, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full versus incremental incident summarization")
+    parser.add_argument("--new-events", type=int, default=20, help="events added before each update")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per stub model call")
+    args = parser.parse_args()
+
+    server = start_stub_server(latency=args.latency, reply=REPLY)
+    client = LLMClient("stub-key", url=server.url)
+    created = datetime(2024, 1, 1)
+    incident = {"Incident ID": 4242, "Title": "Checkout errors", "Severity": "High",
+                "Owning Service": "Payment Service", "Create Time": created}
+    try:
+        print(f"{'events':>6}  {'full: calls':>11} {'chars':>9} {'time':>7}   "
+              f"{'+' + str(args.new_events) + ' events: calls':>18} {'chars':>7} {'time':>7}")
+        for size in SIZES:
+            now = created + TIMELINE_INTERVAL * (size + args.new_events + 1)
+            events = generate_mock_timeline(incident, now)
+            history, grown = events[:size], events[:size + args.new_events]
+
+            full = measure(server, lambda: summarize_events(client, incident, history))
+            store = SummaryStore(":memory:")
+            summarize_incident(client, incident, history, store)
+            update = measure(server, lambda: summarize_incident(client, incident, grown, store))
+            print(f"{size:>6}  {full[0]:>11} {full[1]:>9,} {full[2]:>6.2f}s   "
+                  f"{update[0]:>18} {update[1]:>7,} {update[2]:>6.2f}s")
+    finally:
+        client.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Shared building blocks for the Abnormal Incidents Portal pages.
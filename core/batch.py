@@ -0,0 +1,138 @@
+# Batch pre-generation of customer drafts and postmortem skeletons.
+#
+# Finds every escalation-prone incident (Critical/High and Open/In Progress,
+# the same set flagged 🚩 on the home page) and fills the draft cache for it,
+# so the detail page opens with a ready draft. Work runs on a bounded thread
+# pool and API calls go through a shared rate limiter; artifacts already in
+# the cache are skipped without touching the API.
+#
+#   PERPLEXITY_API_KEY=... python -m core.batch --path .cache/incidents.sqlite3 --workers 4 --rate 2
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from core.drafts import (
+    CUSTOMER_DRAFT,
+    DRAFT_CACHE_PATH,
+    POSTMORTEM_SKELETON,
+    DraftCache,
+    generate_draft,
+    lookup_draft,
+)
+from core.escalation import ESCALATION_SEVERITIES, ESCALATION_STATES
+from core.llm import PERPLEXITY_URL, LLMClient
+from core.ratelimit import RateLimiter
+
+BATCH_ARTIFACTS = [CUSTOMER_DRAFT, POSTMORTEM_SKELETON]
+DEFAULT_WORKERS = 4
+DEFAULT_RATE = 2.0  # API calls per second across all workers
+
+
+def escalation_prone_incidents(store):
+    # Pushed down into the store's Severity/State indexes
+    return store.query({"Severity": ESCALATION_SEVERITIES, "State": ESCALATION_STATES})
+
+
+def pregenerate_drafts(store, client, cache, workers=DEFAULT_WORKERS, rate=DEFAULT_RATE,
+                       regenerate=False, progress=None):
+    incidents = escalation_prone_incidents(store).to_dict("records")
+    jobs = [(incident, artifact) for incident in incidents for artifact in BATCH_ARTIFACTS]
+    limiter = RateLimiter(rate, burst=workers)
+    result = {"total": len(jobs), "generated": 0, "cached": 0, "failed": 0, "errors": []}
+
+    def run(incident, artifact):
+        if not regenerate and lookup_draft(incident, cache, client.model, artifact) is not None:
+            return "cached"
+        limiter.acquire()
+        generate_draft(client, incident, cache, regenerate=True, artifact=artifact)
+        return "generated"
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run, incident, artifact): (incident, artifact) for incident, artifact in jobs}
+        for future in as_completed(futures):
+            try:
+                result[future.result()] += 1
+            except Exception as e:
+                incident, artifact = futures[future]
+                result["failed"] += 1
+                result["errors"].append((incident["Incident ID"], artifact, str(e)))
+            if progress is not None:
+                progress(result)
+    return result
+
+
+class BatchJob:
+    """Runs pregenerate_drafts on a background thread; one run at a time."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self.status = None
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, store, client, cache, **options):
+        with self._lock:
+            if self.running:
+                return False
+            self.status = None
+            self.started_at, self.finished_at = time.time(), None
+            self._thread = threading.Thread(
+                target=self._run, args=(store, client, cache), kwargs=options, daemon=True
+            )
+            self._thread.start()
+            return True
+
+    def _run(self, store, client, cache, **options):
+        def progress(result):
+            self.status = dict(result)
+        try:
+            self.status = pregenerate_drafts(store, client, cache, progress=progress, **options)
+        except Exception as e:
+            self.status = {**(self.status or {}), "error": str(e)}
+        finally:
+            self.finished_at = time.time()
+
+
+def main():
+    from core.ingest import DEFAULT_STORE_PATH
+    from core.store import SQLiteIncidentStore
+
+    parser = argparse.ArgumentParser(description="Pre-generate drafts for escalation-prone incidents")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="API calls per second")
+    parser.add_argument("--regenerate", action="store_true", help="ignore drafts already in the cache")
+    parser.add_argument("--url", default=os.environ.get("PERPLEXITY_URL", PERPLEXITY_URL))
+    parser.add_argument("--cache-path", default=os.environ.get("DRAFT_CACHE_PATH", DRAFT_CACHE_PATH))
+    parser.add_argument("--path", default=os.environ.get("INCIDENT_STORE_PATH", DEFAULT_STORE_PATH),
+                        help="SQLite incident store the portal reads")
+    args = parser.parse_args()
+
+    # Drafts are only worth paying for when the portal will show the same incidents,
+    # so the job reads the persistent store and never falls back to mock data
+    if not os.path.exists(args.path):
+        parser.error(f"no incident store at {args.path}; load one with core.ingest or core.synthetic first")
+    store = SQLiteIncidentStore(args.path)
+    if store.count() == 0:
+        parser.error(f"the incident store at {args.path} is empty")
+    client = LLMClient(os.environ["PERPLEXITY_API_KEY"], url=args.url, pool_size=args.workers)
+    cache = DraftCache(args.cache_path)
+
+    start = time.perf_counter()
+    result = pregenerate_drafts(store, client, cache, workers=args.workers, rate=args.rate,
+                                regenerate=args.regenerate)
+    elapsed = time.perf_counter() - start
+    print(f"{result['total']} artifacts: {result['generated']} generated, {result['cached']} cached, "
+          f"{result['failed']} failed in {elapsed:.1f}s")
+    for incident_id, artifact, error in result["errors"]:
+        print(f"  {incident_id} {artifact}: {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# BM25 scoring shared by the similar-incident and full-text search indexes.
+#
+# Both indexes keep postings of (document, term frequency) per term and score
+# a query by summing idf * normalised term frequency over its terms. The
+# normalised term frequencies only depend on the average document length, so
+# TermWeights caches them per term and recomputes them once that average has
+# drifted, instead of on every query.
+import re
+
+from core.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+AVERAGE_DRIFT = 0.05  # recompute cached term weights once the average length moves this much
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower())
+
+
+def idf(live, df):
+    # Postings keep replaced documents, so df can exceed the live document count
+    return np.log1p((max(live - df, 0) + 0.5) / (df + 0.5))
+
+
+def term_weights(tfs, lengths, average):
+    # Length-normalised term frequencies of one term's postings
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / average)
+    return tfs * (BM25_K1 + 1) / (tfs + norm)
+
+
+class TermWeights:
+    """Per-term ``(docs, weights)`` arrays, cached until the average document length drifts."""
+
+    def __init__(self):
+        self._arrays = {}
+        self._average = None
+
+    def discard(self, term):
+        # Call when a term gains postings
+        self._arrays.pop(term, None)
+
+    def get(self, term, average, lengths, postings):
+        # postings() returns the term's (docs, term frequencies) arrays; only called on a miss
+        if self._average is None or abs(average - self._average) > AVERAGE_DRIFT * self._average:
+            self._arrays.clear()
+            self._average = average
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            docs, tfs = postings()
+            arrays = self._arrays[term] = (docs, term_weights(tfs, lengths[docs], self._average))
+        return arrays
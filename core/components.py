@@ -0,0 +1,196 @@
+# Reusable page widgets with typed, namespaced session state.
+#
+# Each widget keeps one small dataclass in st.session_state under its
+# namespace and incident (e.g. "draft_feedback.1234") instead of a loose set
+# of keys per copy, and namespaces its widget keys the same way, so two copies
+# can share a page and a vote or publish on one incident never carries over to
+# another. The state is reset once a vote is submitted or a message published.
+# The admin performance panel lives here too, as it is shared by both pages.
+import os
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+import streamlit as st
+
+from core.feedback import DOWN, UP
+from core.publish import CHANNELS
+from core.tracing import TRACER, memory_peak_rss, memory_rss
+
+DEFAULT_CHANNELS = ("Status Page", "Slack")
+FAILURES_SHOWN = 20  # failed recipients listed per channel in the publish report
+VOTE_LABELS = {UP: "👍 Looks good", DOWN: "👎 Needs improvement"}
+
+
+@dataclass(slots=True)
+class FeedbackState:
+    vote: str = None
+    pending: str = None
+    confirmed: bool = False
+    comment: str = ""
+
+
+@dataclass(slots=True)
+class PublishState:
+    channels: tuple = DEFAULT_CHANNELS
+    confirming: bool = False
+    report: dict = field(default_factory=dict)
+    failures: dict = field(default_factory=dict)
+
+
+def get_state(namespace, state_type):
+    state = st.session_state.get(namespace)
+    if not isinstance(state, state_type):
+        state = st.session_state[namespace] = state_type()
+    return state
+
+
+@lru_cache(maxsize=32)
+def channel_labels(subscriber_counts):
+    # subscriber_counts is a tuple of (channel, count) pairs so the table can be memoized
+    counts = dict(subscriber_counts)
+    return {ch: f"{ch} ({counts[ch]} subs)" if ch in counts else ch for ch in CHANNELS}
+
+
+def feedback_widget(namespace, incident_id, on_submit, suffix="", submit_label="📨 Submit Feedback",
+                    placeholder="Let us know how we can improve this message..."):
+    # 👍/👎 → confirm → optional comment → submit; on_submit(vote, comment) persists it
+    namespace = f"{namespace}.{incident_id}"
+    state = get_state(namespace, FeedbackState)
+    suffix = f" {suffix}" if suffix else ""
+
+    if not state.confirmed:
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button(VOTE_LABELS[UP] + suffix, key=f"{namespace}.up"):
+                state.pending = UP
+        with col2:
+            if st.button(VOTE_LABELS[DOWN] + suffix, key=f"{namespace}.down"):
+                state.pending = DOWN
+
+    if state.pending and not state.confirmed:
+        st.warning(f"Confirm your feedback: **{VOTE_LABELS[state.pending]}**")
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("✅ Yes, confirm" + suffix, key=f"{namespace}.confirm"):
+                state.vote, state.confirmed, state.pending = state.pending, True, None
+        with col2:
+            if st.button("❌ Cancel" + suffix, key=f"{namespace}.cancel"):
+                state.pending = None
+
+    if state.confirmed:
+        state.comment = st.text_area(
+            "Optional comment:",
+            value=state.comment,
+            placeholder=placeholder,
+            height=100,
+            key=f"{namespace}.comment",
+        )
+
+        if st.button(submit_label, key=f"{namespace}.submit"):
+            on_submit(state.vote, state.comment)
+            st.success(f"Thanks for your feedback! You voted: {VOTE_LABELS[state.vote]}")
+            if state.comment.strip():
+                st.info(f"Comment: _{state.comment.strip()}_")
+            # One row per vote: the next click starts a new one
+            st.session_state[namespace] = FeedbackState()
+
+
+def publish_widget(namespace, publisher, message, incident_id, label, button_label, confirm_text,
+                   what, suffix=""):
+    # Channel picker, confirmation step and per-channel delivery report
+    namespace = f"{namespace}.{incident_id}"
+    state = get_state(namespace, PublishState)
+    suffix = f" {suffix}" if suffix else ""
+    counts = tuple((ch, n) for ch, n in publisher.directory.counts().items() if ch != "Status Page")
+    labels = channel_labels(counts)
+
+    state.channels = tuple(st.multiselect(
+        label,
+        options=CHANNELS,
+        default=list(state.channels),
+        format_func=labels.get,
+        key=f"{namespace}.channels",
+    ))
+
+    if st.button(button_label, key=f"{namespace}.publish"):
+        state.confirming = True
+
+    if state.confirming:
+        with st.expander("🔒 Confirm Your Action", expanded=True):
+            st.markdown(confirm_text)
+            for ch in state.channels:
+                st.markdown(f"- ✅ **{labels[ch]}**")
+
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("✅ Yes, publish now" + suffix, key=f"{namespace}.confirm"):
+                    with st.spinner("Publishing..."):
+                        report = publisher.publish(message, state.channels, incident_id)
+                    # Back to the channel picker; the report of the last publish stays shown
+                    state.confirming = False
+                    state.report = report.summary()
+                    state.failures = report.failures()
+            with col2:
+                if st.button("❌ Cancel" + suffix, key=f"{namespace}.cancel"):
+                    state.confirming = False
+                    st.info("Publish canceled.")
+
+    if state.report:
+        show_publish_report(state.report, what, state.failures)
+
+
+def show_publish_report(summary, what, failures=None):
+    # Per-channel delivery counts from the publish engine, and who did not get the message
+    failures = failures or {}
+    delivered = [ch for ch, counts in summary.items() if not counts["failed"]]
+    if delivered:
+        st.success(f"✅ {what} successfully sent to: {', '.join(delivered)}")
+    for ch, counts in summary.items():
+        if counts["failed"]:
+            st.warning(f"⚠️ {ch}: {counts['delivered']} delivered, {counts['failed']} failed")
+            failed = failures.get(ch, [])
+            if failed:
+                lines = [f"- {recipient}: {error}" for recipient, error in failed[:FAILURES_SHOWN]]
+                if len(failed) > FAILURES_SHOWN:
+                    lines.append(f"- … and {len(failed) - FAILURES_SHOWN} more in the delivery log")
+                st.markdown("\n".join(lines))
+
+
+def format_mib(size):
+    # Memory figures are None on platforms that do not report them
+    return "n/a" if size is None else f"{size / 2**20:,.0f} MiB"
+
+
+def is_admin():
+    # PORTAL_ADMINS is a comma-separated list of signed-in user emails, or "*" for everyone
+    admins = {email.strip() for email in os.environ.get("PORTAL_ADMINS", "").split(",") if email.strip()}
+    return "*" in admins or st.user.get("email") in admins
+
+
+def show_performance_panel():
+    # Per-stage latency histograms and process memory, for admins only
+    if not is_admin():
+        return
+    with st.sidebar.expander("⏱️ Performance"):
+        st.caption(f"Memory: {format_mib(memory_rss())} RSS, peak {format_mib(memory_peak_rss())}")
+        stats = TRACER.stats()
+        if stats:
+            st.dataframe(
+                stats,
+                hide_index=True,
+                column_config={
+                    column: st.column_config.NumberColumn(column.replace("_ms", " (ms)"), format="%.1f")
+                    for column in ["mean_ms", "p50_ms", "p95_ms", "max_ms"]
+                },
+            )
+        else:
+            st.caption("No traced stages yet.")
+        counters = TRACER.counters()
+        if counters:
+            st.caption(" · ".join(f"{event}: {count:,}" for event, count in counters.items()))
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("Prometheus", TRACER.prometheus_text(), file_name="metrics.txt", mime="text/plain")
+        with col2:
+            if st.button("Reset", key="performance.reset"):
+                TRACER.reset()
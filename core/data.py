@@ -0,0 +1,192 @@
+# Cached data loading layer shared by the portal pages.
+#
+# The store is a process-wide resource; filtered counts and pages are cached
+# per filter combination with a TTL and an LRU bound, and the whole cache is
+# dropped whenever the store reports a write (for example a state change).
+import os
+from datetime import datetime
+
+import streamlit as st
+
+from core.batch import BatchJob
+from core.drafts import DRAFT_CACHE_PATH, POSTMORTEM_SKELETON, DraftCache
+from core.escalation import add_escalation_scores, top_escalations
+from core.feedback import FEEDBACK_LOG_PATH, FeedbackLog
+from core.llm import PERPLEXITY_URL, LLMClient
+from core.ingest import ingest
+from core.mock_data import generate_mock_incidents
+from core.publish import (
+    DELIVERY_LOG_PATH,
+    STUB_SUBSCRIBERS,
+    DeliveryLog,
+    PublishEngine,
+    stub_adapters,
+    stub_directory,
+)
+from core.schema import RESOLVED_STATES
+from core.search import notes_text
+from core.similar import SimilarIncidents
+from core.store import open_store_from_env
+from core.summary import SUMMARY_CACHE_PATH, SummaryStore
+from core.tracing import start_metrics_server
+
+INCIDENT_CACHE_TTL = 60  # seconds
+INCIDENT_CACHE_MAX_ENTRIES = 256
+
+
+# The leading underscore keeps the store out of the cache key
+@st.cache_data(ttl=INCIDENT_CACHE_TTL, max_entries=INCIDENT_CACHE_MAX_ENTRIES, show_spinner=False)
+def load_incident_page(_store, filters, after, limit):
+    return _store.query_page(filters, after=after, limit=limit)
+
+
+@st.cache_data(ttl=INCIDENT_CACHE_TTL, max_entries=INCIDENT_CACHE_MAX_ENTRIES, show_spinner=False)
+def load_incident_count(_store, filters):
+    return _store.count(filters)
+
+
+# Scored once per TTL for the whole table and shared by reference, not copied per hit
+@st.cache_resource(ttl=INCIDENT_CACHE_TTL, show_spinner=False)
+def load_scored_incidents(_store):
+    return add_escalation_scores(_store.query())
+
+
+@st.cache_data(ttl=INCIDENT_CACHE_TTL, max_entries=INCIDENT_CACHE_MAX_ENTRIES, show_spinner=False)
+def load_top_escalations(_store, filters, n, min_score):
+    scored = load_scored_incidents(_store)
+    for column, values in filters.items():
+        if values:
+            scored = scored[scored[column].isin(values)]
+    return top_escalations(scored, n=n, min_score=min_score)
+
+
+@st.cache_data(ttl=INCIDENT_CACHE_TTL, max_entries=INCIDENT_CACHE_MAX_ENTRIES, show_spinner=False)
+def load_search_results(_store, query, filters, limit):
+    return _store.search(query, filters, limit)
+
+
+# Rollups are hours x categories in size, so the metrics page reads them whole
+@st.cache_data(ttl=INCIDENT_CACHE_TTL, show_spinner=False)
+def load_rollups(_store):
+    return _store.created_rollup(), _store.resolved_rollup()
+
+
+def invalidate_incident_cache(incident_ids=None):
+    load_incident_page.clear()
+    load_incident_count.clear()
+    load_scored_incidents.clear()
+    load_top_escalations.clear()
+    load_rollups.clear()
+    load_search_results.clear()
+
+
+# One store per server process, shared by every session and rerun (see open_store_from_env).
+# An empty store is filled from INCIDENT_SOURCE (comma-separated export files, see
+# core/ingest.py) when set, and with mock incidents otherwise.
+@st.cache_resource
+def get_incident_store():
+    store = open_store_from_env()
+    store.subscribe(invalidate_incident_cache)
+    if store.count() == 0:
+        source = os.environ.get("INCIDENT_SOURCE")
+        if source:
+            ingest(store, [path.strip() for path in source.split(",") if path.strip()])
+        else:
+            store.add_incidents(generate_mock_incidents())
+    index_search_notes(store, get_summary_store(), get_draft_cache())
+    return store
+
+
+def index_search_notes(store, summaries, drafts):
+    # Summaries and postmortem skeletons are searched along with the Title: the
+    # stored ones are handed to the store's search index once, later ones as
+    # they are written
+    summary_of = summaries.summaries()
+    postmortem_of = drafts.latest_all(POSTMORTEM_SKELETON)
+
+    def update(incident_id):
+        incident_id = int(incident_id)
+        store.set_search_notes({incident_id: notes_text(summary_of.get(incident_id), postmortem_of.get(incident_id))})
+        load_search_results.clear()
+
+    def on_summary(incident_id, summary):
+        summary_of[int(incident_id)] = summary
+        update(incident_id)
+
+    def on_draft(incident_id, artifact, content):
+        if artifact == POSTMORTEM_SKELETON:
+            postmortem_of[int(incident_id)] = content
+            update(incident_id)
+
+    store.set_search_notes({
+        incident_id: notes_text(summary_of.get(incident_id), postmortem_of.get(incident_id))
+        for incident_id in summary_of.keys() | postmortem_of.keys()
+    })
+    summaries.subscribe(on_summary)
+    drafts.subscribe(on_draft)
+
+
+def update_incident_state(incident_id, state):
+    # Goes through the store so the invalidation hook fires for every session.
+    # Resolving stamps Resolved Time (kept when moving between Resolved and
+    # Closed); reopening clears it.
+    store = get_incident_store()
+    changes = {"State": state}
+    if state not in RESOLVED_STATES:
+        changes["Resolved Time"] = None
+    elif store.get(incident_id)["State"] not in RESOLVED_STATES:
+        changes["Resolved Time"] = datetime.now().replace(second=0, microsecond=0)
+    store.update_incident(incident_id, changes)
+
+
+# One pooled client per API key, shared by every session.
+# PERPLEXITY_URL can point the pages at a local stand-in server (see benchmarks/stub_llm.py).
+@st.cache_resource
+def get_llm_client(api_key):
+    return LLMClient(api_key, url=os.environ.get("PERPLEXITY_URL", PERPLEXITY_URL))
+
+
+# DRAFT_CACHE_PATH overrides where generated drafts are persisted
+@st.cache_resource
+def get_draft_cache():
+    return DraftCache(os.environ.get("DRAFT_CACHE_PATH", DRAFT_CACHE_PATH))
+
+
+@st.cache_resource
+def get_batch_job():
+    return BatchJob()
+
+
+# Channel integrations are local stubs until real Slack/Email/SMS credentials are wired in.
+# DELIVERY_LOG_PATH overrides where per-recipient delivery status is kept
+@st.cache_resource
+def get_publish_engine():
+    log = DeliveryLog(os.environ.get("DELIVERY_LOG_PATH", DELIVERY_LOG_PATH))
+    return PublishEngine(stub_adapters(), stub_directory(STUB_SUBSCRIBERS), log)
+
+
+# One writer thread per process; FEEDBACK_LOG_PATH overrides where feedback is kept
+@st.cache_resource
+def get_feedback_log():
+    return FeedbackLog(os.environ.get("FEEDBACK_LOG_PATH", FEEDBACK_LOG_PATH))
+
+
+# SUMMARY_CACHE_PATH overrides where incident summaries are kept
+@st.cache_resource
+def get_summary_store():
+    return SummaryStore(os.environ.get("SUMMARY_CACHE_PATH", SUMMARY_CACHE_PATH))
+
+
+# Built from the store on a background thread when first requested (the home
+# page asks at startup), then kept current through its change feed
+@st.cache_resource
+def get_similar_incidents():
+    return SimilarIncidents(get_incident_store(), get_summary_store(), get_draft_cache()).start()
+
+
+# Prometheus scrape endpoint (http://METRICS_HOST:METRICS_PORT/metrics), one per process; off when
+# METRICS_PORT is unset. METRICS_HOST defaults to 127.0.0.1
+@st.cache_resource
+def get_metrics_server():
+    port = os.environ.get("METRICS_PORT")
+    return start_metrics_server(int(port), os.environ.get("METRICS_HOST", "127.0.0.1")) if port else None
@@ -0,0 +1,220 @@
+# Customer draft and postmortem skeleton generation with a content-addressed,
+# on-disk cache.
+#
+# Drafts are keyed by a hash of the exact prompt and model parameters, so an
+# unchanged incident never costs a second API call, while any change to the
+# fields that feed the prompt naturally produces a new key. Entries live in
+# SQLite (WAL) with least-recently-used eviction, fronted by a small
+# in-process LRU so hot drafts come back without touching the disk. Hits on
+# that LRU still count as uses: their keys are collected and their
+# last_used_at written in one UPDATE per batch, and always before evicting.
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from core.llm import DEFAULT_MODEL
+from core.schema import format_create_time, format_incident_id
+from core.store import LRUCache
+
+DRAFT_CACHE_PATH = os.path.join(".cache", "drafts.sqlite3")
+DRAFT_CACHE_MAX_ENTRIES = 5000
+DRAFT_MEMORY_ENTRIES = 256
+TOUCH_BATCH = 64  # in-memory hits collected before their last_used_at is written
+TOUCH_INTERVAL = 30.0  # seconds a collected hit waits at most
+
+CUSTOMER_DRAFT = "customer_draft"
+POSTMORTEM_SKELETON = "postmortem_skeleton"
+DRAFT_PARAMS = {
+    CUSTOMER_DRAFT: {"temperature": 0.5, "max_tokens": 300},
+    POSTMORTEM_SKELETON: {"temperature": 0.3, "max_tokens": 600},
+}
+# Bump when a prompt template below changes, so feedback can be compared across versions
+PROMPT_VERSIONS = {
+    CUSTOMER_DRAFT: "v1",
+    POSTMORTEM_SKELETON: "v1",
+}
+
+
+def build_draft_prompt(incident_data):
+    return f"""You are a professional customer communications specialist.
+Draft a clear, concise incident message for customers based on the following info:
+
+- Title: {incident_data.get("Title")}
+- Severity: {incident_data.get("Severity")}
+- Service: {incident_data.get("Owning Service")}
+- State: {incident_data.get("State")}
+- Time Created: {format_create_time(incident_data.get("Create Time"))}
+- Owner: {incident_data.get("Owner")}
+
+Keep it under 300 words. Inform users of the impact and steps being taken. Include a reassurance message and status link.
+"""
+
+
+def build_postmortem_prompt(incident_data):
+    return f"""You are a site reliability engineer preparing an internal postmortem.
+Draft a postmortem skeleton for the following incident:
+
+- Incident: {format_incident_id(incident_data.get("Incident ID"))}
+- Title: {incident_data.get("Title")}
+- Severity: {incident_data.get("Severity")}
+- Service: {incident_data.get("Owning Service")}
+- State: {incident_data.get("State")}
+- Time Created: {format_create_time(incident_data.get("Create Time"))}
+- Owner: {incident_data.get("Owner")}
+
+Use these sections: Date/Time of Incident, Root Cause, Detection Timeline, Mitigation, Impact Analysis, Lessons Learned, Next Steps. Mark anything not known yet as [TBD].
+"""
+
+
+PROMPT_BUILDERS = {
+    CUSTOMER_DRAFT: build_draft_prompt,
+    POSTMORTEM_SKELETON: build_postmortem_prompt,
+}
+
+
+def draft_key(prompt, model, **params):
+    payload = json.dumps({"prompt": prompt, "model": model, **params}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class DraftCache:
+    def __init__(self, path=DRAFT_CACHE_PATH, max_entries=DRAFT_CACHE_MAX_ENTRIES):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.max_entries = max_entries
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._hot = LRUCache(DRAFT_MEMORY_ENTRIES)
+        self._touched = {}  # key -> time of its latest in-memory hit, not yet written
+        self._touched_since = time.time()
+        self._listeners = []
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS drafts ("
+                "key TEXT PRIMARY KEY, incident_id INTEGER, artifact TEXT, "
+                "content TEXT, created_at REAL, last_used_at REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_drafts_last_used ON drafts (last_used_at)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_drafts_incident ON drafts (incident_id, artifact)")
+
+    def get(self, key):
+        content = self._hot.get(key)
+        if content is not None:
+            self._touched[key] = time.time()
+            if len(self._touched) >= TOUCH_BATCH or time.time() - self._touched_since > TOUCH_INTERVAL:
+                with self._lock, self._conn:
+                    self._write_touches()
+            return content
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT content FROM drafts WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE drafts SET last_used_at = ? WHERE key = ?", (time.time(), key))
+        self._hot.put(key, row[0])
+        return row[0]
+
+    def put(self, key, content, incident_id=None, artifact=CUSTOMER_DRAFT):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO drafts VALUES (?, ?, ?, ?, ?, ?)",
+                (key, None if incident_id is None else int(incident_id), artifact, content, now, now),
+            )
+            self._write_touches()
+            self._evict()
+        self._hot.put(key, content)
+        if incident_id is not None:
+            for callback in self._listeners:
+                callback(incident_id, artifact, content)
+
+    def subscribe(self, callback):
+        # callback(incident_id, artifact, content) after every put for an incident
+        self._listeners.append(callback)
+
+    def latest(self, incident_id, artifact=CUSTOMER_DRAFT):
+        # Most recent draft stored for an incident, whatever prompt produced it
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content FROM drafts WHERE incident_id = ? AND artifact = ? "
+                "ORDER BY created_at DESC LIMIT 1",
+                (int(incident_id), artifact),
+            ).fetchone()
+        return row[0] if row else None
+
+    def latest_all(self, artifact=CUSTOMER_DRAFT):
+        # {incident_id: most recent content} for every incident with a stored artifact
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT incident_id, content FROM drafts WHERE incident_id IS NOT NULL AND artifact = ? "
+                "ORDER BY created_at",
+                (artifact,),
+            ).fetchall()
+        return dict(rows)
+
+    def _write_touches(self):
+        # Call with the lock held, inside a transaction
+        touched, self._touched = self._touched, {}
+        self._touched_since = time.time()
+        if touched:
+            self._conn.executemany(
+                "UPDATE drafts SET last_used_at = ? WHERE key = ?", [(at, key) for key, at in touched.items()]
+            )
+
+    def _evict(self):
+        # Drop the least recently used rows beyond the size bound
+        self._conn.execute(
+            "DELETE FROM drafts WHERE key IN ("
+            "SELECT key FROM drafts ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM drafts").fetchone()[0]
+
+
+def _prompt_and_key(incident_data, model, artifact):
+    prompt = PROMPT_BUILDERS[artifact](incident_data)
+    return prompt, draft_key(prompt, model, **DRAFT_PARAMS[artifact])
+
+
+def lookup_draft(incident_data, cache, model=DEFAULT_MODEL, artifact=CUSTOMER_DRAFT):
+    # Cache-only read, never calls the API; None if nothing was generated yet
+    return cache.get(_prompt_and_key(incident_data, model, artifact)[1])
+
+
+def generate_draft(client, incident_data, cache, regenerate=False, artifact=CUSTOMER_DRAFT):
+    # Returns (draft, from_cache); regenerate skips the lookup and overwrites the entry
+    prompt, key = _prompt_and_key(incident_data, client.model, artifact)
+    if not regenerate:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached, True
+    draft = client.complete(prompt, **DRAFT_PARAMS[artifact])
+    cache.put(key, draft, incident_id=incident_data.get("Incident ID"), artifact=artifact)
+    return draft, False
+
+
+def stream_draft(client, incident_data, cache, regenerate=False, artifact=CUSTOMER_DRAFT):
+    # Returns (chunks, from_cache); a cached draft comes back as a single chunk,
+    # a fresh one is streamed token by token and stored once it is complete
+    prompt, key = _prompt_and_key(incident_data, client.model, artifact)
+    if not regenerate:
+        cached = cache.get(key)
+        if cached is not None:
+            return iter([cached]), True
+    chunks = _stream_and_store(client, prompt, key, incident_data.get("Incident ID"), artifact, cache)
+    return chunks, False
+
+
+def _stream_and_store(client, prompt, key, incident_id, artifact, cache):
+    parts = []
+    for chunk in client.stream(prompt, **DRAFT_PARAMS[artifact]):
+        parts.append(chunk)
+        yield chunk
+    cache.put(key, "".join(parts), incident_id=incident_id, artifact=artifact)
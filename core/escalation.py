@@ -0,0 +1,64 @@
+# Vectorized escalation scoring.
+#
+# Every function here works on whole columns at once, so scoring the full
+# incident table is a handful of NumPy/pandas passes rather than a Python
+# check per row.
+from core.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+SCORE_COLUMN = "Escalation Score"
+
+ESCALATION_SEVERITIES = ["Critical", "High"]
+ESCALATION_STATES = ["Open", "In Progress"]
+
+SEVERITY_WEIGHTS = {"Critical": 1.0, "High": 0.7, "Medium": 0.3, "Low": 0.1}
+STATE_WEIGHTS = {"Open": 1.0, "In Progress": 0.8, "Resolved": 0.1, "Closed": 0.0}
+
+# Age factor rises from 0 towards 1 as an incident stays open; ~63% after this many hours
+AGE_SCALE_HOURS = 24
+
+
+def is_escalation_prone(df):
+    # The 🚩 rule: Critical/High incidents that are still being worked on
+    return df["Severity"].isin(ESCALATION_SEVERITIES) & df["State"].isin(ESCALATION_STATES)
+
+
+def service_escalation_rates(df):
+    # Share of each service's incidents that are currently escalation-prone
+    if df.empty:
+        return pd.Series(dtype=float)
+    return is_escalation_prone(df).groupby(df["Owning Service"], observed=True).mean()
+
+
+def escalation_scores(df, now=None, service_rates=None):
+    # Score in [0, 100]; severity and state dominate, age and service history scale it
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    if service_rates is None:
+        service_rates = service_escalation_rates(df)
+
+    severity = df["Severity"].map(SEVERITY_WEIGHTS).astype(float).fillna(0.0).to_numpy()
+    state = df["State"].map(STATE_WEIGHTS).astype(float).fillna(0.0).to_numpy()
+    age_hours = (now - pd.to_datetime(df["Create Time"])).dt.total_seconds().to_numpy() / 3600
+    age = 1 - np.exp(-np.clip(age_hours, 0, None) / AGE_SCALE_HOURS)
+    rate = df["Owning Service"].map(service_rates).astype(float).fillna(0.0).to_numpy()
+
+    score = severity * state * (0.5 + 0.5 * age) * (0.5 + 0.5 * rate)
+    return pd.Series(np.round(score * 100, 1), index=df.index, name=SCORE_COLUMN)
+
+
+def add_escalation_scores(df, now=None, service_rates=None):
+    scored = df.copy()
+    scored[SCORE_COLUMN] = escalation_scores(df, now=now, service_rates=service_rates)
+    return scored
+
+
+def top_escalations(df, n=10, min_score=0.0):
+    # Top-n rows of an already scored frame; argpartition keeps this O(N) instead of a full sort
+    scores = df[SCORE_COLUMN].to_numpy()
+    candidates = np.flatnonzero(scores >= min_score)
+    if len(candidates) > n:
+        candidates = candidates[np.argpartition(-scores[candidates], n - 1)[:n]]
+    ordered = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return df.iloc[ordered].reset_index(drop=True)
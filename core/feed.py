@@ -0,0 +1,44 @@
+# Client-side merge of change-feed deltas into a cached incident page.
+from core.lazy import lazy_import
+from core.schema import SORT_COLUMNS
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+def _matches(df, filters):
+    mask = np.ones(len(df), dtype=bool)
+    for column, values in (filters or {}).items():
+        if values:
+            mask &= df[column].isin(values).to_numpy()
+    return mask
+
+
+def _sort_keys(df):
+    return list(zip(df["Create Time"], df["Incident ID"]))
+
+
+def merge_changes(page_df, changes, filters=None, first_page=False):
+    """Apply changed incidents to a cached page.
+
+    Changed rows replace their previous version, rows that no longer match the
+    filters drop out, and new matching rows are inserted when they sort inside
+    the page's (Create Time, Incident ID) range; on the first page anything
+    newer than the top row is included too. Keyset cursors of later pages stay
+    valid, so merged pages never duplicate or skip incidents.
+    """
+    if changes.empty:
+        return page_df
+
+    kept = page_df[~page_df["Incident ID"].isin(changes["Incident ID"])]
+    candidates = changes[_matches(changes, filters)]
+    if not page_df.empty and not candidates.empty:
+        keys = _sort_keys(candidates)
+        top, bottom = _sort_keys(page_df.iloc[[0, -1]])
+        in_range = [bottom <= key and (first_page or key <= top) for key in keys]
+        candidates = candidates[in_range]
+    elif not first_page:
+        candidates = candidates.iloc[0:0]
+
+    merged = pd.concat([kept, candidates], ignore_index=True)
+    return merged.sort_values(SORT_COLUMNS, ascending=False, ignore_index=True)
@@ -0,0 +1,168 @@
+# Durable, append-only log of 👍/👎 feedback on generated drafts.
+#
+# record() only puts the event on an in-memory queue, so a rerun never waits
+# on disk. A single writer thread drains the queue and appends whatever has
+# accumulated in one SQLite (WAL) transaction, which keeps bursts from many
+# sessions cheap. A batch that fails to write is logged, counted on the
+# tracer and retried with the next one rather than dropped. Rows are never
+# updated; aggregates such as the approval rate per model and prompt version
+# are computed with SQL over the log.
+#
+#   python -m core.feedback   # approval rates from the log
+import argparse
+import hashlib
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from core.tracing import TRACER
+
+FEEDBACK_LOG_PATH = os.path.join(".cache", "feedback.sqlite3")
+FLUSH_INTERVAL = 1.0  # seconds between writes when events trickle in
+MAX_BATCH = 500  # events per transaction
+MAX_PENDING = 10 * MAX_BATCH  # events held for retry while writes keep failing; the oldest go first
+
+logger = logging.getLogger(__name__)
+
+UP = "up"
+DOWN = "down"
+
+COLUMNS = ["created_at", "incident_id", "artifact", "vote", "comment", "draft_hash", "model", "prompt_version"]
+
+
+def content_hash(text):
+    return hashlib.sha256((text or "").encode()).hexdigest()
+
+
+class FeedbackLog:
+    def __init__(self, path=FEEDBACK_LOG_PATH, flush_interval=FLUSH_INTERVAL, max_batch=MAX_BATCH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.failed_writes = 0  # batches that failed to write and were kept for retry
+        self.dropped = 0  # events given up on after MAX_PENDING piled up
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS feedback ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, created_at REAL, incident_id INTEGER, "
+                "artifact TEXT, vote TEXT, comment TEXT, draft_hash TEXT, model TEXT, prompt_version TEXT)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_feedback_version ON feedback (artifact, model, prompt_version)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_feedback_incident ON feedback (incident_id)")
+
+        self._queue = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._write_loop, name="feedback-writer", daemon=True)
+        self._writer.start()
+
+    def record(self, incident_id, artifact, vote, comment="", draft_hash=None, model=None, prompt_version=None):
+        # Non-blocking: the event is written by the background thread
+        if vote not in (UP, DOWN):
+            raise ValueError(f"vote must be {UP!r} or {DOWN!r}, not {vote!r}")
+        incident_id = None if incident_id is None else int(incident_id)
+        self._queue.put((time.time(), incident_id, artifact, vote, comment or "", draft_hash, model, prompt_version))
+
+    def flush(self):
+        # Blocks until everything recorded so far is on disk, or its write
+        # failed and it is held for retry (see failed_writes)
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def _write_loop(self):
+        pending = []  # events whose write failed, retried ahead of new ones
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if pending:
+                    pending = self._write(pending)
+                continue
+            items = [first]
+            while len(items) < self.max_batch:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            events = pending + [item for item in items if not isinstance(item, threading.Event)]
+            if events:
+                pending = self._write(events)
+            for item in items:
+                if isinstance(item, threading.Event):
+                    item.set()
+
+    def _write(self, events):
+        # Returns the events still to be written: none on success, the batch on failure
+        try:
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    f"INSERT INTO feedback ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                    events,
+                )
+        except sqlite3.Error:
+            # Keep the writer alive and the batch for the next attempt
+            logger.exception("Writing %d feedback events failed; retrying with the next batch", len(events))
+            self.failed_writes += 1
+            TRACER.increment("feedback.write_failed")
+            overflow = len(events) - MAX_PENDING
+            if overflow > 0:
+                logger.error("Dropping the %d oldest unwritten feedback events", overflow)
+                self.dropped += overflow
+                TRACER.increment("feedback.dropped", overflow)
+                events = events[overflow:]
+            return events
+        return []
+
+    def events(self, incident_id=None):
+        sql = f"SELECT {', '.join(COLUMNS)} FROM feedback"
+        params = ()
+        if incident_id is not None:
+            sql += " WHERE incident_id = ?"
+            params = (int(incident_id),)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY id", params).fetchall()
+        return [dict(zip(COLUMNS, row)) for row in rows]
+
+    def approval_rates(self, since=None):
+        # [{"artifact", "model", "prompt_version", "votes", "up", "approval_rate"}, ...]
+        sql = (
+            "SELECT artifact, model, prompt_version, COUNT(*), SUM(vote = 'up') FROM feedback"
+            + (" WHERE created_at >= ?" if since is not None else "")
+            + " GROUP BY artifact, model, prompt_version ORDER BY artifact, model, prompt_version"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, () if since is None else (since,)).fetchall()
+        return [
+            {"artifact": artifact, "model": model, "prompt_version": version,
+             "votes": votes, "up": up, "approval_rate": up / votes}
+            for artifact, model, version, votes, up in rows
+        ]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM feedback").fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Approval rates from the draft feedback log")
+    parser.add_argument("--path", default=os.environ.get("FEEDBACK_LOG_PATH", FEEDBACK_LOG_PATH))
+    args = parser.parse_args()
+
+    log = FeedbackLog(args.path)
+    print(f"{'artifact':<22} {'model':<10} {'prompt':<8} {'votes':>6} {'approval':>9}")
+    for row in log.approval_rates():
+        print(f"{row['artifact']:<22} {str(row['model']):<10} {str(row['prompt_version']):<8} "
+              f"{row['votes']:>6} {row['approval_rate']:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+# Streaming bulk import of incident exports (JSONL, CSV or Parquet).
+#
+# Files are read in fixed-size chunks (pandas' chunked readers, Parquet record
+# batches), so raw rows never need more than a chunk's worth of memory. With
+# the SQLite backend each chunk is written and released, keeping the import
+# bounded by the chunk size; the in-memory backend holds every converted chunk
+# until the final sort, so its peak is about twice the compact table.
+# Each chunk is validated against the incident schema; rows that fail are
+# dropped and counted by reason. Incident IDs are deduplicated against
+# everything loaded before (earlier chunks and the store's existing rows), the
+# first occurrence wins, using a sorted ID array at 8 bytes per incident. Valid
+# chunks go to the store's bulk_load, so the in-memory backend sorts and
+# indexes once at the end instead of once per chunk.
+#
+#   python -m core.ingest incidents.parquet --backend sqlite --path .cache/incidents.sqlite3
+import argparse
+import os
+import time
+from dataclasses import dataclass, field
+
+from core.lazy import lazy_import
+from core.schema import CATEGORIES, COLUMNS, INCIDENT_ID_PREFIX, OPTIONAL_COLUMNS, to_incident_frame
+from core.tracing import traced
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+CHUNK_ROWS = 100_000
+FORMATS = {".jsonl": "jsonl", ".ndjson": "jsonl", ".json": "jsonl", ".csv": "csv", ".parquet": "parquet", ".pq": "parquet"}
+COMPRESSION_SUFFIXES = {".gz", ".bz2", ".xz", ".zst", ".zip"}
+REQUIRED_COLUMNS = [column for column in COLUMNS if column not in OPTIONAL_COLUMNS]
+ENUM_COLUMNS = [column for column, categories in CATEGORIES.items() if categories is not None]
+TEXT_COLUMNS = ["Title", "Owner"]
+DEFAULT_STORE_PATH = os.path.join(".cache", "incidents.sqlite3")
+
+
+class IngestError(ValueError):
+    pass
+
+
+def detect_format(path):
+    root, suffix = os.path.splitext(path.lower())
+    if suffix in COMPRESSION_SUFFIXES:
+        root, suffix = os.path.splitext(root)
+    if suffix not in FORMATS:
+        raise IngestError(f"Cannot tell the format of {path}; pass one of {sorted(set(FORMATS.values()))}")
+    return FORMATS[suffix]
+
+
+def read_chunks(path, format=None, chunk_rows=CHUNK_ROWS):
+    # Raw DataFrames of at most chunk_rows rows, in file order
+    format = format or detect_format(path)
+    if format == "jsonl":
+        # Values are kept as written; validate_chunk does the parsing
+        with pd.read_json(path, lines=True, chunksize=chunk_rows, dtype=False, convert_dates=False) as reader:
+            yield from reader
+    elif format == "csv":
+        # Only empty cells are missing; a Title of "NA" stays a title
+        with pd.read_csv(path, chunksize=chunk_rows, dtype=str, keep_default_na=False, na_values=[""]) as reader:
+            yield from reader
+    elif format == "parquet":
+        import pyarrow.parquet as parquet
+
+        for batch in parquet.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        raise IngestError(f"Unknown incident file format: {format}")
+
+
+def _parse_times(values):
+    # Naive datetime64; timezone-aware values are converted to UTC first
+    if pd.api.types.is_datetime64_any_dtype(values):
+        times = values
+    else:
+        times = pd.to_datetime(values, errors="coerce", format="ISO8601", utc=True)
+    if times.dt.tz is not None:
+        times = times.dt.tz_convert(None)
+    return times.astype("datetime64[ns]")
+
+
+def validate_chunk(df):
+    """Rows of ``df`` that fit the incident schema, as an incident frame.
+
+    Returns ``(valid, rejected)`` where ``rejected`` maps a reason to the
+    number of rows dropped for it (each row counts once, under its first
+    failure). Raises IngestError when a required column is missing.
+    """
+    missing = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+    if missing:
+        raise IngestError(f"Missing incident columns: {', '.join(missing)}")
+    df = df.reset_index(drop=True)
+    if "Resolved Time" not in df.columns:
+        df["Resolved Time"] = pd.NaT
+
+    raw_ids = df["Incident ID"].astype(str).str.strip().str.removeprefix(INCIDENT_ID_PREFIX)
+    ids = pd.to_numeric(raw_ids, errors="coerce")
+    created = _parse_times(df["Create Time"])
+    resolved = _parse_times(df["Resolved Time"])
+
+    checks = [("invalid Incident ID", ids.isna() | (ids != ids.round()))]
+    checks += [(f"invalid {column}", ~df[column].isin(CATEGORIES[column])) for column in ENUM_COLUMNS]
+    checks += [(f"empty {column}", df[column].isna() | (df[column].astype(str).str.strip() == ""))
+               for column in TEXT_COLUMNS]
+    checks += [
+        ("invalid Create Time", created.isna()),
+        ("invalid Resolved Time", resolved.isna() & df["Resolved Time"].notna()),
+        ("Resolved Time before Create Time", resolved < created),
+    ]
+    invalid = np.zeros(len(df), dtype=bool)
+    rejected = {}
+    for reason, failed in checks:
+        failed = failed.to_numpy(dtype=bool) & ~invalid
+        if failed.any():
+            rejected[reason] = int(failed.sum())
+            invalid |= failed
+
+    valid = df.assign(**{"Incident ID": ids, "Create Time": created, "Resolved Time": resolved})[~invalid]
+    valid = valid.assign(**{"Incident ID": valid["Incident ID"].astype("int64")})
+    return to_incident_frame(valid), rejected
+
+
+class IdSet:
+    """Sorted array of Incident IDs seen so far."""
+
+    def __init__(self, ids=()):
+        self._ids = np.unique(np.asarray(ids, dtype=np.int64))
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add(self, ids):
+        # Mask of ids not seen before (only the first of repeats within ids); records them as seen
+        ids = np.asarray(ids, dtype=np.int64)
+        unique, first = np.unique(ids, return_index=True)
+        positions = np.searchsorted(self._ids, unique)
+        known = positions < len(self._ids)
+        known[known] = self._ids[positions[known]] == unique[known]
+        self._ids = np.insert(self._ids, positions[~known], unique[~known])
+        mask = np.zeros(len(ids), dtype=bool)
+        mask[first[~known]] = True
+        return mask
+
+
+@dataclass
+class IngestReport:
+    rows_read: int = 0
+    loaded: int = 0
+    duplicates: int = 0
+    rejected: dict = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_sec(self):
+        return self.rows_read / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        rejected = sum(self.rejected.values())
+        return (f"{self.rows_read:,} rows read, {self.loaded:,} loaded, {self.duplicates:,} duplicates, "
+                f"{rejected:,} rejected in {self.elapsed:.1f}s ({self.rows_per_sec:,.0f} rows/s)")
+
+
+@traced("ingest")
+def ingest(store, paths, format=None, chunk_rows=CHUNK_ROWS, progress=None):
+    """Stream one export file, or a list of them, into ``store``.
+
+    All files go through a single bulk load. ``progress(report)`` is called
+    after every chunk; returns the final IngestReport.
+    """
+    paths = [paths] if isinstance(paths, str) else list(paths)
+    report = IngestReport()
+    seen = IdSet(store.incident_ids())
+    start = time.perf_counter()
+
+    def valid_chunks():
+        for raw in (chunk for path in paths for chunk in read_chunks(path, format, chunk_rows)):
+            valid, rejected = validate_chunk(raw)
+            new = seen.add(valid["Incident ID"].to_numpy())
+            report.rows_read += len(raw)
+            report.loaded += int(new.sum())
+            report.duplicates += int((~new).sum())
+            for reason, count in rejected.items():
+                report.rejected[reason] = report.rejected.get(reason, 0) + count
+            report.elapsed = time.perf_counter() - start
+            if progress is not None:
+                progress(report)
+            yield valid[new]
+
+    store.bulk_load(valid_chunks())
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def main():
+    from core.store import open_store
+
+    parser = argparse.ArgumentParser(description="Bulk-load incident exports into the incident store")
+    parser.add_argument("files", nargs="+", help="JSONL, CSV or Parquet files (optionally compressed)")
+    parser.add_argument("--format", choices=sorted(set(FORMATS.values())), help="default: from the file suffix")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--backend", choices=["memory", "sqlite"], default=os.environ.get("INCIDENT_STORE", "sqlite"))
+    parser.add_argument("--path", default=os.environ.get("INCIDENT_STORE_PATH", DEFAULT_STORE_PATH),
+                        help="SQLite file (sqlite backend)")
+    args = parser.parse_args()
+
+    if args.backend == "sqlite":
+        os.makedirs(os.path.dirname(args.path) or ".", exist_ok=True)
+    store = open_store(args.backend, args.path)
+    report = ingest(store, args.files, args.format, args.chunk_rows,
+                    progress=lambda report: print(f"  {report.summary()}", flush=True))
+    print(report.summary())
+    for reason, count in sorted(report.rejected.items()):
+        print(f"  rejected {count:,} rows: {reason}")
+    print(f"{store.count():,} incidents in the {args.backend} store")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+# Deferred imports for the heavy third-party modules.
+#
+# `pd = lazy_import("pandas")` binds a stand-in module; the real import runs on
+# the first attribute access and its names are then copied onto the stand-in,
+# so later lookups cost the same as on the real module. Importing the core
+# package (and with it a page script) therefore no longer pays for pandas,
+# numpy or requests until a code path actually uses them. The import itself
+# goes through importlib, which serialises concurrent first uses from several
+# sessions' script threads.
+import importlib
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    def __getattr__(self, attr):
+        # Only reached for names not copied over yet, i.e. before the first load
+        # (or for attributes the real module itself resolves on demand)
+        module = importlib.import_module(self.__name__)
+        if "__file__" not in self.__dict__:
+            self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def lazy_import(name):
+    # The real module if something already imported it, a LazyModule otherwise
+    return sys.modules.get(name) or LazyModule(name)
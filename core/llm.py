@@ -0,0 +1,122 @@
+# Reusable chat-completions client for the Perplexity API.
+#
+# One client holds a pooled requests.Session, so repeated drafts reuse
+# connections instead of paying a TCP/TLS handshake each time. Calls have
+# connect/read timeouts and retry 429/5xx and connection errors with capped
+# exponential backoff (honouring Retry-After). The async variant runs the
+# same pooled call on a worker thread so it can be awaited or gathered, and
+# stream() yields tokens from the server-sent-events streaming mode.
+import asyncio
+import json
+import random
+import time
+
+from core.lazy import lazy_import
+
+requests = lazy_import("requests")
+
+PERPLEXITY_URL = "https://api.perplexity.ai/chat/completions"
+DEFAULT_MODEL = "sonar"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    def __init__(self, status_code, text):
+        super().__init__(f"{status_code} - {text}")
+        self.status_code = status_code
+        self.text = text
+
+
+class LLMClient:
+    def __init__(
+        self,
+        api_key,
+        url=PERPLEXITY_URL,
+        model=DEFAULT_MODEL,
+        connect_timeout=3.05,
+        read_timeout=30,
+        max_retries=3,
+        backoff_base=0.5,
+        backoff_max=8.0,
+        pool_size=10,
+    ):
+        self.url = url
+        self.model = model
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        })
+
+    def _body(self, prompt, temperature, max_tokens):
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+
+    def _backoff(self, attempt, response=None):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        # Full jitter keeps many sessions from retrying in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _post(self, body, **kwargs):
+        attempt = 0
+        while True:
+            try:
+                response = self._session.post(self.url, json=body, timeout=self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+            else:
+                if response.status_code == 200:
+                    return response
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    raise LLMError(response.status_code, response.text)
+                response.close()
+                time.sleep(self._backoff(attempt, response))
+            attempt += 1
+
+    def complete(self, prompt, temperature=0.5, max_tokens=300):
+        response = self._post(self._body(prompt, temperature, max_tokens))
+        return response.json()["choices"][0]["message"]["content"]
+
+    def stream(self, prompt, temperature=0.5, max_tokens=300):
+        # Retries only happen before the first byte; once tokens flow, errors propagate
+        body = self._body(prompt, temperature, max_tokens)
+        body["stream"] = True
+        response = self._post(body, stream=True)
+        with response:
+            # chunk_size=None hands over each chunk as soon as it arrives instead of buffering
+            for line in response.iter_lines(chunk_size=None):
+                if not line.startswith(b"data:"):
+                    continue
+                data = line[len(b"data:"):].strip()
+                if data == b"[DONE]":
+                    break
+                delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                if delta:
+                    yield delta
+
+    async def acomplete(self, prompt, temperature=0.5, max_tokens=300):
+        return await asyncio.to_thread(self.complete, prompt, temperature, max_tokens)
+
+    def close(self):
+        self._session.close()
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta
+import random
+
+from core.lazy import lazy_import
+from core.schema import OWNERS
+from core.synthetic import generate_incidents
+from core.tracing import traced
+
+pd = lazy_import("pandas")
+
+# Mock incidents for the portal: a fresh random draw over the last three days
+# (see core/synthetic.py for the distributions)
+MOCK_DAYS = 3
+
+
+@traced("generate_mock_incidents")
+def generate_mock_incidents(num_incidents=50):
+    return generate_incidents(num_incidents, seed=None, now=datetime.now(), days=MOCK_DAYS)
+
+
+TIMELINE_INTERVAL = timedelta(minutes=15)
+MAX_TIMELINE_EVENTS = 5000
+TIMELINE_EVENTS = {
+    "finding": [
+        "Error rate on {service} up {n}% over baseline",
+        "Latency p99 for {service} at {n}00 ms",
+        "About {n}% of requests to {service} affected",
+        "Dependency timeouts observed from {service}",
+    ],
+    "action": [
+        "Rolled back the latest {service} deploy",
+        "Scaled {service} out by {n} replicas",
+        "Enabled rate limiting in front of {service}",
+        "Failed over {service} to the secondary region",
+    ],
+    "customer_update": [
+        "Status page updated for {service}",
+        "Customer update sent, next update in {n}0 minutes",
+        "Support macro published for {service} tickets",
+    ],
+}
+
+
+def generate_mock_timeline(incident_data, now=None):
+    # One event every 15 minutes since the incident was created, seeded by the
+    # incident ID: the same incident always yields the same history, and later
+    # calls only append events to it as time passes
+    now = now or datetime.now()
+    created = pd.Timestamp(incident_data["Create Time"]).to_pydatetime()
+    count = min(MAX_TIMELINE_EVENTS, max(1, int((now - created) / TIMELINE_INTERVAL)))
+    rng = random.Random(int(incident_data["Incident ID"]))
+    service = incident_data["Owning Service"]
+    kinds = list(TIMELINE_EVENTS)
+
+    events = []
+    for i in range(count):
+        kind = rng.choices(kinds, weights=[5, 3, 2])[0]
+        text = rng.choice(TIMELINE_EVENTS[kind]).format(service=service, n=rng.randint(2, 9))
+        events.append({
+            "time": created + i * TIMELINE_INTERVAL,
+            "kind": kind,
+            "author": rng.choice(OWNERS),
+            "text": text,
+        })
+    return events
+
+
+# Static summary and customer draft used by the legacy single-page view
+def generate_mock_summary():
+    what_we_know = [
+        "Service degradation detected in the Payment Service API",
+        "Error rate increased by 15% in the last hour",
+        "Affecting approximately 5% of all payment transactions",
+        "Primary error: Timeout in payment gateway communication"
+    ]
+    
+    what_has_been_done = [
+        "Initial investigation completed by the Payment Service team",
+        "Identified the root cause as increased latency in the payment gateway",
+        "Implemented temporary rate limiting to prevent cascading failures",
+        "Deployed hotfix to improve error handling and retry logic"
+    ]
+    
+    customer_communication = [
+        "Initial notification sent to affected customers",
+        "Regular updates provided every 30 minutes",
+        "Estimated resolution time communicated: 2 hours",
+        "Alternative payment methods suggested to customers"
+    ]
+    
+    return {
+        "what_we_know": what_we_know,
+        "what_has_been_done": what_has_been_done,
+        "customer_communication": customer_communication
+    }
+
+
+def generate_communication_draft(incident_data):
+    severity = incident_data["Severity"]
+    service = incident_data["Owning Service"]
+    title = incident_data["Title"]
+    
+    draft = f"""
+Dear valued customers,
+
+We are currently experiencing {severity.lower()} issues with our {service.lower()}. {title}
+
+Our team is actively working on resolving this issue. We will provide updates every 30 minutes until the situation is resolved.
+
+You could check the status of the incident on our status page: https://status.abnormal.ai and subscribe for notifications.
+
+We apologize for any inconvenience this may cause and appreciate your patience.
+
+Best regards,
+Abnormal AI Incident Response Team
+    """
+    return draft
@@ -0,0 +1,236 @@
+# Multi-channel publish fan-out.
+#
+# A message is fanned out to every selected channel in parallel. Each
+# channel's subscribers are split into batches sized for that channel, every
+# batch waits on the channel's own rate limiter, and the adapter reports a
+# status per recipient which is appended to a delivery log in SQLite, one
+# transaction per publish, so it survives restarts without growing the
+# server's memory. The stub adapters
+# below simulate latency and failures without any network access, so large
+# subscriber lists can be benchmarked offline.
+import os
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from core.ratelimit import RateLimiter
+
+CHANNELS = ["Status Page", "Slack", "Email", "SMS"]
+STUB_SUBSCRIBERS = {"Slack": 42, "Email": 128, "SMS": 65}
+DELIVERY_LOG_PATH = os.path.join(".cache", "deliveries.sqlite3")
+DELIVERY_COLUMNS = ["incident_id", "channel", "recipient", "status", "error", "sent_at"]
+
+DELIVERED = "delivered"
+FAILED = "failed"
+
+
+@dataclass
+class DeliveryRecord:
+    incident_id: int
+    channel: str
+    recipient: str
+    status: str
+    error: str = None
+    sent_at: float = field(default_factory=time.time)
+
+
+class ChannelAdapter:
+    """Sends one batch of recipients on a channel.
+
+    ``send_batch`` returns ``{recipient: error}`` for the recipients that
+    failed; everyone else in the batch counts as delivered.
+    """
+
+    name = None
+    batch_size = 1
+    rate = 10.0  # batches per second
+    burst = 1
+    concurrency = 4  # batches in flight
+
+    def send_batch(self, message, recipients):
+        raise NotImplementedError
+
+
+class StubAdapter(ChannelAdapter):
+    def __init__(self, latency=0.0, failure_rate=0.0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+
+    def send_batch(self, message, recipients):
+        time.sleep(self.latency)
+        return {
+            recipient: "simulated delivery failure"
+            for recipient in recipients
+            if random.random() < self.failure_rate
+        }
+
+
+class StatusPageAdapter(StubAdapter):
+    name = "Status Page"
+    batch_size = 1
+    rate = 1.0
+
+
+class SlackAdapter(StubAdapter):
+    name = "Slack"
+    batch_size = 1  # one message per channel or user
+    rate = 20.0
+    burst = 10
+
+
+class EmailAdapter(StubAdapter):
+    name = "Email"
+    batch_size = 50  # recipients per bulk send
+    rate = 14.0
+    burst = 5
+
+
+class SMSAdapter(StubAdapter):
+    name = "SMS"
+    batch_size = 10  # numbers per bulk notify call
+    rate = 10.0
+    burst = 5
+
+
+def stub_adapters(latency=0.0, failure_rate=0.0):
+    return {
+        adapter.name: adapter(latency=latency, failure_rate=failure_rate)
+        for adapter in (StatusPageAdapter, SlackAdapter, EmailAdapter, SMSAdapter)
+    }
+
+
+class SubscriberDirectory:
+    """Recipients per channel."""
+
+    def __init__(self, subscribers):
+        self._subscribers = subscribers
+
+    def recipients(self, channel):
+        return self._subscribers.get(channel, [])
+
+    def counts(self):
+        return {channel: len(recipients) for channel, recipients in self._subscribers.items()}
+
+
+def stub_directory(counts):
+    # Synthetic subscribers, e.g. {"Slack": 42, "Email": 128}; the status page is one "recipient"
+    subscribers = {"Status Page": ["status.abnormal.ai"]}
+    for channel, count in counts.items():
+        subscribers[channel] = [f"{channel.lower()}-subscriber-{i}" for i in range(count)]
+    return SubscriberDirectory(subscribers)
+
+
+class DeliveryLog:
+    """Append-only per-recipient delivery status, in SQLite (WAL)."""
+
+    def __init__(self, path=DELIVERY_LOG_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS deliveries ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, incident_id INTEGER, channel TEXT, "
+                "recipient TEXT, status TEXT, error TEXT, sent_at REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_deliveries_incident ON deliveries (incident_id)")
+
+    def extend(self, records):
+        rows = [
+            (None if r.incident_id is None else int(r.incident_id), r.channel, r.recipient, r.status, r.error, r.sent_at)
+            for r in records
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT INTO deliveries ({', '.join(DELIVERY_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(DELIVERY_COLUMNS))})",
+                rows,
+            )
+
+    def records(self, incident_id=None, status=None):
+        clauses, params = [], []
+        if incident_id is not None:
+            clauses.append("incident_id = ?")
+            params.append(int(incident_id))
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(DELIVERY_COLUMNS)} FROM deliveries{where} ORDER BY id", params
+            ).fetchall()
+        return [DeliveryRecord(*row) for row in rows]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM deliveries").fetchone()[0]
+
+
+@dataclass
+class PublishReport:
+    records: list
+    elapsed: float
+
+    def summary(self):
+        # {channel: {"delivered": n, "failed": n}}
+        counts = {}
+        for record in self.records:
+            channel = counts.setdefault(record.channel, {DELIVERED: 0, FAILED: 0})
+            channel[record.status] += 1
+        return counts
+
+    def failures(self):
+        # {channel: [(recipient, error), ...]} for the recipients that failed
+        failed = {}
+        for record in self.records:
+            if record.status == FAILED:
+                failed.setdefault(record.channel, []).append((record.recipient, record.error))
+        return failed
+
+
+class PublishEngine:
+    def __init__(self, adapters, directory, log=None):
+        self.adapters = adapters
+        self.directory = directory
+        self.log = DeliveryLog() if log is None else log
+        # A pool and limiter per channel, so a slow or throttled channel never holds up the others
+        self._limiters = {name: RateLimiter(adapter.rate, adapter.burst) for name, adapter in adapters.items()}
+        self._pools = {
+            name: ThreadPoolExecutor(max_workers=adapter.concurrency, thread_name_prefix=f"publish-{name}")
+            for name, adapter in adapters.items()
+        }
+
+    def _send(self, incident_id, channel, message, batch):
+        adapter = self.adapters[channel]
+        self._limiters[channel].acquire()
+        try:
+            errors = adapter.send_batch(message, batch)
+        except Exception as e:
+            errors = {recipient: str(e) for recipient in batch}
+        now = time.time()
+        return [
+            DeliveryRecord(incident_id, channel, recipient,
+                           FAILED if recipient in errors else DELIVERED, errors.get(recipient), now)
+            for recipient in batch
+        ]
+
+    def publish(self, message, channels, incident_id=None):
+        start = time.perf_counter()
+        futures = []
+        for channel in channels:
+            recipients = self.directory.recipients(channel)
+            size = self.adapters[channel].batch_size
+            for i in range(0, len(recipients), size):
+                batch = recipients[i:i + size]
+                futures.append(self._pools[channel].submit(self._send, incident_id, channel, message, batch))
+
+        records = [record for future in futures for record in future.result()]
+        self.log.extend(records)
+        return PublishReport(records, time.perf_counter() - start)
@@ -0,0 +1,186 @@
+# Hourly rollups of incident counts and time to resolve, for the metrics page.
+#
+# Two small tables summarize the incident table:
+#   created:  (hour of Create Time, Severity, State, Owning Service) -> incidents
+#   resolved: (hour of Resolved Time, Severity, Owning Service) -> incidents, hours to resolve
+# Store backends keep them current on every write, adding a write's new rows
+# and subtracting the rows it replaced, so reading them costs the number of
+# hours x categories, not the number of incidents. Everything the metrics page
+# charts (counts over time, MTTR, open incidents) is derived from these two
+# frames here.
+import threading
+
+from core.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+BUCKET = "h"
+CREATED_KEYS = ["Bucket", "Severity", "State", "Owning Service"]
+RESOLVED_KEYS = ["Bucket", "Severity", "Owning Service"]
+# Columns whose changes move an incident between rollup rows
+ROLLUP_COLUMNS = ["Create Time", "Resolved Time", "Severity", "State", "Owning Service"]
+
+
+def empty_created():
+    return pd.DataFrame({"Bucket": pd.Series(dtype="datetime64[ns]"), "Severity": [], "State": [],
+                         "Owning Service": [], "Incidents": pd.Series(dtype="int64")})
+
+
+def empty_resolved():
+    return pd.DataFrame({"Bucket": pd.Series(dtype="datetime64[ns]"), "Severity": [], "Owning Service": [],
+                         "Incidents": pd.Series(dtype="int64"), "Hours": pd.Series(dtype="float64")})
+
+
+def created_counts(df):
+    # Rollup rows contributed by the incidents in df
+    keys = [df["Create Time"].dt.floor(BUCKET), df["Severity"], df["State"], df["Owning Service"]]
+    counts = df.groupby(keys, observed=True).size()
+    counts.index.names = CREATED_KEYS
+    return counts
+
+
+def resolved_totals(df):
+    df = df[df["Resolved Time"].notna()]
+    hours = (df["Resolved Time"] - df["Create Time"]).dt.total_seconds() / 3600
+    keys = [df["Resolved Time"].dt.floor(BUCKET), df["Severity"], df["Owning Service"]]
+    totals = hours.groupby(keys, observed=True).agg(["size", "sum"])
+    totals.index.names = RESOLVED_KEYS
+    return totals
+
+
+class RollupCounters:
+    """In-process rollup tables, for the in-memory store."""
+
+    def __init__(self):
+        self._created = {}  # key -> incidents
+        self._resolved = {}  # key -> [incidents, hours]
+        self._lock = threading.Lock()
+
+    def add(self, df, sign=1):
+        # sign=-1 removes rows previously added
+        created = created_counts(df)
+        resolved = resolved_totals(df)
+        with self._lock:
+            for key, count in created.items():
+                total = self._created.get(key, 0) + sign * int(count)
+                if total:
+                    self._created[key] = total
+                else:
+                    self._created.pop(key, None)
+            for key, (count, hours) in zip(resolved.index, resolved.to_numpy()):
+                entry = self._resolved.setdefault(key, [0, 0.0])
+                entry[0] += sign * int(count)
+                entry[1] += sign * hours
+                if not entry[0]:
+                    del self._resolved[key]
+
+    def remove(self, df):
+        self.add(df, sign=-1)
+
+    def created(self):
+        with self._lock:
+            items = list(self._created.items())
+        if not items:
+            return empty_created()
+        keys, counts = zip(*items)
+        df = pd.DataFrame(list(keys), columns=CREATED_KEYS)
+        df["Incidents"] = np.array(counts, dtype=np.int64)
+        return df
+
+    def resolved(self):
+        with self._lock:
+            items = [(key, *entry) for key, entry in self._resolved.items()]
+        if not items:
+            return empty_resolved()
+        keys, counts, hours = zip(*items)
+        df = pd.DataFrame(list(keys), columns=RESOLVED_KEYS)
+        df["Incidents"] = np.array(counts, dtype=np.int64)
+        df["Hours"] = np.array(hours, dtype=float)
+        return df
+
+
+def _filter(df, filters):
+    for column, values in (filters or {}).items():
+        if values and column in df.columns:
+            df = df[df[column].isin(values)]
+    return df
+
+
+def _period_start(buckets, freq):
+    # Periods are hours ("h"), days ("D") or weeks starting on Monday ("W")
+    if freq == "W":
+        days = buckets.dt.floor("D")
+        return days - pd.to_timedelta(days.dt.weekday, unit="D")
+    return buckets.dt.floor(freq)
+
+
+def _periods(freq, first, last, include_last=True):
+    first = _period_start(pd.Series([pd.Timestamp(first)]), freq)[0]
+    return pd.date_range(first, last, freq="7D" if freq == "W" else freq,
+                         inclusive="both" if include_last else "left", name="Period")
+
+
+def _series(df, value, freq, by, start=None, end=None):
+    # Wide frame: one row per period in [start, end), one column per `by` value
+    # (a single "All" column without one); periods with no rows are zero
+    df = df.assign(Period=_period_start(df["Bucket"], freq))
+    if by:
+        wide = df.pivot_table(index="Period", columns=by, values=value, aggfunc="sum", fill_value=0, observed=True)
+        wide.columns = wide.columns.astype(str)
+    else:
+        wide = df.groupby("Period")[value].sum().to_frame("All")
+    if start is not None:
+        return wide.reindex(_periods(freq, start, end, include_last=False), fill_value=0)
+    if wide.empty:
+        return wide
+    return wide.reindex(_periods(freq, wide.index.min(), wide.index.max()), fill_value=0)
+
+
+def incident_counts(created, freq="D", by=None, filters=None, start=None, end=None):
+    """Incidents created per period, split by ``by`` (a rollup key column)."""
+    return _series(_filter(created, filters), "Incidents", freq, by, start, end)
+
+
+def mttr_hours(resolved, freq="D", by=None, filters=None, start=None, end=None):
+    """Mean hours from Create Time to Resolved Time for incidents resolved in each period."""
+    resolved = _filter(resolved, filters)
+    totals = _series(resolved, "Hours", freq, by, start, end)
+    counts = _series(resolved, "Incidents", freq, by, start, end)
+    return (totals / counts.replace(0, np.nan)).round(2)
+
+
+def open_incidents(created, resolved, freq="D", by=None, filters=None, start=None, end=None):
+    """Incidents created but not yet resolved at the end of each period.
+
+    A running total (created minus resolved) over the whole history, so
+    incidents opened before ``start`` still count.
+    """
+    filters = {column: values for column, values in (filters or {}).items() if column != "State"}
+    opened = _series(_filter(created, filters), "Incidents", freq, by)
+    closed = _series(_filter(resolved, filters), "Incidents", freq, by)
+    index = opened.index.union(closed.index)
+    columns = opened.columns.union(closed.columns)
+    balance = (opened.reindex(index=index, columns=columns, fill_value=0)
+               - closed.reindex(index=index, columns=columns, fill_value=0)).cumsum()
+    if balance.empty or start is None:
+        return balance
+    periods = _periods(freq, start, end, include_last=False)
+    return balance.reindex(balance.index.union(periods)).ffill().fillna(0).reindex(periods)
+
+
+def totals(created, resolved, filters=None, start=None, end=None):
+    """Headline numbers for [start, end): incidents created and resolved, their MTTR, and incidents open now."""
+    opened = open_incidents(created, resolved, filters=filters)
+    created = _filter(created, filters)
+    resolved = _filter(resolved, filters)
+    if start is not None:
+        created = created[(created["Bucket"] >= start) & (created["Bucket"] < end)]
+        resolved = resolved[(resolved["Bucket"] >= start) & (resolved["Bucket"] < end)]
+    resolved_count = int(resolved["Incidents"].sum())
+    return {
+        "created": int(created["Incidents"].sum()),
+        "resolved": resolved_count,
+        "mttr_hours": resolved["Hours"].sum() / resolved_count if resolved_count else None,
+        "open": int(opened.iloc[-1].sum()) if not opened.empty else 0,
+    }
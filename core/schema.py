@@ -0,0 +1,89 @@
+# Incident schema shared by the store, the pages and the data generators.
+from core.lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+SEVERITIES = ["Critical", "High", "Medium", "Low"]
+STATES = ["Open", "In Progress", "Resolved", "Closed"]
+RESOLVED_STATES = ["Resolved", "Closed"]
+SERVICES = ["User Service", "Payment Service", "Auth Service", "Notification Service", "API Gateway"]
+OWNERS = ["John Doe", "Jane Smith", "Mike Johnson", "Sarah Williams", "Alex Brown"]
+INCIDENT_TYPES = ["External", "Internal"]
+
+COLUMNS = [
+    "Type",
+    "Incident ID",
+    "Severity",
+    "State",
+    "Title",
+    "Create Time",
+    "Owning Service",
+    "Owner",
+    "Resolved Time",
+]
+
+# Columns an incident source may omit; they are filled with missing values
+# (an incident that is still open has no Resolved Time)
+OPTIONAL_COLUMNS = ["Resolved Time"]
+TIME_COLUMNS = ["Create Time", "Resolved Time"]
+
+# Columns the home page filters on; every store backend keeps an index for these
+INDEXED_COLUMNS = ["Severity", "State", "Owning Service", "Type"]
+
+# Incidents are always listed newest first
+SORT_COLUMNS = ["Create Time", "Incident ID"]
+
+# Compact in-memory representation: enums as categoricals, Create and Resolved
+# Time as datetime64 (Resolved Time is NaT while unresolved) and integer
+# incident IDs (shown with the INC- prefix)
+INCIDENT_ID_PREFIX = "INC-"
+CREATE_TIME_FORMAT = "%Y-%m-%d %H:%M"
+CATEGORIES = {
+    "Type": INCIDENT_TYPES,
+    "Severity": SEVERITIES,
+    "State": STATES,
+    "Owning Service": SERVICES,
+    "Owner": None,  # open set, categories are inferred from the data
+}
+
+
+def parse_incident_ids(values):
+    # Accepts "INC-1234" strings or plain integers
+    ids = pd.Series(values)
+    if ids.dtype == object or pd.api.types.is_string_dtype(ids):
+        ids = ids.astype(str).str.removeprefix(INCIDENT_ID_PREFIX)
+    return ids.astype("int64").to_numpy()
+
+
+def to_incident_frame(df):
+    missing = [column for column in OPTIONAL_COLUMNS if column not in df.columns]
+    df = df.assign(**{column: pd.NaT for column in missing})[COLUMNS].copy()
+    for column, categories in CATEGORIES.items():
+        if categories is None:
+            df[column] = df[column].astype("category")
+        else:
+            df[column] = pd.Categorical(df[column], categories=categories)
+    df["Incident ID"] = parse_incident_ids(df["Incident ID"])
+    for column in TIME_COLUMNS:
+        df[column] = pd.to_datetime(df[column]).astype("datetime64[ns]")
+    return df
+
+
+def format_incident_id(incident_id):
+    return f"{INCIDENT_ID_PREFIX}{incident_id}"
+
+
+def format_create_time(value):
+    return pd.Timestamp(value).strftime(CREATE_TIME_FORMAT)
+
+
+def format_resolved_time(value):
+    return "Unresolved" if pd.isna(value) else format_create_time(value)
+
+
+def parse_incident_id(value):
+    # Single ID from a URL or user input ("INC-1234" or "1234"); None if it is not one
+    try:
+        return int(str(value).strip().removeprefix(INCIDENT_ID_PREFIX))
+    except ValueError:
+        return None
@@ -0,0 +1,233 @@
+# Full-text incident search for the home page's search box.
+#
+# An in-process inverted index over each incident's Title plus its notes (the
+# timeline summary and postmortem text), scored with BM25 (core/bm25.py) like
+# core/similar.py. Every query token must match; tokens ending in "*", and the
+# last token (still being typed), match as prefixes through a sorted
+# vocabulary. Titles repeat a lot, so a batch of incidents is tokenized once
+# per distinct title and its postings are appended as numpy arrays, which
+# keeps indexing a million-row bulk load in the seconds. Stores add every
+# write's incidents as it happens (see IncidentStore.search); documents that
+# are replaced stay in the postings and are masked out at query time.
+import bisect
+import threading
+
+from core import bm25
+from core.bm25 import tokenize
+from core.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+SEARCH_LIMIT = 100
+
+
+def parse_query(query):
+    # [(token, prefix), ...] in query order
+    tokens = []
+    for word in query.split():
+        found = tokenize(word)
+        tokens += [(token, False) for token in found]
+        if found and word.endswith("*"):
+            tokens[-1] = (found[-1], True)
+    if tokens:
+        tokens[-1] = (tokens[-1][0], True)
+    return tokens
+
+
+def notes_text(summary=None, postmortem=None):
+    # Searchable text of an incident's timeline summary and postmortem
+    parts = [item for items in (summary or {}).values() for item in items]
+    return " ".join([*parts, postmortem or ""]).strip()
+
+
+def top_matches(ids, scores, k):
+    """The ``k`` best of ``ids`` by score, ties going to the newest (highest) Incident ID."""
+    if len(ids) > k:
+        threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+        above = np.flatnonzero(scores > threshold)
+        ties = np.flatnonzero(scores == threshold)
+        need = k - len(above)
+        ties = ties[np.argpartition(ids[ties], len(ties) - need)[len(ties) - need:]]
+        keep = np.concatenate([above, ties])
+        ids, scores = ids[keep], scores[keep]
+    order = np.lexsort((-ids, -scores))
+    return ids[order]
+
+
+def _grow(array, size):
+    if size <= len(array):
+        return array
+    grown = np.zeros(max(size, 2 * len(array)), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class SearchIndex:
+    """Inverted index of incident Titles and notes, keyed by Incident ID."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._term_ids = {}  # term -> term id
+        self._postings = []  # term id -> [(docs, term frequencies), ...] chunks
+        self._weights = bm25.TermWeights()  # term id -> (docs, BM25 term weights)
+        self._vocabulary = []  # sorted terms, for prefix lookups
+        self._titles = {}  # title -> title code
+        self._title_terms = []  # title code -> (term ids, term frequencies)
+        self._title_texts = []  # title code -> title
+        self._notes = {}  # Incident ID -> notes text
+        # Per document; a document is one version of an incident
+        self._ids = np.zeros(1024, dtype=np.int64)
+        self._doc_titles = np.zeros(1024, dtype=np.int32)
+        self._lengths = np.zeros(1024, dtype=np.float32)
+        self._alive = np.zeros(1024, dtype=bool)
+        self._docs = 0
+        self._live = 0
+        self._total_length = 0.0
+        # Incident ID -> current document, as sorted parallel arrays
+        self._keys = np.empty(0, dtype=np.int64)
+        self._key_docs = np.empty(0, dtype=np.int64)
+
+    def __len__(self):
+        return self._live
+
+    def _term_counts(self, text):
+        counts = {}
+        for token in tokenize(text):
+            term = self._term_ids.get(token)
+            if term is None:
+                term = self._term_ids[token] = len(self._postings)
+                self._postings.append([])
+                bisect.insort(self._vocabulary, token)
+            counts[term] = counts.get(term, 0) + 1
+        return np.array(list(counts), dtype=np.int64), np.array(list(counts.values()), dtype=np.float32)
+
+    def _title_code(self, title):
+        code = self._titles.get(title)
+        if code is None:
+            code = self._titles[title] = len(self._title_terms)
+            self._title_terms.append(self._term_counts(title))
+            self._title_texts.append(title)
+        return code
+
+    def add(self, ids, titles):
+        # Indexes incidents by Title (plus any notes set for them); re-adding
+        # an Incident ID replaces its document
+        ids = np.asarray(ids, dtype=np.int64)
+        codes, uniques = pd.factorize(pd.Series(titles, dtype=object).to_numpy())
+        with self._lock:
+            title_codes = np.array([self._title_code(str(title)) for title in uniques], dtype=np.int32)
+            self._add(ids, title_codes[codes])
+
+    def set_notes(self, notes):
+        # {Incident ID: notes text}; incidents already indexed are re-indexed with them
+        with self._lock:
+            self._notes.update({int(incident_id): text for incident_id, text in notes.items()})
+            ids = np.array(list(notes), dtype=np.int64)
+            docs = self._current_docs(ids)
+            indexed = docs >= 0
+            if indexed.any():
+                self._add(ids[indexed], self._doc_titles[docs[indexed]])
+
+    def _current_docs(self, ids):
+        # Current document per Incident ID, -1 for IDs not indexed
+        if not len(self._keys):
+            return np.full(len(ids), -1, dtype=np.int64)
+        positions = np.searchsorted(self._keys, ids).clip(max=len(self._keys) - 1)
+        return np.where(self._keys[positions] == ids, self._key_docs[positions], -1)
+
+    def _add(self, ids, title_codes):
+        # The last occurrence of a repeated ID wins
+        ids, last = np.unique(ids[::-1], return_index=True)
+        title_codes = title_codes[::-1][last]
+        old = self._current_docs(ids)
+        replaced = old[old >= 0]
+        self._alive[replaced] = False
+        self._total_length -= float(self._lengths[replaced].sum())
+        self._live -= len(replaced)
+
+        n = len(ids)
+        docs = np.arange(self._docs, self._docs + n)
+        size = self._docs + n
+        self._ids, self._doc_titles = _grow(self._ids, size), _grow(self._doc_titles, size)
+        self._lengths, self._alive = _grow(self._lengths, size), _grow(self._alive, size)
+        self._ids[docs] = ids
+        self._doc_titles[docs] = title_codes
+        self._alive[docs] = True
+        self._docs = size
+        self._live += n
+
+        found = old >= 0
+        positions = np.searchsorted(self._keys, ids)
+        self._key_docs[positions[found]] = docs[found]
+        self._keys = np.insert(self._keys, positions[~found], ids[~found])
+        self._key_docs = np.insert(self._key_docs, positions[~found], docs[~found])
+
+        noted = np.isin(ids, np.fromiter(self._notes, dtype=np.int64, count=len(self._notes)))
+        self._add_title_postings(docs[~noted], title_codes[~noted])
+        for doc, incident_id, code in zip(docs[noted], ids[noted], title_codes[noted]):
+            terms, tfs = self._term_counts(f"{self._title_texts[code]} {self._notes[incident_id]}")
+            self._append_postings(np.full(len(terms), doc), terms, tfs)
+
+    def _add_title_postings(self, docs, title_codes):
+        # Every (document, term) pair of the batch, built from each distinct title's terms
+        if not len(docs):
+            return
+        unique, inverse = np.unique(title_codes, return_inverse=True)
+        terms = [self._title_terms[code] for code in unique]
+        sizes = np.array([len(term_ids) for term_ids, _ in terms])
+        starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        flat_terms = np.concatenate([term_ids for term_ids, _ in terms])
+        flat_tfs = np.concatenate([tfs for _, tfs in terms])
+        repeats = sizes[inverse]
+        offsets = np.arange(repeats.sum()) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+        pairs = np.repeat(starts[inverse], repeats) + offsets
+        self._append_postings(np.repeat(docs, repeats), flat_terms[pairs], flat_tfs[pairs])
+
+    def _append_postings(self, docs, terms, tfs):
+        order = np.argsort(terms, kind="stable")
+        docs, terms, tfs = docs[order], terms[order], tfs[order]
+        self._lengths[docs] = 0
+        np.add.at(self._lengths, docs, tfs)
+        self._total_length += float(tfs.sum())
+        bounds = np.flatnonzero(np.diff(terms)) + 1
+        for start, end in zip(np.concatenate([[0], bounds]), np.concatenate([bounds, [len(terms)]])):
+            term = int(terms[start])
+            self._postings[term].append((docs[start:end].astype(np.int32), tfs[start:end]))
+            self._weights.discard(term)
+
+    def _posting_arrays(self, term):
+        chunks = self._postings[term]
+        return np.concatenate([docs for docs, _ in chunks]), np.concatenate([tfs for _, tfs in chunks])
+
+    def _expand(self, token, prefix):
+        if not prefix:
+            term = self._term_ids.get(token)
+            return [] if term is None else [term]
+        start = bisect.bisect_left(self._vocabulary, token)
+        end = bisect.bisect_left(self._vocabulary, token + "\uffff")
+        return [self._term_ids[term] for term in self._vocabulary[start:end]]
+
+    def match(self, query):
+        """``(ids, scores)`` of every incident matching all tokens of ``query``, unordered."""
+        with self._lock:
+            tokens = parse_query(query)
+            n = self._docs
+            if not tokens or not self._live:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+            average = self._total_length / self._live
+            matched = self._alive[:n].copy()
+            scores = np.zeros(n, dtype=np.float32)
+            for token, prefix in tokens:
+                hit = np.zeros(n, dtype=bool)
+                for term in self._expand(token, prefix):
+                    docs, weights = self._weights.get(
+                        term, average, self._lengths, lambda: self._posting_arrays(term)
+                    )
+                    # Document frequency counts replaced documents too, which only
+                    # matters for incidents whose Title or notes changed
+                    scores[docs] += bm25.idf(self._live, len(docs)) * weights
+                    hit[docs] = True
+                matched &= hit
+            docs = np.flatnonzero(matched)
+            return self._ids[docs], scores[docs]
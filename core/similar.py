@@ -0,0 +1,232 @@
+# Similar-incident retrieval for RCA drafting.
+#
+# Resolved and closed incidents are indexed by their title, summary and
+# postmortem text in an inverted index scored with BM25 (a length-normalised
+# TF-IDF, see core/bm25.py). IDF is computed at query time from document
+# frequencies, so adding a document never rewrites the others and the index
+# grows incrementally.
+# SimilarIncidents keeps the index in step with the incident store through its
+# change feed: each lookup first folds in the incidents written since the last
+# one, so an incident becomes searchable as soon as it is closed. The first
+# build reads summaries and postmortems in bulk and can run on a background
+# thread (start()), so no page waits for it.
+import re
+import threading
+
+from core import bm25
+from core.drafts import POSTMORTEM_SKELETON
+from core.lazy import lazy_import
+from core.schema import RESOLVED_STATES, format_incident_id
+
+np = lazy_import("numpy")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it of on or the to was were with "
+    "tbd incident service".split()
+)
+POSTMORTEM_FIELDS = {"Root Cause": "root_cause", "Mitigation": "mitigation", "Lessons Learned": "lessons"}
+
+_SECTION = re.compile(r"^([A-Z][\w/ ]{2,40}?)\s*:\s*(.*)$")
+
+
+def tokenize(text):
+    return [token for token in bm25.tokenize(text) if token not in STOPWORDS and len(token) > 1]
+
+
+def parse_postmortem_sections(text):
+    # {"root_cause": ..., "mitigation": ..., "lessons": ...} from "- Field: value" lines
+    # or "## Field" headings; bullets below a field belong to it, placeholders like
+    # [TBD] are dropped
+    sections, current = {}, None
+    for line in (text or "").splitlines():
+        line = line.replace("**", "").strip(" -*#\t")
+        match = _SECTION.match(line)
+        if match or line in POSTMORTEM_FIELDS:
+            current = POSTMORTEM_FIELDS.get(match.group(1) if match else line)
+            value = match.group(2).strip() if match else ""
+        else:
+            value = line
+        if current and value and not (value.startswith("[") and value.endswith("]")):
+            sections.setdefault(current, []).append(value)
+    return {field: "; ".join(values) for field, values in sections.items()}
+
+
+def incident_document(incident_data, summary=None, postmortem=None):
+    # (text to index, fields offered to the RCA draft) for one incident
+    summary = summary or {}
+    sections = parse_postmortem_sections(postmortem)
+    known = summary.get("what_we_know", [])
+    done = summary.get("what_has_been_done", [])
+    fields = {
+        "incident_id": incident_data["Incident ID"],
+        "title": incident_data["Title"],
+        "root_cause": sections.get("root_cause") or "; ".join(known),
+        "mitigation": sections.get("mitigation") or "; ".join(done),
+        "lessons": sections.get("lessons", ""),
+    }
+    text = " ".join([incident_data["Title"], str(incident_data.get("Owning Service", "")),
+                     *known, *done, postmortem or ""])
+    return text, fields
+
+
+class SimilarityIndex:
+    def __init__(self):
+        self._postings = {}  # term -> ([doc, ...], [term frequency, ...])
+        self._weights = bm25.TermWeights()
+        self._lengths = np.zeros(1024, dtype=np.float32)
+        self._alive = np.zeros(1024, dtype=bool)
+        self._total_length = 0.0
+        self._fields = []
+        self._doc_for_key = {}
+        self._live = 0
+
+    def __len__(self):
+        return self._live
+
+    def _grow(self, size):
+        if size > len(self._lengths):
+            capacity = max(size, 2 * len(self._lengths))
+            self._lengths = np.resize(self._lengths, capacity)
+            self._alive = np.concatenate([self._alive, np.zeros(capacity - len(self._alive), dtype=bool)])
+
+    def add(self, key, text, fields):
+        # Re-adding a key replaces its previous document
+        self.remove(key)
+        doc = len(self._fields)
+        self._grow(doc + 1)
+        counts = {}
+        for token in tokenize(text):
+            counts[token] = counts.get(token, 0) + 1
+        for term, tf in counts.items():
+            docs, tfs = self._postings.setdefault(term, ([], []))
+            docs.append(doc)
+            tfs.append(tf)
+            self._weights.discard(term)
+        length = sum(counts.values())
+        self._lengths[doc] = length
+        self._alive[doc] = True
+        self._total_length += length
+        self._fields.append(fields)
+        self._doc_for_key[key] = doc
+        self._live += 1
+
+    def remove(self, key):
+        doc = self._doc_for_key.pop(key, None)
+        if doc is not None:
+            # Postings keep the dead document; it is masked out at query time
+            self._alive[doc] = False
+            self._total_length -= self._lengths[doc]
+            self._live -= 1
+
+    def _posting_arrays(self, term):
+        docs, tfs = self._postings[term]
+        return np.array(docs, dtype=np.int64), np.array(tfs, dtype=np.float32)
+
+    def search(self, text, k=5, exclude=None):
+        # [(score, fields), ...] best first
+        if not self._live:
+            return []
+        n = len(self._fields)
+        scores = np.zeros(n, dtype=np.float32)
+        average = self._total_length / self._live
+        for term in set(tokenize(text)):
+            if term not in self._postings:
+                continue
+            docs, weights = self._weights.get(term, average, self._lengths, lambda: self._posting_arrays(term))
+            scores[docs] += bm25.idf(self._live, len(docs)) * weights
+        scores[~self._alive[:n]] = 0
+        if exclude is not None and exclude in self._doc_for_key:
+            scores[self._doc_for_key[exclude]] = 0
+
+        candidates = np.flatnonzero(scores)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(scores[candidates], -k)[-k:]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(float(scores[doc]), self._fields[doc]) for doc in candidates]
+
+
+class SimilarIncidents:
+    """Index of resolved incidents kept current through the store's change feed."""
+
+    def __init__(self, store, summaries=None, drafts=None):
+        # summaries (a SummaryStore) and drafts (a DraftCache, for postmortem
+        # skeletons) are optional; a full build reads each of them in one query
+        self.store = store
+        self.summaries = summaries
+        self.drafts = drafts
+        self.index = SimilarityIndex()
+        self._version = None
+        self._lock = threading.Lock()
+        self._builder = None
+        self._built = threading.Event()
+
+    def _texts(self, incident_ids, bulk):
+        # ({incident_id: summary}, {incident_id: postmortem}) for the given incidents
+        summary_of, postmortem_of = {}, {}
+        if self.summaries is not None:
+            summary_of = self.summaries.summaries() if bulk else {i: self.summaries.get(i)[0] for i in incident_ids}
+        if self.drafts is not None:
+            postmortem_of = (
+                self.drafts.latest_all(POSTMORTEM_SKELETON) if bulk
+                else {i: self.drafts.latest(i, POSTMORTEM_SKELETON) for i in incident_ids}
+            )
+        return summary_of, postmortem_of
+
+    def _index_rows(self, rows, bulk=False):
+        resolved = rows["State"].isin(RESOLVED_STATES).to_numpy()
+        for incident_id in rows["Incident ID"].to_numpy()[~resolved].tolist():
+            self.index.remove(incident_id)
+        rows = rows[resolved]
+        incident_ids = rows["Incident ID"].tolist()
+        summary_of, postmortem_of = self._texts(incident_ids, bulk)
+        # Plain columns rather than row dicts: a full build covers every resolved incident
+        for incident_id, title, service in zip(incident_ids, rows["Title"].astype(str), rows["Owning Service"].astype(str)):
+            incident = {"Incident ID": incident_id, "Title": title, "Owning Service": service}
+            text, fields = incident_document(incident, summary_of.get(incident_id), postmortem_of.get(incident_id))
+            self.index.add(incident_id, text, fields)
+
+    def refresh(self):
+        # Fold in incidents written since the last refresh; rebuild when the
+        # change log no longer reaches back that far
+        if self._version is None:
+            rows, version = None, self.store.version
+        else:
+            rows, version = self.store.changes_since(self._version)
+        if rows is None:
+            self.index = SimilarityIndex()
+            self._index_rows(self.store.query({"State": RESOLVED_STATES}), bulk=True)
+        else:
+            self._index_rows(rows)
+        self._version = version
+
+    def start(self):
+        # Builds the index on a background thread; search() returns None until it is done
+        with self._lock:
+            if self._builder is None:
+                self._builder = threading.Thread(target=self._build, name="similar-index", daemon=True)
+                self._builder.start()
+        return self
+
+    def _build(self):
+        try:
+            with self._lock:
+                self.refresh()
+        finally:
+            self._built.set()
+
+    @property
+    def building(self):
+        return self._builder is not None and not self._built.is_set()
+
+    def search(self, incident_data, k=3, summary=None):
+        # [(score, fields), ...] best first, or None while a background build is running
+        if self.building:
+            return None
+        text, _ = incident_document(incident_data, summary)
+        with self._lock:
+            self.refresh()
+            return self.index.search(text, k, exclude=incident_data["Incident ID"])
+
+
+def format_match(fields):
+    return f"{format_incident_id(fields['incident_id'])}: {fields['title']}"
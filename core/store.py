@@ -0,0 +1,781 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, replace
+
+from core.lazy import lazy_import
+from core.rollups import ROLLUP_COLUMNS, RollupCounters, empty_created, empty_resolved
+from core.search import SEARCH_LIMIT, SearchIndex, top_matches
+from core.schema import COLUMNS, INDEXED_COLUMNS, SORT_COLUMNS, TIME_COLUMNS, to_incident_frame
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Display column name -> SQL column name
+SQL_COLUMNS = {
+    "Type": "type",
+    "Incident ID": "incident_id",
+    "Severity": "severity",
+    "State": "state",
+    "Title": "title",
+    "Create Time": "create_time",
+    "Owning Service": "owning_service",
+    "Owner": "owner",
+    "Resolved Time": "resolved_time",
+}
+
+# Create and Resolved Time are stored as sortable ISO text in SQLite (NULL while unresolved)
+SQL_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Rollup tables (see core/rollups.py), kept current by triggers on the incidents table
+_HOUR = "substr({row}create_time, 1, 13) || ':00:00'"
+_RESOLVED_HOUR = "substr({row}resolved_time, 1, 13) || ':00:00'"
+_HOURS_TO_RESOLVE = "(julianday({row}resolved_time) - julianday({row}create_time)) * 24"
+ROLLUP_TABLES = [
+    "CREATE TABLE IF NOT EXISTS rollup_created (bucket TEXT, severity TEXT, state TEXT, owning_service TEXT, "
+    "incidents INTEGER, PRIMARY KEY (bucket, severity, state, owning_service)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS rollup_resolved (bucket TEXT, severity TEXT, owning_service TEXT, "
+    "incidents INTEGER, hours REAL, PRIMARY KEY (bucket, severity, owning_service)) WITHOUT ROWID",
+]
+_ROLLUP_ADD = f"""
+    INSERT INTO rollup_created VALUES ({_HOUR}, {{row}}severity, {{row}}state, {{row}}owning_service, 1)
+        ON CONFLICT (bucket, severity, state, owning_service) DO UPDATE SET incidents = incidents + 1;
+    INSERT INTO rollup_resolved
+        SELECT {_RESOLVED_HOUR}, {{row}}severity, {{row}}owning_service, 1, {_HOURS_TO_RESOLVE}
+        WHERE {{row}}resolved_time IS NOT NULL
+        ON CONFLICT (bucket, severity, owning_service) DO UPDATE
+        SET incidents = incidents + 1, hours = hours + excluded.hours;"""
+_ROLLUP_REMOVE = f"""
+    UPDATE rollup_created SET incidents = incidents - 1
+        WHERE bucket = {_HOUR} AND severity = {{row}}severity AND state = {{row}}state
+        AND owning_service = {{row}}owning_service;
+    UPDATE rollup_resolved SET incidents = incidents - 1, hours = hours - {_HOURS_TO_RESOLVE}
+        WHERE {{row}}resolved_time IS NOT NULL AND bucket = {_RESOLVED_HOUR} AND severity = {{row}}severity
+        AND owning_service = {{row}}owning_service;"""
+ROLLUP_TRIGGERS = {
+    "rollup_insert": "AFTER INSERT ON incidents BEGIN" + _ROLLUP_ADD.format(row="NEW.") + " END",
+    "rollup_delete": "AFTER DELETE ON incidents BEGIN" + _ROLLUP_REMOVE.format(row="OLD.") + " END",
+    "rollup_update": "AFTER UPDATE OF create_time, resolved_time, severity, state, owning_service ON incidents BEGIN"
+                     + _ROLLUP_REMOVE.format(row="OLD.") + _ROLLUP_ADD.format(row="NEW.") + " END",
+}
+ROLLUP_REBUILD = [
+    "DELETE FROM rollup_created",
+    "DELETE FROM rollup_resolved",
+    f"INSERT INTO rollup_created SELECT {_HOUR.format(row='')}, severity, state, owning_service, COUNT(*) "
+    "FROM incidents GROUP BY 1, 2, 3, 4",
+    f"INSERT INTO rollup_resolved SELECT {_RESOLVED_HOUR.format(row='')}, severity, owning_service, COUNT(*), "
+    f"SUM({_HOURS_TO_RESOLVE.format(row='')}) FROM incidents WHERE resolved_time IS NOT NULL GROUP BY 1, 2, 3",
+]
+
+# Incident IDs per query when fetching ranked search matches
+SEARCH_BATCH = 10_000
+
+# How many distinct filter combinations keep their match set / count cached
+FILTER_CACHE_SIZE = 32
+
+# Recently opened incidents kept for point lookups by ID
+HOT_INCIDENTS = 128
+
+# Writes remembered by the change feed; older readers must reload in full
+CHANGE_LOG_SIZE = 1000
+# A change set larger than this is cheaper to reload than to merge; the log
+# does not keep the IDs of larger writes (bulk loads), only that they happened
+MAX_CHANGED_ROWS = 5000
+
+
+def _no_rows():
+    return np.empty(0, dtype=np.int64)
+
+
+def _active_filters(filters):
+    # Drop empty multiselects so "no selection" means "no filter"
+    return {column: list(values) for column, values in (filters or {}).items() if values}
+
+
+def _filter_key(filters):
+    return tuple(sorted((column, tuple(values)) for column, values in _active_filters(filters).items()))
+
+
+def _sql_time(value):
+    return None if pd.isna(value) else pd.Timestamp(value).strftime(SQL_TIME_FORMAT)
+
+
+def _page_result(page_df, limit):
+    # Pages are fetched with one extra row so we know whether a next page exists
+    if len(page_df) <= limit:
+        return page_df.reset_index(drop=True), None
+    page_df = page_df.iloc[:limit].reset_index(drop=True)
+    last = page_df.iloc[-1]
+    return page_df, (last["Create Time"], last["Incident ID"])
+
+
+class LRUCache:
+    def __init__(self, max_entries):
+        self._entries = OrderedDict()
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class IncidentStore:
+    """Interface for incident backends.
+
+    Filters are passed as ``{column: [values]}`` using the incident DataFrame
+    column names, and results are always ordered newest first. ``query_page``
+    is the keyset-paginated read: ``after`` is the cursor returned for the
+    previous page, a ``(Create Time, Incident ID)`` tuple, or None for the
+    first page.
+
+    Callbacks registered with ``subscribe`` are called with the affected
+    Incident IDs after every write, which is how read caches get invalidated.
+
+    ``get`` is the point lookup by Incident ID, served from a small cache of
+    hot incidents in front of each backend's ID index.
+
+    Every write also bumps ``version`` and is recorded in a bounded change
+    log; ``changes_since`` returns only the incidents written after a given
+    version or timestamp, so live views can refresh by delta.
+
+    ``bulk_load`` takes an iterable of incident frames for large imports;
+    backends may defer index maintenance until the last one is loaded.
+
+    ``created_rollup`` and ``resolved_rollup`` return the hourly rollups the
+    metrics page charts (see core/rollups.py); backends keep them current on
+    every write instead of aggregating the incidents on read.
+
+    ``search`` is the full-text search over Titles and the notes passed to
+    ``set_search_notes`` (summaries, postmortems). Its index is built from the
+    store on the first search and from then on updated by every write.
+    """
+
+    def __init__(self):
+        self._listeners = []
+        self._hot = LRUCache(HOT_INCIDENTS)
+        self._log_lock = threading.Lock()
+        self._log = deque(maxlen=CHANGE_LOG_SIZE)
+        self.version = 0
+        self._search = SearchIndex()
+        self._search_lock = threading.Lock()
+        self._search_built = False
+
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+
+    def _notify(self, incident_ids):
+        if len(incident_ids) > HOT_INCIDENTS:
+            self._hot.clear()
+        else:
+            for incident_id in incident_ids:
+                self._hot.discard(incident_id)
+        for callback in self._listeners:
+            callback(incident_ids)
+        # Bumped last, so a reader that sees the new version also sees cleared caches
+        with self._log_lock:
+            self.version += 1
+            logged = incident_ids if len(incident_ids) <= MAX_CHANGED_ROWS else None
+            self._log.append((self.version, time.time(), logged))
+
+    def changes_since(self, version=None, timestamp=None):
+        """Incidents written after ``version`` (or after ``timestamp``).
+
+        Returns ``(rows, version)`` with the current state of every changed
+        incident and the version they bring the caller up to. ``rows`` is None
+        when the log no longer reaches back far enough or the change set is too
+        large to merge, in which case the caller should reload.
+        """
+        with self._log_lock:
+            current = self.version
+            if timestamp is not None:
+                # Version as of the timestamp: the last write at or before it
+                newer = sum(1 for _, written_at, _ in self._log if written_at > timestamp)
+                if self._log and newer == len(self._log) and self._log[0][0] > 1:
+                    return None, current  # earlier writes after the timestamp were dropped
+                version = current - newer
+            if version >= current:
+                return self._frame_for_ids([]), current
+            if current - version > len(self._log):
+                return None, current
+            entries = list(self._log)[len(self._log) - (current - version):]
+        if any(ids is None for _, _, ids in entries):
+            return None, current
+        incident_ids = {incident_id for _, _, ids in entries for incident_id in ids}
+        if len(incident_ids) > MAX_CHANGED_ROWS:
+            return None, current
+        return self._frame_for_ids(list(incident_ids)), current
+
+    def _frame_for_ids(self, incident_ids):
+        raise NotImplementedError
+
+    def get(self, incident_id):
+        incident = self._hot.get(incident_id)
+        if incident is None:
+            incident = self._lookup(incident_id)
+            if incident is None:
+                return None
+            self._hot.put(incident_id, incident)
+        # Callers get their own copy so they cannot mutate the cached entry
+        return dict(incident)
+
+    def _lookup(self, incident_id):
+        raise NotImplementedError
+
+    def add_incidents(self, df):
+        raise NotImplementedError
+
+    def bulk_load(self, chunks):
+        # Returns the number of incidents loaded
+        loaded = 0
+        for df in chunks:
+            self.add_incidents(df)
+            loaded += len(df)
+        return loaded
+
+    def incident_ids(self):
+        # Every stored Incident ID as an int64 array
+        raise NotImplementedError
+
+    def update_incident(self, incident_id, changes):
+        raise NotImplementedError
+
+    def query(self, filters=None, offset=0, limit=None):
+        raise NotImplementedError
+
+    def query_page(self, filters=None, after=None, limit=10):
+        raise NotImplementedError
+
+    def count(self, filters=None):
+        raise NotImplementedError
+
+    def _search_index(self):
+        with self._search_lock:
+            if not self._search_built:
+                self._search.add(*self._titles())
+                self._search_built = True
+        return self._search
+
+    def _index_titles(self, incident_ids, titles):
+        # Backends call this once a write that adds incidents or changes a Title is visible
+        with self._search_lock:
+            if self._search_built:
+                self._search.add(incident_ids, titles)
+
+    def set_search_notes(self, notes):
+        # {Incident ID: text} searched along with the incident's Title
+        self._search.set_notes(notes)
+
+    def search(self, query, filters=None, limit=SEARCH_LIMIT):
+        """Incidents matching every token of ``query``, best match first.
+
+        Matches are ranked by BM25 and then newest first; filters are applied
+        to the ranked matches, widening the ranked window until ``limit``
+        incidents pass or every match has been checked.
+        """
+        ids, scores = self._search_index().match(query)
+        wanted = limit
+        while True:
+            ranked = top_matches(ids, scores, wanted)
+            if _active_filters(filters):
+                ranked = ranked[self._filter_mask(ranked, filters)]
+            if len(ranked) >= limit or wanted >= len(ids):
+                break
+            wanted *= 8
+        ranked = ranked[:limit]
+        rows = self._frame_for_ids(ranked.tolist())
+        return rows.iloc[np.argsort(pd.Index(ranked).get_indexer(rows["Incident ID"]))].reset_index(drop=True)
+
+    def _titles(self):
+        # (Incident IDs, Titles) of every stored incident
+        raise NotImplementedError
+
+    def _filter_mask(self, incident_ids, filters):
+        # Which of incident_ids match filters
+        raise NotImplementedError
+
+    def created_rollup(self):
+        raise NotImplementedError
+
+    def resolved_rollup(self):
+        raise NotImplementedError
+
+
+def _build_indexes(df, columns):
+    # {column: {value: row positions}}; filter columns are categoricals, so
+    # their codes already are the index keys
+    index = {}
+    for column in columns:
+        values = df[column].cat
+        codes = values.codes.to_numpy()
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(values.categories) + 1))
+        index[column] = {
+            category: order[bounds[i]:bounds[i + 1]]
+            for i, category in enumerate(values.categories)
+        }
+    return index
+
+
+def _move_positions(column_index, positions, old_values, value):
+    # Copy of one column's {value: row positions} with positions moved from
+    # their old values to value; position arrays stay sorted
+    column_index = dict(column_index)
+    for position, old in zip(positions.tolist(), old_values.tolist()):
+        if old == value:
+            continue
+        if old in column_index:
+            rows = column_index[old]
+            column_index[old] = np.delete(rows, np.searchsorted(rows, position))
+        rows = column_index.get(value, _no_rows())
+        column_index[value] = np.insert(rows, np.searchsorted(rows, position), position)
+    return column_index
+
+
+@dataclass(frozen=True, slots=True)
+class _Snapshot:
+    # Everything a MemoryIncidentStore read needs, replaced as a whole on each
+    # write so a reader that holds one never sees a half-applied update
+    df: object
+    ids: object  # Incident ID column, in sort order
+    times_asc: object  # Create Time column, ascending
+    id_index: object  # Hash-based Index over the IDs; get_loc is an O(1) probe
+    index: dict  # filter column -> {value: row positions}
+    matches: LRUCache  # filter key -> row positions, valid for this snapshot only
+
+
+class MemoryIncidentStore(IncidentStore):
+    """Columnar in-memory backend.
+
+    Rows are kept physically sorted by (Create Time, Incident ID) descending,
+    which acts as the clustered Create Time index, and each filter column keeps
+    a value -> row positions index so filtering never scans the string columns.
+    Reads work on an immutable snapshot of the table and its indexes; writes
+    build the next snapshot and publish it in one assignment.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._snapshot = self._snapshot_of(to_incident_frame(pd.DataFrame(columns=COLUMNS)))
+        self._rollups = RollupCounters()
+
+    @staticmethod
+    def _snapshot_of(df):
+        ids = df["Incident ID"].to_numpy()
+        return _Snapshot(
+            df=df,
+            ids=ids,
+            times_asc=df["Create Time"].to_numpy()[::-1],
+            id_index=pd.Index(ids),
+            index=_build_indexes(df, INDEXED_COLUMNS),
+            matches=LRUCache(FILTER_CACHE_SIZE),
+        )
+
+    def add_incidents(self, df):
+        df = to_incident_frame(df)
+        self._append([df])
+        self._notify(df["Incident ID"].tolist())
+
+    def bulk_load(self, chunks):
+        # Chunks are only converted while loading; the table is sorted and
+        # indexed once, after the last one
+        frames = [to_incident_frame(df) for df in chunks]
+        if not frames:
+            return 0
+        self._append(frames)
+        incident_ids = np.concatenate([df["Incident ID"].to_numpy() for df in frames])
+        self._notify(incident_ids)
+        return len(incident_ids)
+
+    def _append(self, frames):
+        with self._lock:
+            combined = to_incident_frame(pd.concat([self._snapshot.df, *frames], ignore_index=True))
+            combined = combined.sort_values(SORT_COLUMNS, ascending=False, ignore_index=True)
+            self._snapshot = self._snapshot_of(combined)
+            for df in frames:
+                self._rollups.add(df)
+        for df in frames:
+            self._index_titles(df["Incident ID"].to_numpy(), df["Title"])
+
+    def incident_ids(self):
+        return self._snapshot.ids
+
+    def update_incident(self, incident_id, changes):
+        # Rows are clustered on the sort key, so it cannot change in place
+        if any(column in SORT_COLUMNS for column in changes):
+            raise ValueError(f"Cannot update sort columns {SORT_COLUMNS}")
+        with self._lock:
+            snapshot = self._snapshot
+            rows = self._id_rows(incident_id, snapshot)
+            # Row positions as an array, so the rows stay a frame even for a single match
+            positions = np.atleast_1d(np.arange(len(snapshot.df))[rows])
+            before = snapshot.df.iloc[positions]
+            # Copy on write per column: the new frame shares every column the
+            # update leaves alone with the current snapshot
+            df = snapshot.df.copy(deep=False)
+            for column, value in changes.items():
+                values = df[column].copy()
+                if isinstance(values.dtype, pd.CategoricalDtype) and value not in values.cat.categories:
+                    values = values.cat.add_categories([value])
+                values.iloc[positions] = value
+                df[column] = values
+            # IDs and Create Times cannot change, so their arrays and the ID
+            # index carry over; changed rows move between filter index entries
+            indexed = [column for column in changes if column in INDEXED_COLUMNS]
+            if indexed:
+                index = dict(snapshot.index)
+                for column in indexed:
+                    index[column] = _move_positions(index[column], positions, before[column], changes[column])
+                self._snapshot = replace(snapshot, df=df, index=index, matches=LRUCache(FILTER_CACHE_SIZE))
+            else:
+                self._snapshot = replace(snapshot, df=df)
+            if any(column in ROLLUP_COLUMNS for column in changes):
+                self._rollups.remove(before)
+                self._rollups.add(df.iloc[positions])
+        if "Title" in changes:
+            self._index_titles([incident_id], [changes["Title"]])
+        self._notify([incident_id])
+
+    def _id_rows(self, incident_id, snapshot):
+        # Row positions holding incident_id (a slice or mask when IDs repeat)
+        try:
+            return snapshot.id_index.get_loc(incident_id)
+        except KeyError:
+            return _no_rows()
+
+    def _frame_for_ids(self, incident_ids):
+        snapshot = self._snapshot
+        positions = snapshot.id_index.get_indexer_for(incident_ids) if incident_ids else _no_rows()
+        return snapshot.df.iloc[np.sort(positions[positions >= 0])].reset_index(drop=True)
+
+    def _lookup(self, incident_id):
+        snapshot = self._snapshot
+        rows = self._id_rows(incident_id, snapshot)
+        if isinstance(rows, (int, np.integer)):
+            return snapshot.df.iloc[rows].to_dict()
+        matches = snapshot.df.iloc[rows]
+        return None if matches.empty else matches.iloc[0].to_dict()
+
+    def _positions(self, filters, snapshot):
+        # Row positions matching every filter, in sort order; None means all rows
+        filters = _active_filters(filters)
+        if not filters:
+            return None
+
+        key = _filter_key(filters)
+        positions = snapshot.matches.get(key)
+        if positions is None:
+            positions = self._match(filters, snapshot)
+            snapshot.matches.put(key, positions)
+        return positions
+
+    def _match(self, filters, snapshot):
+        mask = None
+        for column, values in filters.items():
+            column_mask = np.zeros(len(snapshot.df), dtype=bool)
+            for value in values:
+                column_mask[snapshot.index[column].get(value, _no_rows())] = True
+            mask = column_mask if mask is None else mask & column_mask
+        return np.flatnonzero(mask)
+
+    def query(self, filters=None, offset=0, limit=None):
+        snapshot = self._snapshot
+        positions = self._positions(filters, snapshot)
+        end = None if limit is None else offset + limit
+        if positions is None:
+            return snapshot.df.iloc[offset:end].reset_index(drop=True)
+        return snapshot.df.iloc[positions[offset:end]].reset_index(drop=True)
+
+    def _seek(self, after, snapshot):
+        # First row position strictly after the cursor in (Create Time, Incident ID) DESC order
+        create_time, incident_id = after
+        create_time = pd.Timestamp(create_time).to_datetime64()
+        times_asc = snapshot.times_asc
+        n = len(times_asc)
+        band_start = n - np.searchsorted(times_asc, create_time, side="right")
+        band_end = n - np.searchsorted(times_asc, create_time, side="left")
+        # Rows sharing the cursor's Create Time are ordered by Incident ID descending
+        band_ids = snapshot.ids[band_start:band_end][::-1]
+        return band_end - np.searchsorted(band_ids, incident_id, side="left")
+
+    def query_page(self, filters=None, after=None, limit=10):
+        snapshot = self._snapshot
+        start = 0 if after is None else self._seek(after, snapshot)
+        positions = self._positions(filters, snapshot)
+        if positions is None:
+            page_df = snapshot.df.iloc[start:start + limit + 1]
+        else:
+            first = np.searchsorted(positions, start)
+            page_df = snapshot.df.iloc[positions[first:first + limit + 1]]
+        return _page_result(page_df, limit)
+
+    def count(self, filters=None):
+        snapshot = self._snapshot
+        positions = self._positions(filters, snapshot)
+        return len(snapshot.df) if positions is None else len(positions)
+
+    def _titles(self):
+        df = self._snapshot.df
+        return df["Incident ID"].to_numpy(), df["Title"]
+
+    def _filter_mask(self, incident_ids, filters):
+        snapshot = self._snapshot
+        rows = snapshot.df.iloc[snapshot.id_index.get_indexer_for(incident_ids)]
+        mask = np.ones(len(rows), dtype=bool)
+        for column, values in _active_filters(filters).items():
+            mask &= rows[column].isin(values).to_numpy()
+        return np.isin(incident_ids, rows["Incident ID"].to_numpy()[mask])
+
+    def created_rollup(self):
+        return self._rollups.created()
+
+    def resolved_rollup(self):
+        return self._rollups.resolved()
+
+
+class SQLiteIncidentStore(IncidentStore):
+    """SQLite backend with a (filter column, Create Time) index per filter column.
+
+    The rollup tables are maintained by triggers on the incidents table, so
+    they change in the same transaction as the rows they summarize.
+    """
+
+    def __init__(self, path=":memory:"):
+        super().__init__()
+        # Streamlit runs every session on its own thread; access is serialized by the lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._counts = LRUCache(FILTER_CACHE_SIZE)
+        self._create_schema()
+
+    def _create_schema(self):
+        columns = ", ".join(
+            f"{SQL_COLUMNS[column]} {'INTEGER' if column == 'Incident ID' else 'TEXT'}"
+            for column in COLUMNS
+        )
+        with self._lock, self._conn:
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS incidents ({columns})")
+            # Files created before a column was added to the schema get it as NULLs
+            existing = {row[1] for row in self._conn.execute("PRAGMA table_info(incidents)")}
+            for column in COLUMNS:
+                if SQL_COLUMNS[column] not in existing:
+                    self._conn.execute(f"ALTER TABLE incidents ADD COLUMN {SQL_COLUMNS[column]} TEXT")
+            # Files created before the composite indexes still have the single-column ones
+            for column in INDEXED_COLUMNS:
+                self._conn.execute(f"DROP INDEX IF EXISTS idx_incidents_{SQL_COLUMNS[column]}")
+            self._create_indexes()
+            # Files created before the rollup tables existed get them built from their rows
+            tables = {row[0] for row in self._conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            for sql in ROLLUP_TABLES:
+                self._conn.execute(sql)
+            if "rollup_created" not in tables:
+                self._rebuild_rollups()
+            self._create_triggers()
+
+    def _create_triggers(self):
+        for name, body in ROLLUP_TRIGGERS.items():
+            self._conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+
+    def _rebuild_rollups(self):
+        for sql in ROLLUP_REBUILD:
+            self._conn.execute(sql)
+
+    def _indexes(self):
+        # {index name: indexed columns}; each filter column index continues in
+        # list order, so a filtered page is a seek to the keyset cursor and a
+        # walk of the next rows instead of a sort of every matching row
+        order = "create_time DESC, incident_id DESC"
+        indexes = {
+            f"idx_incidents_{SQL_COLUMNS[column]}_created": f"{SQL_COLUMNS[column]}, {order}"
+            for column in INDEXED_COLUMNS
+        }
+        indexes["idx_incidents_create_time"] = order
+        indexes["idx_incidents_incident_id"] = "incident_id"
+        return indexes
+
+    def _create_indexes(self):
+        for name, columns in self._indexes().items():
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON incidents ({columns})")
+
+    def add_incidents(self, df):
+        df = to_incident_frame(df)
+        for column in TIME_COLUMNS:
+            times = df[column].dt.strftime(SQL_TIME_FORMAT).astype(object)
+            df[column] = times.where(df[column].notna(), None)
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        names = ", ".join(SQL_COLUMNS[column] for column in COLUMNS)
+        rows = df.itertuples(index=False, name=None)
+        with self._lock, self._conn:
+            self._conn.executemany(f"INSERT INTO incidents ({names}) VALUES ({placeholders})", rows)
+        self._counts.clear()
+        self._index_titles(df["Incident ID"].to_numpy(), df["Title"])
+        self._notify(df["Incident ID"].tolist())
+
+    def bulk_load(self, chunks):
+        # Loading into an empty table skips index maintenance: rows go in
+        # without the indexes, which are then built once, a sort per index
+        # rather than a B-tree insert per row and index. The rollup triggers
+        # are dropped too and the rollups rebuilt with one GROUP BY per table
+        if self.count() > 0:
+            return super().bulk_load(chunks)
+        with self._lock, self._conn:
+            for name in self._indexes():
+                self._conn.execute(f"DROP INDEX IF EXISTS {name}")
+            for name in ROLLUP_TRIGGERS:
+                self._conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        try:
+            return super().bulk_load(chunks)
+        finally:
+            with self._lock, self._conn:
+                self._create_indexes()
+                self._rebuild_rollups()
+                self._create_triggers()
+
+    def incident_ids(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT incident_id FROM incidents").fetchall()
+        return np.array([row[0] for row in rows], dtype=np.int64)
+
+    def update_incident(self, incident_id, changes):
+        assignments = ", ".join(f"{SQL_COLUMNS[column]} = ?" for column in changes)
+        values = [_sql_time(value) if column in TIME_COLUMNS else value for column, value in changes.items()]
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE incidents SET {assignments} WHERE incident_id = ?",
+                [*values, int(incident_id)],
+            )
+        self._counts.clear()
+        if "Title" in changes:
+            self._index_titles([incident_id], [changes["Title"]])
+        self._notify([incident_id])
+
+    def _where(self, filters, after=None, use_indexes=True):
+        # use_indexes=False keeps SQLite off the filter column indexes (a unary +
+        # on the column), for queries better served by the Incident ID index
+        clauses, params = [], []
+        for column, values in _active_filters(filters).items():
+            name = SQL_COLUMNS[column] if use_indexes else f"+{SQL_COLUMNS[column]}"
+            clauses.append(f"{name} IN ({', '.join('?' for _ in values)})")
+            params.extend(values)
+        if after is not None:
+            create_time, incident_id = after
+            clauses.append("(create_time, incident_id) < (?, ?)")
+            params.extend([pd.Timestamp(create_time).strftime(SQL_TIME_FORMAT), int(incident_id)])
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def _select(self, where, params, limit, offset=0):
+        select = ", ".join(f'{SQL_COLUMNS[column]} AS "{column}"' for column in COLUMNS)
+        sql = f"SELECT {select} FROM incidents{where} ORDER BY create_time DESC, incident_id DESC"
+        sql += " LIMIT ? OFFSET ?"
+        params = params + [-1 if limit is None else limit, offset]
+        with self._lock:
+            df = pd.read_sql_query(sql, self._conn, params=params)
+        return to_incident_frame(df)
+
+    def query(self, filters=None, offset=0, limit=None):
+        where, params = self._where(filters)
+        return self._select(where, params, limit, offset)
+
+    def _frame_for_ids(self, incident_ids):
+        if not incident_ids:
+            return self._select(" WHERE 0", [], limit=0)
+        placeholders = ", ".join("?" for _ in incident_ids)
+        return self._select(f" WHERE incident_id IN ({placeholders})", [int(i) for i in incident_ids], limit=None)
+
+    def _lookup(self, incident_id):
+        matches = self._select(" WHERE incident_id = ?", [int(incident_id)], limit=1)
+        return None if matches.empty else matches.iloc[0].to_dict()
+
+    def query_page(self, filters=None, after=None, limit=10):
+        where, params = self._where(filters, after)
+        return _page_result(self._select(where, params, limit + 1), limit)
+
+    def count(self, filters=None):
+        # Counts are cached per filter combination until the next write
+        key = _filter_key(filters)
+        total = self._counts.get(key)
+        if total is None:
+            where, params = self._where(filters)
+            with self._lock:
+                total = self._conn.execute(f"SELECT COUNT(*) FROM incidents{where}", params).fetchone()[0]
+            self._counts.put(key, total)
+        return total
+
+    def _titles(self):
+        with self._lock:
+            df = pd.read_sql_query("SELECT incident_id, title FROM incidents", self._conn)
+        return df["incident_id"].to_numpy(), df["title"]
+
+    def _filter_mask(self, incident_ids, filters):
+        # Probes the Incident ID index in batches that stay under SQLite's
+        # bound-parameter limit
+        where, params = self._where(filters, use_indexes=False)
+        matching = []
+        for start in range(0, len(incident_ids), SEARCH_BATCH):
+            batch = [int(incident_id) for incident_id in incident_ids[start:start + SEARCH_BATCH]]
+            placeholders = ", ".join("?" for _ in batch)
+            with self._lock:
+                matching += self._conn.execute(
+                    f"SELECT incident_id FROM incidents{where} AND incident_id IN ({placeholders})", params + batch
+                ).fetchall()
+        return np.isin(incident_ids, np.array([row[0] for row in matching], dtype=np.int64))
+
+    def _rollup(self, sql, empty):
+        with self._lock:
+            df = pd.read_sql_query(sql, self._conn)
+        if df.empty:
+            return empty()
+        return df.assign(Bucket=pd.to_datetime(df["Bucket"], format=SQL_TIME_FORMAT).astype("datetime64[ns]"))
+
+    def created_rollup(self):
+        # Rows whose incidents all moved elsewhere stay behind at zero
+        return self._rollup(
+            'SELECT bucket AS "Bucket", severity AS "Severity", state AS "State", '
+            'owning_service AS "Owning Service", incidents AS "Incidents" FROM rollup_created WHERE incidents > 0',
+            empty_created,
+        )
+
+    def resolved_rollup(self):
+        return self._rollup(
+            'SELECT bucket AS "Bucket", severity AS "Severity", owning_service AS "Owning Service", '
+            'incidents AS "Incidents", hours AS "Hours" FROM rollup_resolved WHERE incidents > 0',
+            empty_resolved,
+        )
+
+
+def open_store(backend="memory", path=None):
+    if backend == "memory":
+        return MemoryIncidentStore()
+    if backend == "sqlite":
+        return SQLiteIncidentStore(path or ":memory:")
+    raise ValueError(f"Unknown incident store backend: {backend}")
+
+
+def open_store_from_env():
+    # INCIDENT_STORE selects the backend ("memory" or "sqlite"), INCIDENT_STORE_PATH the SQLite file
+    return open_store(os.environ.get("INCIDENT_STORE", "memory"), os.environ.get("INCIDENT_STORE_PATH"))
@@ -0,0 +1,189 @@
+# Incident summaries from timeline events, map-reduce style.
+#
+# The timeline is split into fixed-size chunks that are summarized
+# independently (map) and the partial summaries are merged in a bounded
+# fan-in tree (reduce). Each stored summary remembers how many events it
+# covers, so when new events arrive only those are summarized and folded into
+# the existing summary: cost per update depends on the number of new events,
+# not on the length of the incident's history.
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.schema import format_incident_id
+
+SUMMARY_CACHE_PATH = os.path.join(".cache", "summaries.sqlite3")
+SECTIONS = ["what_we_know", "what_has_been_done", "customer_communication"]
+CHUNK_EVENTS = 50  # events per map call
+REDUCE_FANIN = 8  # partial summaries per reduce call
+MAX_BULLETS = 4  # per section
+MAP_WORKERS = 4
+SUMMARY_PARAMS = {"temperature": 0.2, "max_tokens": 400}
+
+SECTION_GUIDE = f"""Reply with JSON only, shaped like
+{{"what_we_know": [...], "what_has_been_done": [...], "customer_communication": [...]}}
+with at most {MAX_BULLETS} short bullet strings per list: findings and impact, actions taken, and what was communicated to customers."""
+
+
+def _format_events(events):
+    return "\n".join(
+        f"- [{event['time']:%Y-%m-%d %H:%M}] ({event['kind']}, {event['author']}) {event['text']}"
+        for event in events
+    )
+
+
+def _format_summary(summary):
+    return json.dumps({section: summary.get(section, []) for section in SECTIONS})
+
+
+def _header(incident_data):
+    return (f"Incident {format_incident_id(incident_data['Incident ID'])}: {incident_data['Title']} "
+            f"({incident_data['Severity']}, {incident_data['Owning Service']})")
+
+
+def build_map_prompt(incident_data, events):
+    return f"""You are an incident commander summarizing an incident timeline.
+{_header(incident_data)}
+
+Timeline events:
+{_format_events(events)}
+
+{SECTION_GUIDE}
+"""
+
+
+def build_reduce_prompt(incident_data, summaries):
+    parts = "\n".join(_format_summary(summary) for summary in summaries)
+    return f"""You are an incident commander merging partial summaries of one incident, oldest first.
+{_header(incident_data)}
+
+Partial summaries:
+{parts}
+
+Merge them into one summary; prefer the most recent state where they disagree.
+{SECTION_GUIDE}
+"""
+
+
+def build_update_prompt(incident_data, summary, events):
+    return f"""You are an incident commander keeping an incident summary current.
+{_header(incident_data)}
+
+Current summary:
+{_format_summary(summary)}
+
+New timeline events since then:
+{_format_events(events)}
+
+Update the summary with the new events; prefer the most recent state where they disagree.
+{SECTION_GUIDE}
+"""
+
+
+def parse_summary(text):
+    # Tolerates prose or code fences around the JSON; anything unparseable
+    # becomes "what we know" bullets rather than an error
+    start, end = text.find("{"), text.rfind("}")
+    if start != -1 and end > start:
+        try:
+            data = json.loads(text[start:end + 1])
+        except ValueError:
+            data = None
+        if isinstance(data, dict):
+            return {
+                section: [str(item) for item in data.get(section) or []][:MAX_BULLETS]
+                for section in SECTIONS
+            }
+    lines = [line.strip(" -*\t") for line in text.splitlines() if line.strip(" -*\t")]
+    return {"what_we_know": lines[:MAX_BULLETS], "what_has_been_done": [], "customer_communication": []}
+
+
+def _complete(client, prompt):
+    return parse_summary(client.complete(prompt, **SUMMARY_PARAMS))
+
+
+def _map(client, incident_data, events):
+    chunks = [events[i:i + CHUNK_EVENTS] for i in range(0, len(events), CHUNK_EVENTS)]
+    if len(chunks) == 1:
+        return [_complete(client, build_map_prompt(incident_data, chunks[0]))]
+    with ThreadPoolExecutor(max_workers=MAP_WORKERS) as pool:
+        return list(pool.map(lambda chunk: _complete(client, build_map_prompt(incident_data, chunk)), chunks))
+
+
+def _reduce(client, incident_data, summaries):
+    while len(summaries) > 1:
+        groups = [summaries[i:i + REDUCE_FANIN] for i in range(0, len(summaries), REDUCE_FANIN)]
+        summaries = [
+            group[0] if len(group) == 1 else _complete(client, build_reduce_prompt(incident_data, group))
+            for group in groups
+        ]
+    return summaries[0]
+
+
+def summarize_events(client, incident_data, events, summary=None):
+    # Full map-reduce when there is no summary yet; otherwise fold the new
+    # events into it (one call when they fit in a single chunk)
+    if summary is None:
+        return _reduce(client, incident_data, _map(client, incident_data, events))
+    if len(events) <= CHUNK_EVENTS:
+        return _complete(client, build_update_prompt(incident_data, summary, events))
+    return _reduce(client, incident_data, [summary] + _map(client, incident_data, events))
+
+
+class SummaryStore:
+    """Latest summary per incident and the number of timeline events it covers."""
+
+    def __init__(self, path=SUMMARY_CACHE_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._listeners = []
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS summaries ("
+                "incident_id INTEGER PRIMARY KEY, summary TEXT, events_seen INTEGER, updated_at REAL)"
+            )
+
+    def get(self, incident_id):
+        # (summary, events_seen), or (None, 0) if the incident was never summarized
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary, events_seen FROM summaries WHERE incident_id = ?", (int(incident_id),)
+            ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else (None, 0)
+
+    def put(self, incident_id, summary, events_seen):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?)",
+                (int(incident_id), json.dumps(summary), events_seen, time.time()),
+            )
+        for callback in self._listeners:
+            callback(incident_id, summary)
+
+    def subscribe(self, callback):
+        # callback(incident_id, summary) after every put
+        self._listeners.append(callback)
+
+    def summaries(self):
+        # {incident_id: summary} for every summarized incident
+        with self._lock:
+            rows = self._conn.execute("SELECT incident_id, summary FROM summaries").fetchall()
+        return {incident_id: json.loads(summary) for incident_id, summary in rows}
+
+
+def summarize_incident(client, incident_data, events, store):
+    # Returns (summary, new_events); only events after the stored high-water
+    # mark are sent to the model
+    summary, seen = store.get(incident_data["Incident ID"])
+    new_events = events[seen:]
+    if summary is not None and not new_events:
+        return summary, 0
+    summary = summarize_events(client, incident_data, new_events, summary)
+    store.put(incident_data["Incident ID"], summary, len(events))
+    return summary, len(new_events)
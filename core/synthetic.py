@@ -0,0 +1,185 @@
+# Seeded, vectorized synthetic incidents for demos and load tests.
+#
+# Incidents arrive over a window ending at `now` (a fixed anchor by default,
+# pass the current time for live-looking data), with more of them during
+# working hours; services, severities, types and owners follow skewed
+# distributions. Every incident runs through Open -> In Progress -> Resolved
+# -> Closed with lognormal durations scaled by severity, and its State is
+# wherever that lifecycle stands at `now` (Resolved Time is set once it
+# resolved). IDs are unique and increase with Create Time. Rows are produced
+# in chunks, each from its own (seed, chunk) random stream and its own slice
+# of the arrival distribution, so millions of incidents can go straight to a
+# store or a Parquet file in bounded memory and the same seed and `now`
+# always give the same incidents.
+#
+#   python -m core.synthetic --rows 5000000 --parquet .cache/incidents.parquet
+#   python -m core.synthetic --rows 100000 --now 2025-06-01T12:00
+#   python -m core.synthetic --rows 1000000 --backend sqlite --path .cache/incidents.sqlite3
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+
+from core.ingest import DEFAULT_STORE_PATH
+from core.lazy import lazy_import
+from core.schema import COLUMNS, INCIDENT_TYPES, OWNERS, SERVICES, SEVERITIES, to_incident_frame
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+FIRST_ID = 1000
+DEFAULT_DAYS = 30
+DEFAULT_NOW = datetime(2025, 1, 1)  # end of the arrival window unless a `now` is given
+CHUNK_ROWS = 100_000
+
+SERVICE_WEIGHTS = {"API Gateway": 0.35, "Payment Service": 0.25, "Auth Service": 0.18,
+                   "User Service": 0.14, "Notification Service": 0.08}
+SEVERITY_WEIGHTS = {"Critical": 0.04, "High": 0.16, "Medium": 0.45, "Low": 0.35}
+TYPE_WEIGHTS = {"External": 0.3, "Internal": 0.7}
+# Arrivals per hour of day, relative: quiet nights, a peak in the early afternoon
+HOURLY_WEIGHTS = [0.3, 0.25, 0.2, 0.2, 0.25, 0.35, 0.5, 0.8, 1.2, 1.6, 1.8, 1.9,
+                  1.8, 1.9, 2.0, 1.9, 1.7, 1.4, 1.1, 0.9, 0.7, 0.6, 0.5, 0.4]
+PRIMARY_OWNER_SHARE = 0.6  # incidents handled by their service's primary on-call owner
+
+# Median hours per lifecycle step; each duration is lognormal around its median
+MEDIAN_HOURS_TO_ACKNOWLEDGE = 0.25
+MEDIAN_HOURS_TO_RESOLVE = {"Critical": 2, "High": 6, "Medium": 24, "Low": 72}
+MEDIAN_HOURS_TO_CLOSE = 24
+DURATION_SIGMA = 0.9
+
+# Titles are "<failure> in <service>"; earlier failures are more common
+FAILURES = ["Service degradation", "Elevated 5xx errors", "Latency spike", "Timeouts", "Partial outage",
+            "Elevated error rate", "Connection pool exhaustion", "Bad deploy", "Queue backlog",
+            "Certificate expiry", "DNS resolution failures", "Memory leak", "Disk full", "Cache stampede"]
+
+
+def _weights(weights, names):
+    p = np.array([weights[name] for name in names], dtype=float)
+    return p / p.sum()
+
+
+def _zipf(k):
+    p = 1 / np.arange(1, k + 1)
+    return p / p.sum()
+
+
+def _arrival_cdf(start, end):
+    # Per-minute arrival CDF over [start, end)
+    minutes = pd.date_range(start, end, freq="min", inclusive="left")
+    weights = np.asarray(HOURLY_WEIGHTS)[minutes.hour]
+    return minutes.to_numpy(), np.cumsum(weights) / weights.sum()
+
+
+def _durations(rng, medians):
+    hours = np.asarray(medians) * rng.lognormal(0, DURATION_SIGMA, len(medians))
+    return (hours * 3600e9).astype("int64").astype("timedelta64[ns]")
+
+
+def _chunk(rng, n, first_id, minutes, cdf, low, high, now):
+    # n incidents whose arrivals fall in the [low, high) quantiles of the window
+    created = minutes[np.searchsorted(cdf, np.sort(rng.uniform(low, high, n)), side="right").clip(max=len(cdf) - 1)]
+    services = rng.choice(len(SERVICES), n, p=_weights(SERVICE_WEIGHTS, SERVICES))
+    severities = rng.choice(len(SEVERITIES), n, p=_weights(SEVERITY_WEIGHTS, SEVERITIES))
+    failures = rng.choice(len(FAILURES), n, p=_zipf(len(FAILURES)))
+    owners = np.where(rng.random(n) < PRIMARY_OWNER_SHARE, services % len(OWNERS), rng.integers(len(OWNERS), size=n))
+
+    acknowledged = created + _durations(rng, np.full(n, MEDIAN_HOURS_TO_ACKNOWLEDGE))
+    resolved = acknowledged + _durations(rng, np.array([MEDIAN_HOURS_TO_RESOLVE[s] for s in SEVERITIES])[severities])
+    closed = resolved + _durations(rng, np.full(n, MEDIAN_HOURS_TO_CLOSE))
+    resolved = resolved.astype("datetime64[m]").astype("datetime64[ns]")
+    state = np.select([acknowledged > now, resolved > now, closed > now], ["Open", "In Progress", "Resolved"], "Closed")
+
+    titles = np.array([f"{failure} in {service}" for failure in FAILURES for service in SERVICES])
+    return to_incident_frame(pd.DataFrame({
+        "Type": np.array(INCIDENT_TYPES)[rng.choice(len(INCIDENT_TYPES), n, p=_weights(TYPE_WEIGHTS, INCIDENT_TYPES))],
+        "Incident ID": first_id + np.arange(n),
+        "Severity": np.array(SEVERITIES)[severities],
+        "State": state,
+        "Title": titles[failures * len(SERVICES) + services],
+        "Create Time": created,
+        "Owning Service": np.array(SERVICES)[services],
+        "Owner": np.array(OWNERS)[owners],
+        "Resolved Time": np.where(resolved <= now, resolved, np.datetime64("NaT")),
+    }))
+
+
+def iter_incidents(n, chunk_rows=CHUNK_ROWS, seed=0, now=None, days=DEFAULT_DAYS, first_id=FIRST_ID):
+    """Incident frames of at most ``chunk_rows`` rows, oldest first.
+
+    ``seed=None`` draws fresh randomness on every call. Create Times fall in
+    the ``days`` before ``now``, which defaults to ``DEFAULT_NOW`` so a seed
+    gives the same incidents whenever it runs.
+    """
+    now = pd.Timestamp(DEFAULT_NOW if now is None else now).floor("min")
+    minutes, cdf = _arrival_cdf(now - timedelta(days=days), now)
+    now = now.to_datetime64()
+    for chunk, offset in enumerate(range(0, n, chunk_rows)):
+        size = min(chunk_rows, n - offset)
+        rng = np.random.default_rng(None if seed is None else [seed, chunk])
+        yield _chunk(rng, size, first_id + offset, minutes, cdf, offset / n, (offset + size) / n, now)
+
+
+def generate_incidents(n, seed=0, now=None, days=DEFAULT_DAYS, first_id=FIRST_ID):
+    chunks = list(iter_incidents(n, CHUNK_ROWS, seed, now, days, first_id))
+    if not chunks:
+        return to_incident_frame(pd.DataFrame(columns=COLUMNS))
+    return to_incident_frame(pd.concat(chunks, ignore_index=True))
+
+
+def write_parquet(path, n, chunk_rows=CHUNK_ROWS, **options):
+    # One row group per chunk; options are passed to iter_incidents
+    import pyarrow as pa
+    import pyarrow.parquet as parquet
+
+    writer = None
+    try:
+        for df in iter_incidents(n, chunk_rows, **options):
+            # Owner categories differ between chunks, so categoricals are written as plain strings
+            categorical = [column for column in df.columns if isinstance(df[column].dtype, pd.CategoricalDtype)]
+            table = pa.Table.from_pandas(df.astype({column: str for column in categorical}), preserve_index=False)
+            if writer is None:
+                writer = parquet.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def load_store(store, n, chunk_rows=CHUNK_ROWS, **options):
+    return store.bulk_load(iter_incidents(n, chunk_rows, **options))
+
+
+def main():
+    from core.store import open_store
+
+    parser = argparse.ArgumentParser(description="Generate synthetic incidents into a store or a Parquet file")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS, help="Create Times span this many days up to --now")
+    parser.add_argument("--now", type=datetime.fromisoformat, default=DEFAULT_NOW,
+                        help=f"end of the arrival window, ISO format (default {DEFAULT_NOW.isoformat()})")
+    parser.add_argument("--first-id", type=int, default=FIRST_ID)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--parquet", help="write to this Parquet file instead of a store")
+    parser.add_argument("--backend", choices=["memory", "sqlite"], default=os.environ.get("INCIDENT_STORE", "sqlite"))
+    parser.add_argument("--path", default=os.environ.get("INCIDENT_STORE_PATH", DEFAULT_STORE_PATH),
+                        help="SQLite file (sqlite backend)")
+    args = parser.parse_args()
+
+    options = {"seed": args.seed, "now": args.now, "days": args.days, "first_id": args.first_id}
+    start = time.perf_counter()
+    if args.parquet:
+        os.makedirs(os.path.dirname(args.parquet) or ".", exist_ok=True)
+        write_parquet(args.parquet, args.rows, args.chunk_rows, **options)
+        target = args.parquet
+    else:
+        if args.backend == "sqlite":
+            os.makedirs(os.path.dirname(args.path) or ".", exist_ok=True)
+        load_store(open_store(args.backend, args.path), args.rows, args.chunk_rows, **options)
+        target = f"the {args.backend} store"
+    elapsed = time.perf_counter() - start
+    print(f"{args.rows:,} incidents written to {target} in {elapsed:.1f}s ({args.rows / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
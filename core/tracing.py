@@ -0,0 +1,190 @@
+# Lightweight per-stage timing for the portal's hot paths.
+#
+# Wrap a function with @traced("stage") or a block with `with trace("stage"):`
+# and every call is recorded in a fixed-bucket latency histogram; events with
+# no duration, such as failed writes, are counted with increment(). Recording
+# is a lock and a few additions, cheap enough to leave on in production. The
+# same numbers back the admin performance panel and a Prometheus text export,
+# optionally served for scraping on METRICS_PORT.
+import bisect
+import functools
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Upper bounds in seconds, as in Prometheus' default histogram buckets
+BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf")]
+METRIC_NAME = "portal_stage_duration_seconds"
+COUNTER_NAME = "portal_events_total"
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation (capped at the max seen)
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class Tracer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def increment(self, event, amount=1):
+        with self._lock:
+            self._counters[event] = self._counters.get(event, 0) + amount
+
+    def counters(self):
+        # {event: count} for every event incremented since the last reset
+        with self._lock:
+            return dict(sorted(self._counters.items()))
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def trace(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def traced(self, stage):
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.trace(stage):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def stats(self):
+        # [{"stage", "count", "mean_ms", "p50_ms", "p95_ms", "max_ms"}, ...]
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            return [
+                {
+                    "stage": stage,
+                    "count": h.count,
+                    "mean_ms": h.sum / h.count * 1000,
+                    "p50_ms": h.quantile(0.5) * 1000,
+                    "p95_ms": h.quantile(0.95) * 1000,
+                    "max_ms": h.max * 1000,
+                }
+                for stage, h in histograms
+            ]
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def prometheus_text(self):
+        lines = [
+            f"# HELP {METRIC_NAME} Time spent in each traced portal stage.",
+            f"# TYPE {METRIC_NAME} histogram",
+        ]
+        with self._lock:
+            for stage, h in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, count in zip(h.buckets, h.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{METRIC_NAME}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'{METRIC_NAME}_sum{{stage="{stage}"}} {h.sum!r}')
+                lines.append(f'{METRIC_NAME}_count{{stage="{stage}"}} {h.count}')
+            if self._counters:
+                lines += [
+                    f"# HELP {COUNTER_NAME} Events counted by the portal, such as failed writes.",
+                    f"# TYPE {COUNTER_NAME} counter",
+                ]
+                lines += [f'{COUNTER_NAME}{{event="{event}"}} {count}' for event, count in sorted(self._counters.items())]
+        # Memory gauges are left out where the platform does not report them
+        for name, help_text, value in [
+            ("portal_memory_rss_bytes", "Resident set size of the server process.", memory_rss()),
+            ("portal_memory_peak_rss_bytes", "Peak resident set size of the server process.", memory_peak_rss()),
+        ]:
+            if value is not None:
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+def memory_rss():
+    # Current RSS in bytes from /proc on Linux, the peak elsewhere; None when neither is available
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return memory_peak_rss()
+
+
+def memory_peak_rss():
+    # Peak RSS in bytes, None where the resource module is missing (Windows)
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # bytes on macOS, KiB on Linux
+
+
+# Process-wide tracer used by the pages
+TRACER = Tracer()
+trace = TRACER.trace
+traced = TRACER.traced
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        data = TRACER.prometheus_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_metrics_server(port, host="127.0.0.1"):
+    # Serves /metrics from a daemon thread; call .shutdown() to stop. Only local
+    # scrapers reach the default host; pass "0.0.0.0" to listen on every interface
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -1,7 +1,25 @@
 import streamlit as st
-import pandas as pd
-from datetime import datetime, timedelta
-import random
+
+from core.components import show_performance_panel
+from core.data import (
+    get_batch_job,
+    get_draft_cache,
+    get_incident_store,
+    get_llm_client,
+    get_metrics_server,
+    get_similar_incidents,
+    load_incident_count,
+    load_incident_page,
+    load_search_results,
+    load_top_escalations,
+)
+from core.escalation import SCORE_COLUMN, is_escalation_prone
+from core.feed import merge_changes
+from core.lazy import lazy_import
+from core.schema import SEVERITIES, STATES, SERVICES, INCIDENT_TYPES, INCIDENT_ID_PREFIX, format_incident_id
+from core.tracing import trace, traced
+
+np = lazy_import("numpy")
 
 # Set page config
 st.set_page_config(
@@ -32,184 +50,221 @@ st.markdown("""
         color: #1E3A8A;
         margin-bottom: 2rem;
     }
-    .column-header {
-        font-weight: 600;
-        color: #1E3A8A;
-        font-size: 0.9rem;
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-        padding: 0.5rem 0;
-    }
-    .header-container {
-        border-bottom: 2px solid #E5E7EB;
-        margin-bottom: 1rem;
-    }
     </style>
     """, unsafe_allow_html=True)
 
-# Generate mock data
-def generate_mock_incidents(num_incidents=50):
-    services = ["User Service", "Payment Service", "Auth Service", "Notification Service", "API Gateway"]
-    states = ["Open", "In Progress", "Resolved", "Closed"]
-    severities = ["Critical", "High", "Medium", "Low"]
-    owners = ["John Doe", "Jane Smith", "Mike Johnson", "Sarah Williams", "Alex Brown"]
-    incident_types = ["External", "Internal"]
+def handle_incident_click(incident_data):
+    # The detail page loads the incident by ID, so the link is shareable and never stale
+    st.switch_page(
+        "pages/1_Incident_Detail.py",
+        query_params={"incident": format_incident_id(incident_data["Incident ID"])},
+    )
+
+ROWS_PER_PAGE_OPTIONS = [10, 50, 100, 500]
+ESCALATION_COLUMN = "Escalation"
+TABLE_ROW_HEIGHT = 35
+TABLE_MAX_HEIGHT = 600
+LIVE_REFRESH_SECONDS = 5
+SEARCH_RESULTS_LIMIT = 100
+
+# Incident IDs are stored as integers and Create/Resolved Time as datetime64; format them for display
+INCIDENT_COLUMN_CONFIG = {
+    "Incident ID": st.column_config.NumberColumn("Incident ID", format=f"{INCIDENT_ID_PREFIX}%d"),
+    "Create Time": st.column_config.DatetimeColumn("Create Time", format="YYYY-MM-DD HH:mm"),
+    "Resolved Time": st.column_config.DatetimeColumn("Resolved Time", format="YYYY-MM-DD HH:mm"),
+    "Title": st.column_config.TextColumn("Title", width="large"),
+}
+
+def show_batch_controls(store):
+    # Pre-generates drafts for every 🚩 incident on a background thread
+    job = get_batch_job()
+    st.sidebar.markdown("### ⚡ Draft Pre-generation")
+    if st.sidebar.button("Pre-generate drafts for 🚩 incidents", disabled=job.running):
+        client = get_llm_client(st.secrets["PERPLEXITY_API_KEY"])
+        job.start(store, client, get_draft_cache())
+    status = job.status
+    if job.running:
+        done = status["generated"] + status["cached"] + status["failed"] if status else 0
+        st.sidebar.caption(f"Running: {done}/{status['total'] if status else '?'} artifacts")
+    elif status:
+        st.sidebar.caption(
+            f"Last run: {status.get('generated', 0)} generated, {status.get('cached', 0)} cached, "
+            f"{status.get('failed', 0)} failed"
+        )
+        if status.get("error"):
+            st.sidebar.error(status["error"])
+
+def incident_grid(df, key):
+    # One virtualized grid of incidents with the escalation flag; selecting a row opens its details
+    table_df = df.copy()
+    table_df[ESCALATION_COLUMN] = np.where(is_escalation_prone(table_df), "🚩", "")
+    event = st.dataframe(
+        table_df,
+        hide_index=True,
+        height=min(TABLE_ROW_HEIGHT * (len(table_df) + 1) + 3, TABLE_MAX_HEIGHT),
+        column_config={
+            **INCIDENT_COLUMN_CONFIG,
+            ESCALATION_COLUMN: st.column_config.TextColumn(ESCALATION_COLUMN, width="small"),
+        },
+        on_select="rerun",
+        selection_mode="single-row",
+        key=key,
+    )
+    if event.selection.rows:
+        handle_incident_click(df.iloc[event.selection.rows[0]].to_dict())
+
+def show_incident_table(store, filters, cursor, limit, page, page_df, version):
+    # Keeps the rendered page and the store version it reflects in session_state;
+    # fragment re-runs ask the change feed for incidents written since then
+    page_key = (tuple((column, tuple(values)) for column, values in filters.items()), cursor, limit)
+    live = st.session_state.get("live_table")
+    if live is None or live["key"] != page_key or live["loaded_version"] != version:
+        live = {"key": page_key, "loaded_version": version, "version": version, "df": page_df}
+    elif store.version != live["version"]:
+        changes, current = store.changes_since(live["version"])
+        if changes is None:
+            live["df"], _ = load_incident_page(store, filters, cursor, limit)
+        else:
+            live["df"] = merge_changes(live["df"], changes, filters, first_page=page == 1)
+        live["version"] = current
+    st.session_state.live_table = live
+    incident_grid(live["df"], key=f"incident_table_{page}")
+
+def show_search_results(store, query, filters):
+    # Best matches among the incidents passing the filters, in place of the paginated list
+    with trace("home.search"):
+        results = load_search_results(store, query, filters, SEARCH_RESULTS_LIMIT)
+    if results.empty:
+        st.info(f"No incidents match \"{query}\".")
+        return
+    incident_grid(results, key="search_results_table")
+    shown = f"the best {len(results)}" if len(results) == SEARCH_RESULTS_LIMIT else f"all {len(results)}"
+    st.caption(f"Showing {shown} matches for \"{query}\"")
+
+def show_incident_pages(store, filters, total):
+    # Keyset pagination: remember the (Create Time, Incident ID) cursor each visited
+    # page starts after, and start over whenever the filters or page size change
+    items_per_page = st.session_state.get("items_per_page", 10)
+    total_pages = max(1, total // items_per_page + (1 if total % items_per_page > 0 else 0))
+    filter_key = (items_per_page,) + tuple((column, tuple(values)) for column, values in filters.items())
+    if st.session_state.get("page_filter_key") != filter_key:
+        st.session_state.page_filter_key = filter_key
+        st.session_state.page_cursors = [None]
+    cursors = st.session_state.page_cursors
+    page = len(cursors)
     
-    incidents = []
-    base_time = datetime.now()
+    # Only the visible page is fetched; the version is read first so no write can slip in between
+    version = store.version
+    with trace("home.page"):
+        page_df, next_cursor = load_incident_page(store, filters, cursors[-1], items_per_page)
+    start_idx = (page - 1) * items_per_page
+    end_idx = start_idx + len(page_df)
     
-    for i in range(num_incidents):
-        incident_time = base_time - timedelta(hours=random.randint(1, 72))
-        incidents.append({
-            "Type": random.choice(incident_types),
-            "Incident ID": f"INC-{random.randint(1000, 9999)}",
-            "Severity": random.choice(severities),
-            "State": random.choice(states),
-            "Title": f"Service degradation in {random.choice(services)}",
-            "Create Time": incident_time.strftime("%Y-%m-%d %H:%M"),
-            "Owning Service": random.choice(services),
-            "Owner": random.choice(owners)
-        })
+    # Add page navigation
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        st.button("← Previous", disabled=page == 1, on_click=cursors.pop)
+    with col2:
+        st.markdown(f"Page {page} of {total_pages}")
+        st.selectbox("Rows per page", ROWS_PER_PAGE_OPTIONS, key="items_per_page")
+    with col3:
+        st.button("Next →", disabled=next_cursor is None, on_click=cursors.append, args=(next_cursor,))
     
-    return pd.DataFrame(incidents)
-
-def handle_incident_click(incident_data):
-    st.session_state.incident_data = incident_data
-    st.switch_page("pages/1_Incident_Detail.py")
+    # With live refresh on, the table re-runs on a timer and merges only changed incidents
+    live = st.sidebar.toggle("🔄 Live refresh", key="live_refresh")
+    incident_table = st.fragment(show_incident_table, run_every=LIVE_REFRESH_SECONDS if live else None)
+    incident_table(store, filters, cursors[-1], items_per_page, page, page_df, version)
+    
+    # Display total number of incidents
+    st.caption(f"Showing {min(start_idx + 1, end_idx)}-{end_idx} of {total} incidents")
 
 # Main app
+@traced("home.main")
 def main():
     st.title("🚨 Abnormal Incidents Portal")
     
-    # Add filters
-    col1, col2, col3, col4 = st.columns(4)
+    # Filter widgets and the filtered count
+    with trace("home.filters"):
+        # Full-text search over titles, summaries and postmortems (see core/search.py)
+        search_query = st.text_input(
+            "Search incidents",
+            placeholder="Words from titles, summaries or postmortems; the last word (or word*) matches as a prefix",
+            key="search_query",
+        ).strip()
     
-    with col1:
-        severity_filter = st.multiselect(
-            "Filter by Severity",
-            ["Critical", "High", "Medium", "Low"],
-            default=[]
-        )
+        # Add filters
+        col1, col2, col3, col4 = st.columns(4)
     
-    with col2:
-        state_filter = st.multiselect(
-            "Filter by State",
-            ["Open", "In Progress", "Resolved", "Closed"],
-            default=[]
-        )
+        with col1:
+            severity_filter = st.multiselect(
+                "Filter by Severity",
+                SEVERITIES,
+                default=[]
+            )
     
-    with col3:
-        service_filter = st.multiselect(
-            "Filter by Service",
-            ["User Service", "Payment Service", "Auth Service", "Notification Service", "API Gateway"],
-            default=[]
-        )
-        
-    with col4:
-        type_filter = st.multiselect(
-            "Filter by Type",
-            ["External", "Internal"],
-            default=[]
-        )
+        with col2:
+            state_filter = st.multiselect(
+                "Filter by State",
+                STATES,
+                default=[]
+            )
     
-    # Generate and filter data
-    df = generate_mock_incidents()
+        with col3:
+            service_filter = st.multiselect(
+                "Filter by Service",
+                SERVICES,
+                default=[]
+            )
+        
+        with col4:
+            type_filter = st.multiselect(
+                "Filter by Type",
+                INCIDENT_TYPES,
+                default=[]
+            )
     
-    # Apply filters
-    if severity_filter:
-        df = df[df["Severity"].isin(severity_filter)]
-    if state_filter:
-        df = df[df["State"].isin(state_filter)]
-    if service_filter:
-        df = df[df["Owning Service"].isin(service_filter)]
-    if type_filter:
-        df = df[df["Type"].isin(type_filter)]
+        # Filtering is pushed down into the store's indexes
+        store = get_incident_store()
+        filters = {
+            "Severity": severity_filter,
+            "State": state_filter,
+            "Owning Service": service_filter,
+            "Type": type_filter,
+        }
+        # Counts and pages come from the cached loading layer, so reruns hit memory
+        total = load_incident_count(store, filters)
+    show_batch_controls(store)
+    show_performance_panel()
+    get_metrics_server()
+    # Starts building the RCA tab's similar-incident index in the background
+    get_similar_incidents()
     
-    # Pagination
-    items_per_page = 10
-    total_pages = len(df) // items_per_page + (1 if len(df) % items_per_page > 0 else 0)
+    if search_query:
+        show_search_results(store, search_query, filters)
+    else:
+        show_incident_pages(store, filters, total)
     
-    # Add page navigation
-    col1, col2, col3 = st.columns([1, 2, 1])
-    with col2:
-        page = st.selectbox(
-            "Page",
-            range(1, total_pages + 1),
-            format_func=lambda x: f"Page {x} of {total_pages}"
+    # Highest escalation scores across every incident matching the filters
+    with st.expander("🚩 Top escalation-prone incidents"):
+        col1, col2 = st.columns(2)
+        with col1:
+            top_n = st.number_input("Show top", min_value=1, max_value=500, value=10)
+        with col2:
+            min_score = st.slider("Minimum score", 0, 100, 0)
+        top_df = load_top_escalations(store, filters, top_n, min_score)
+        top_event = st.dataframe(
+            top_df,
+            hide_index=True,
+            column_config={
+                **INCIDENT_COLUMN_CONFIG,
+                SCORE_COLUMN: st.column_config.ProgressColumn(SCORE_COLUMN, min_value=0, max_value=100, format="%.1f"),
+            },
+            on_select="rerun",
+            selection_mode="single-row",
+            key="top_escalations_table",
         )
-    
-    # Calculate start and end indices for the current page
-    start_idx = (page - 1) * items_per_page
-    end_idx = min(start_idx + items_per_page, len(df))
-    
-    # Display column headers
-    st.markdown('<div class="header-container">', unsafe_allow_html=True)
-    header_cols = st.columns([1, 1, 1, 1, 2, 1, 1, 1, 1])
-    with header_cols[0]:
-        st.markdown('<div class="column-header">Type</div>', unsafe_allow_html=True)
-    with header_cols[1]:
-        st.markdown('<div class="column-header">Incident ID</div>', unsafe_allow_html=True)
-    with header_cols[2]:
-        st.markdown('<div class="column-header">Severity</div>', unsafe_allow_html=True)
-    with header_cols[3]:
-        st.markdown('<div class="column-header">State</div>', unsafe_allow_html=True)
-    with header_cols[4]:
-        st.markdown('<div class="column-header">Title</div>', unsafe_allow_html=True)
-    with header_cols[5]:
-        st.markdown('<div class="column-header">Create Time</div>', unsafe_allow_html=True)
-    with header_cols[6]:
-        st.markdown('<div class="column-header">Owning Service</div>', unsafe_allow_html=True)
-    with header_cols[7]:
-        st.markdown('<div class="column-header">Owner</div>', unsafe_allow_html=True)
-    with header_cols[8]:
-        st.markdown('<div class="column-header">Actions</div>', unsafe_allow_html=True)
-    st.markdown('</div>', unsafe_allow_html=True)
-    
-    # Display incidents with clickable rows
-    for idx, row in df.iloc[start_idx:end_idx].iterrows():
-        with st.container():
-            cols = st.columns([1, 1, 1, 1, 2, 1, 1, 1, 1])  # Added one more column for the button
-            with cols[0]:
-                st.write(row["Type"])
-            with cols[1]:
-                st.write(row["Incident ID"])
-            with cols[2]:
-                st.write(row["Severity"])
-            with cols[3]:
-                st.write(row["State"])
-            with cols[4]:
-                st.write(row["Title"])
-            with cols[5]:
-                st.write(row["Create Time"])
-            with cols[6]:
-                st.write(row["Owning Service"])
-            with cols[7]:
-                st.write(row["Owner"])
-            with cols[8]:
-    # Escalation logic (can be customized)
-                is_escalation_prone = (
-                    row["Severity"] in ["Critical", "High"] and
-                    row["State"] in ["Open", "In Progress"]
-                )
-
-                # Layout: Icon + View Details button side by side
-                icon_col, btn_col = st.columns([1, 4])
-                
-                with icon_col:
-                    if is_escalation_prone:
-                        st.markdown("🚩", unsafe_allow_html=True)
-                    else:
-                        st.markdown("")  # Empty space for alignment
-
-                with btn_col:
-                    if st.button("View Details", key=f"btn_{idx}"):
-                        handle_incident_click(row.to_dict())
-
-            
-            st.divider()
-    
-    # Display total number of incidents
-    st.caption(f"Showing {start_idx + 1}-{end_idx} of {len(df)} incidents")
+        if top_event.selection.rows:
+            handle_incident_click(top_df.drop(columns=[SCORE_COLUMN]).iloc[top_event.selection.rows[0]].to_dict())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,56 +1,7 @@
 import streamlit as st
-import pandas as pd
-from datetime import datetime, timedelta
-import random
 
-def generate_mock_summary():
-    what_we_know = [
-        "Service degradation detected in the Payment Service API",
-        "Error rate increased by 15% in the last hour",
-        "Affecting approximately 5% of all payment transactions",
-        "Primary error: Timeout in payment gateway communication"
-    ]
-    
-    what_has_been_done = [
-        "Initial investigation completed by the Payment Service team",
-        "Identified the root cause as increased latency in the payment gateway",
-        "Implemented temporary rate limiting to prevent cascading failures",
-        "Deployed hotfix to improve error handling and retry logic"
-    ]
-    
-    customer_communication = [
-        "Initial notification sent to affected customers",
-        "Regular updates provided every 30 minutes",
-        "Estimated resolution time communicated: 2 hours",
-        "Alternative payment methods suggested to customers"
-    ]
-    
-    return {
-        "what_we_know": what_we_know,
-        "what_has_been_done": what_has_been_done,
-        "customer_communication": customer_communication
-    }
-
-def generate_communication_draft(incident_data):
-    severity = incident_data["Severity"]
-    service = incident_data["Owning Service"]
-    title = incident_data["Title"]
-    
-    draft = f"""
-Dear valued customers,
-
-We are currently experiencing {severity.lower()} issues with our {service.lower()}. {title}
-
-Our team is actively working on resolving this issue. We will provide updates every 30 minutes until the situation is resolved.
-
-You could check the status of the incident on our status page: https://status.abnormal.ai and subscribe for notifications.
-
-We apologize for any inconvenience this may cause and appreciate your patience.
-
-Best regards,
-Abnormal AI Incident Response Team
-    """
-    return draft
+from core.mock_data import generate_communication_draft, generate_mock_summary
+from core.schema import format_create_time, format_incident_id
 
 def show_incident_detail(incident_data):
     st.title("🚨 Incident Details")
@@ -60,7 +11,7 @@ def show_incident_detail(incident_data):
     col1, col2 = st.columns(2)
     
     with col1:
-        st.metric("Incident ID", incident_data["Incident ID"])
+        st.metric("Incident ID", format_incident_id(incident_data["Incident ID"]))
         st.metric("Severity", incident_data["Severity"])
         st.metric("State", incident_data["State"])
         st.metric("Type", incident_data["Type"])
@@ -68,7 +19,7 @@ def show_incident_detail(incident_data):
     with col2:
         st.metric("Owning Service", incident_data["Owning Service"])
         st.metric("Owner", incident_data["Owner"])
-        st.metric("Create Time", incident_data["Create Time"])
+        st.metric("Create Time", format_create_time(incident_data["Create Time"]))
     
     # Tabs
     tab1, tab2 = st.tabs(["Summary and Discussion", "Customer Communication"])
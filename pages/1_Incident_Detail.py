@@ -1,89 +1,72 @@
 import streamlit as st
-import pandas as pd
-from datetime import datetime, timedelta
-import random
-import requests
-
-def generate_draft_with_perplexity(incident_data, api_key):
-    prompt = f"""You are a professional customer communications specialist.
-Draft a clear, concise incident message for customers based on the following info:
-
-- Title: {incident_data.get("Title")}
-- Severity: {incident_data.get("Severity")}
-- Service: {incident_data.get("Owning Service")}
-- State: {incident_data.get("State")}
-- Time Created: {incident_data.get("Create Time")}
-- Owner: {incident_data.get("Owner")}
-
-Keep it under 300 words. Inform users of the impact and steps being taken. Include a reassurance message and status link.
-"""
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
-    body = {
-        "model": "sonar",  # or other available models
-        "messages": [
-            {"role": "user", "content": prompt}
-        ],
-        "temperature": 0.5,
-        "max_token": 300
-    }
-    response = requests.post("https://api.perplexity.ai/chat/completions", json=body, headers=headers)
-    if response.status_code == 200:
-        return response.json()['choices'][0]['message']['content']
+import time
+
+from core.components import feedback_widget, publish_widget, show_performance_panel
+from core.data import (
+    get_draft_cache,
+    get_feedback_log,
+    get_incident_store,
+    get_llm_client,
+    get_metrics_server,
+    get_publish_engine,
+    get_similar_incidents,
+    get_summary_store,
+    update_incident_state,
+)
+from core.drafts import CUSTOMER_DRAFT, POSTMORTEM_SKELETON, PROMPT_VERSIONS, lookup_draft, stream_draft
+from core.feedback import content_hash
+from core.lazy import lazy_import
+from core.llm import DEFAULT_MODEL, LLMError
+from core.mock_data import generate_mock_timeline
+from core.schema import STATES, format_create_time, format_incident_id, format_resolved_time, parse_incident_id
+from core.similar import format_match
+from core.summary import summarize_incident
+from core.tracing import traced
+
+pd = lazy_import("pandas")
+requests = lazy_import("requests")
+
+@traced("detail.generate_draft")
+def generate_draft_with_perplexity(incident_data, api_key, placeholder, regenerate=False):
+    # Streams the draft into placeholder as tokens arrive.
+    # Returns (draft, from_cache, seconds to first token); draft is None when the API call failed
+    start = time.perf_counter()
+    first_token = []
+
+    def timed(chunks):
+        for chunk in chunks:
+            if not first_token:
+                first_token.append(time.perf_counter() - start)
+            yield chunk
+
+    try:
+        chunks, from_cache = stream_draft(get_llm_client(api_key), incident_data, get_draft_cache(), regenerate=regenerate)
+        draft = placeholder.write_stream(timed(chunks))
+    except LLMError as e:
+        st.error(f"Perplexity API Error: {e.status_code} - {e.text}")
+    except requests.RequestException as e:
+        st.error(f"Perplexity API Error: {e}")
     else:
-        st.error(f"Perplexity API Error: {response.status_code} - {response.text}")
-        return None
-
-def generate_mock_summary():
-    what_we_know = [
-        "Service degradation detected in the Payment Service API",
-        "Error rate increased by 15% in the last hour",
-        "Affecting approximately 5% of all payment transactions",
-        "Primary error: Timeout in payment gateway communication"
-    ]
-    
-    what_has_been_done = [
-        "Initial investigation completed by the Payment Service team",
-        "Identified the root cause as increased latency in the payment gateway",
-        "Implemented temporary rate limiting to prevent cascading failures",
-        "Deployed hotfix to improve error handling and retry logic"
-    ]
-    
-    customer_communication = [
-        "Initial notification sent to affected customers",
-        "Regular updates provided every 30 minutes",
-        "Estimated resolution time communicated: 2 hours",
-        "Alternative payment methods suggested to customers"
-    ]
-    
-    return {
-        "what_we_know": what_we_know,
-        "what_has_been_done": what_has_been_done,
-        "customer_communication": customer_communication
-    }
-
-def generate_communication_draft(incident_data):
-    severity = incident_data["Severity"]
-    service = incident_data["Owning Service"]
-    title = incident_data["Title"]
-    
-    draft = f"""
-Dear valued customers,
-
-We are currently experiencing {severity.lower()} issues with our {service.lower()}. {title}
-
-Our team is actively working on resolving this issue. We will provide updates every 30 minutes until the situation is resolved.
-
-You could check the status of the incident on our status page: https://status.abnormal.ai and subscribe for notifications.
-
-We apologize for any inconvenience this may cause and appreciate your patience.
-
-Best regards,
-Abnormal AI Incident Response Team
-    """
-    return draft
+        return draft, from_cache, first_token[0] if first_token else None
+    return None, False, None
+
+def change_incident_state(incident_data):
+    new_state = st.session_state.incident_state
+    update_incident_state(incident_data["Incident ID"], new_state)
+
+def draft_source(artifact, model=DEFAULT_MODEL):
+    # (model, prompt version) that produced a displayed artifact
+    return model, PROMPT_VERSIONS[artifact]
+
+def record_feedback(incident_data, artifact, vote, comment, draft, source):
+    # Queued for the background writer, so submitting never waits on disk.
+    # source is None when no model output was shown (empty, hand-typed or template text),
+    # so such votes stay out of the per-model approval rates
+    model, prompt_version = source or (None, None)
+    get_feedback_log().record(
+        incident_data["Incident ID"], artifact, vote, comment.strip(),
+        draft_hash=content_hash(draft), model=model, prompt_version=prompt_version,
+    )
 
 def show_incident_detail(incident_data):
     st.title("🚨 Incident Details")
@@ -93,7 +76,7 @@ def show_incident_detail(incident_data):
     col1, col2 = st.columns(2)
     
     with col1:
-        st.metric("Incident ID", incident_data["Incident ID"])
+        st.metric("Incident ID", format_incident_id(incident_data["Incident ID"]))
         st.metric("Severity", incident_data["Severity"])
         st.metric("State", incident_data["State"])
         st.metric("Type", incident_data["Type"])
@@ -101,313 +84,261 @@ def show_incident_detail(incident_data):
     with col2:
         st.metric("Owning Service", incident_data["Owning Service"])
         st.metric("Owner", incident_data["Owner"])
-        st.metric("Create Time", incident_data["Create Time"])
-    
-    # Tabs
-    tab1, tab2, tab3 = st.tabs(["Summary and Discussion", "Customer Communication", "RCA and Postmortems"])
-    
-    with tab1:
-        st.subheader("⚡ AI Generated Summary")
-        summary = generate_mock_summary()
-        st.caption("AI generated, please check for accuracy")
-        
-        # What We Know
-        st.markdown("### What We Know")
-        for item in summary["what_we_know"]:
-            st.markdown(f"- {item}")
-        
-        # What Has Been Done
-        st.markdown("### What Has Been Done")
-        for item in summary["what_has_been_done"]:
-            st.markdown(f"- {item}")
-        
-        # Customer Communication
-        st.markdown("### What Has Been Communicated to the customer")
-        for item in summary["customer_communication"]:
-            st.markdown(f"- {item}")
+        st.metric("Create Time", format_create_time(incident_data["Create Time"]))
+        st.metric("Resolved Time", format_resolved_time(incident_data["Resolved Time"]))
+        st.selectbox(
+            "Change State",
+            STATES,
+            index=STATES.index(incident_data["State"]),
+            key="incident_state",
+            on_change=change_incident_state,
+            args=(incident_data,)
+        )
     
-    with tab2:
-        st.subheader("🪄 Draft Communication")
-
-        # Call Perplexity API to generate draft
-        if "perplexity_draft" not in st.session_state:
-            st.session_state.perplexity_draft = ""
-
-        if st.button("✨ Generate Draft with Perplexity"):
-            with st.spinner("Contacting Perplexity AI..."):
-                api_key = st.secrets["PERPLEXITY_API_KEY"]
-                generated = generate_draft_with_perplexity(incident_data, api_key)
-                if generated:
-                    st.session_state.perplexity_draft = generated
-
-        # Editable text area
-        st.text_area("📄 Draft Message", value=st.session_state.perplexity_draft or "", height=200)
-
-        st.text_area("AI generated, please check for accuracy and make any necessary changes before publishing", value=st.session_state.get("perplexity_draft", ""), height=200)
-
-            # --- Feedback Section ---
-        st.markdown("### 🗣️ Feedback on Draft")
-
-        # Initialize state
-        if "feedback_vote" not in st.session_state:
-            st.session_state.feedback_vote = None
-        if "feedback_pending" not in st.session_state:
-            st.session_state.feedback_pending = None
-        if "feedback_confirmed" not in st.session_state:
-            st.session_state.feedback_confirmed = False
-        if "feedback_comment" not in st.session_state:
-            st.session_state.feedback_comment = ""
-
-        # Initial vote buttons
-        if not st.session_state.feedback_confirmed:
-            col1, col2 = st.columns(2)
-            with col1:
-                if st.button("👍 Looks good"):
-                    st.session_state.feedback_pending = "up"
-            with col2:
-                if st.button("👎 Needs improvement"):
-                    st.session_state.feedback_pending = "down"
-
-        # Confirmation step
-        if st.session_state.feedback_pending and not st.session_state.feedback_confirmed:
-            label = "👍 Looks good" if st.session_state.feedback_pending == "up" else "👎 Needs improvement"
-            st.warning(f"Confirm your feedback: **{label}**")
-            col1, col2 = st.columns(2)
-            with col1:
-                if st.button("✅ Yes, confirm"):
-                    st.session_state.feedback_vote = st.session_state.feedback_pending
-                    st.session_state.feedback_confirmed = True
-                    st.session_state.feedback_pending = None
-            with col2:
-                if st.button("❌ Cancel"):
-                    st.session_state.feedback_pending = None
-        if st.session_state.feedback_confirmed:
-            st.session_state.feedback_comment = st.text_area(
-                "Optional comment:",
-                value=st.session_state.feedback_comment,
-                placeholder="Let us know how we can improve this message...",
-                height=100
-            )
-
-            if st.button("📨 Submit Feedback"):
-                vote_label = "👍 Looks good" if st.session_state.feedback_vote == "up" else "👎 Needs improvement"
-                st.success(f"Thanks for your feedback! You voted: {vote_label}")
-                if st.session_state.feedback_comment.strip():
-                    st.info(f"Comment: _{st.session_state.feedback_comment.strip()}_")
-
-        st.markdown("### 📣 Recommended Communication Channels")
-
-        # Simulated subscriber counts
-        channel_subscribers = {
-            "Slack": 42,
-            "Email": 128,
-            "SMS": 65
-        }
-
-        raw_channels = ["Status Page", "Slack", "Email", "SMS"]
-        display_channels = [
-            f"{ch} ({channel_subscribers[ch]} subs)" if ch in channel_subscribers else ch
-            for ch in raw_channels
-        ]
-
-        display_to_raw = {
-            f"{ch} ({channel_subscribers[ch]} subs)" if ch in channel_subscribers else ch: ch
-            for ch in raw_channels
-        }
-
-        # Default selections
-        default_channels = ["Status Page", "Slack"]
-        default_display = [
-            f"{ch} ({channel_subscribers[ch]} subs)" if ch in channel_subscribers else ch
-            for ch in default_channels
-        ]
-
-        if "selected_display_channels" not in st.session_state:
-            st.session_state.selected_display_channels = default_display.copy()
-
-        selected_display = st.multiselect(
-            "Choose communication channels:",
-            options=display_channels,
-            default=st.session_state.selected_display_channels
+    # Only the open tab runs; each tab is a fragment, so its widgets rerun just that tab
+    tab1, tab2, tab3 = st.tabs(
+        ["Summary and Discussion", "Customer Communication", "RCA and Postmortems"],
+        key="detail_tab",
+        on_change="rerun",
+    )
+    if tab1.open:
+        with tab1:
+            show_summary_tab(incident_data)
+    if tab2.open:
+        with tab2:
+            show_communication_tab(incident_data)
+    if tab3.open:
+        with tab3:
+            show_postmortem_tab(incident_data)
+
+@st.fragment
+@traced("detail.tab.summary")
+def show_summary_tab(incident_data):
+    st.subheader("⚡ AI Generated Summary")
+    events = generate_mock_timeline(incident_data)
+    store = get_summary_store()
+    summary, seen = store.get(incident_data["Incident ID"])
+
+    # Only events after the last summarized one are sent to the model
+    new_events = len(events) - seen
+    label = "✨ Summarize Timeline" if summary is None else f"🔄 Update Summary ({new_events} new events)"
+    if st.button(label, key="summarize", disabled=summary is not None and new_events == 0):
+        try:
+            with st.spinner("Summarizing timeline..."):
+                client = get_llm_client(st.secrets["PERPLEXITY_API_KEY"])
+                summary, _ = summarize_incident(client, incident_data, events, store)
+            seen = len(events)
+        except LLMError as e:
+            st.error(f"Perplexity API Error: {e.status_code} - {e.text}")
+        except requests.RequestException as e:
+            st.error(f"Perplexity API Error: {e}")
+
+    if summary is None:
+        st.info(f"No summary yet for {len(events)} timeline events.")
+        return
+    st.caption(f"AI generated from {seen} of {len(events)} timeline events, please check for accuracy")
+
+    # What We Know
+    st.markdown("### What We Know")
+    for item in summary["what_we_know"]:
+        st.markdown(f"- {item}")
+
+    # What Has Been Done
+    st.markdown("### What Has Been Done")
+    for item in summary["what_has_been_done"]:
+        st.markdown(f"- {item}")
+
+    # Customer Communication
+    st.markdown("### What Has Been Communicated to the customer")
+    for item in summary["customer_communication"]:
+        st.markdown(f"- {item}")
+
+@st.fragment
+@traced("detail.tab.communication")
+def show_communication_tab(incident_data):
+    st.subheader("🪄 Draft Communication")
+
+    # Drafts are kept per incident; one pre-generated by the batch job is ready without an API call
+    incident_id = incident_data["Incident ID"]
+    drafts = st.session_state.setdefault("drafts", {})
+    sources = st.session_state.setdefault("draft_sources", {})
+    if incident_id not in drafts:
+        drafts[incident_id] = lookup_draft(incident_data, get_draft_cache()) or ""
+        sources[incident_id] = draft_source(CUSTOMER_DRAFT) if drafts[incident_id] else None
+
+    col1, col2 = st.columns(2)
+    with col1:
+        generate_clicked = st.button("✨ Generate Draft with Perplexity")
+    with col2:
+        # Bypasses the draft cache for this incident and replaces the stored draft
+        regenerate_clicked = st.button("🔄 Regenerate Draft")
+
+    # Tokens stream into this slot, then the editable text area replaces them
+    draft_area = st.empty()
+    if generate_clicked or regenerate_clicked:
+        start = time.perf_counter()
+        api_key = st.secrets["PERPLEXITY_API_KEY"]
+        generated, from_cache, first_token = generate_draft_with_perplexity(
+            incident_data, api_key, draft_area, regenerate=regenerate_clicked
         )
-        st.session_state.selected_display_channels = selected_display
-
-        selected_channels = [display_to_raw[d] for d in selected_display]
-
-        # Confirm and publish
-        if st.button("🚀 Publish to Selected Channels"):
-            st.session_state.confirm_publish = True
-
-        # Confirmation step
-        if st.session_state.get("confirm_publish") and not st.session_state.get("message_published"):
-            with st.expander("🔒 Confirm Your Action", expanded=True):
-                st.markdown("You're about to send the message to the following channels:")
-                for ch in selected_channels:
-                    label = f"{ch} ({channel_subscribers[ch]} subs)" if ch in channel_subscribers else ch
-                    st.markdown(f"- ✅ **{label}**")
-
-                col1, col2 = st.columns(2)
-                with col1:
-                    if st.button("✅ Yes, publish now"):
-                        st.session_state.message_published = True
-                        #st.success(f"Message published to: {', '.join(selected_channels)}")
-                with col2:
-                    if st.button("❌ Cancel"):
-                        st.session_state.confirm_publish = False
-                        st.info("Publish canceled.")
-
-        if st.session_state.get("message_published"):
-            st.success(f"✅ Message successfully sent to: {', '.join(selected_channels)}")
-    with tab3:
-        st.subheader("📚 RCA and Postmortem Reports")
-        st.caption("AI-generated drafts — please verify and edit before sharing.")
-
-        service = incident_data.get("Owning Service", "[SERVICE]")
-        root_cause = incident_data.get("Title", "[ROOT CAUSE]")
-        created_time = incident_data.get("Create Time", "[DATE]")
-        resolved_time = incident_data.get("Resolved Time", "[TIME]")
-
-        customer_postmortem = f"""
+        if generated:
+            drafts[incident_id] = generated
+            sources[incident_id] = draft_source(CUSTOMER_DRAFT, get_llm_client(api_key).model)
+            if from_cache:
+                st.caption("Loaded from draft cache, use 🔄 Regenerate Draft for a fresh one")
+            else:
+                st.caption(
+                    f"⏱️ First token after {first_token * 1000:.0f} ms, "
+                    f"full draft in {time.perf_counter() - start:.2f} s"
+                )
+
+    # Editable text area
+    draft_message = draft_area.text_area("📄 Draft Message", value=drafts[incident_id], height=200)
+
+    # Keep edits while another tab is open and this one is not rendered
+    drafts[incident_id] = draft_message
+    if not draft_message.strip():
+        # Whatever is typed into a cleared draft is not model output
+        sources[incident_id] = None
+
+    st.text_area("AI generated, please check for accuracy and make any necessary changes before publishing", value=drafts[incident_id], height=200)
+
+    # --- Feedback Section ---
+    st.markdown("### 🗣️ Feedback on Draft")
+
+    feedback_widget(
+        "draft_feedback",
+        incident_id,
+        lambda vote, comment: record_feedback(
+            incident_data, CUSTOMER_DRAFT, vote, comment, draft_message, sources[incident_id]
+        ),
+    )
+
+    st.markdown("### 📣 Recommended Communication Channels")
+
+    publish_widget(
+        "draft_publish",
+        get_publish_engine(),
+        draft_message,
+        incident_data["Incident ID"],
+        label="Choose communication channels:",
+        button_label="🚀 Publish to Selected Channels",
+        confirm_text="You're about to send the message to the following channels:",
+        what="Message",
+    )
+
+@st.fragment
+@traced("detail.tab.postmortem")
+def show_postmortem_tab(incident_data):
+    st.subheader("📚 RCA and Postmortem Reports")
+    st.caption("AI-generated drafts — please verify and edit before sharing.")
+
+    service = incident_data.get("Owning Service", "[SERVICE]")
+    root_cause = incident_data.get("Title", "[ROOT CAUSE]")
+    created_time = format_create_time(incident_data["Create Time"]) if "Create Time" in incident_data else "[DATE]"
+    resolved = incident_data.get("Resolved Time")
+    resolved_time = "[TIME]" if pd.isna(resolved) else format_resolved_time(resolved)
+
+    # The closest resolved incident suggests a root cause, mitigation and lessons learned;
+    # similar is None while the index is still being built in the background
+    summary, _ = get_summary_store().get(incident_data["Incident ID"])
+    similar = get_similar_incidents().search(incident_data, summary=summary)
+    suggested = similar[0][1] if similar else {}
+
+    def suggestion(field, default):
+        value = suggested.get(field)
+        return f"{value} (as in {format_incident_id(suggested['incident_id'])}, please verify)" if value else default
+
+    if similar is None:
+        st.caption("🔎 Similar past incidents: building the index…")
+    elif similar:
+        with st.expander(f"🔎 Similar past incidents ({len(similar)})"):
+            for score, match in similar:
+                st.markdown(
+                    f"- **{format_match(match)}** (score {score:.1f})  \n"
+                    f"  Root cause: {match['root_cause'] or '—'}  \n"
+                    f"  Mitigation: {match['mitigation'] or '—'}"
+                )
+
+    customer_postmortem = f"""
     On {created_time}, our {service} experienced a disruption due to {root_cause}. We mitigated the issue and restored service by {resolved_time}.
 
     We sincerely apologize for the inconvenience and are implementing additional safeguards to prevent recurrence.
         """
 
-        internal_postmortem = f"""
+    internal_postmortem = f"""
 
     - Date/Time of Incident: {created_time}  
-    - Root Cause: {root_cause}  
+    - Root Cause: {suggestion("root_cause", root_cause)}  
     - Detection Timeline: [WHO/WHEN]  
-    - Mitigation: [ACTIONS TAKEN]  
+    - Mitigation: {suggestion("mitigation", "[ACTIONS TAKEN]")}  
     - Impact Analysis: [USERS IMPACTED, DURATION]  
     - Lessons Learned:  
-        - [1]
+        - {suggestion("lessons", "[1]")}
         - [2]
     - Next Steps: 
         - [Actionable Item 1]
         - [Owner & Timeline]
         """
-        customer_draft = st.text_area("📄 Customer-Facing Report", value=customer_postmortem, height=250)
-        internal_draft = st.text_area("🔒 Internal Report", value=internal_postmortem, height=300)
-
-        # --- Communication Channel Section (only for customer-facing postmortem) ---
-        st.markdown("### 📣 Publish Customer-Facing Report")
-
-        # Simulated subscriber counts
-        channel_subscribers = {
-            "Slack": 42,
-            "Email": 128,
-            "SMS": 65
-        }
-
-        raw_channels = ["Status Page", "Slack", "Email", "SMS"]
-        display_channels = [
-            f"{ch} ({channel_subscribers[ch]} subs)" if ch in channel_subscribers else ch
-            for ch in raw_channels
-        ]
-        display_to_raw = {
-            f"{ch} ({channel_subscribers[ch]} subs)" if ch in channel_subscribers else ch: ch
-            for ch in raw_channels
-        }
-
-        default_channels = ["Status Page", "Slack"]
-        default_display = [
-            f"{ch} ({channel_subscribers[ch]} subs)" if ch in channel_subscribers else ch
-            for ch in default_channels
-        ]
-
-        if "rca_selected_display_channels" not in st.session_state:
-            st.session_state.rca_selected_display_channels = default_display.copy()
-
-        selected_display = st.multiselect(
-            "Choose where to publish the customer-facing report:",
-            options=display_channels,
-            default=st.session_state.rca_selected_display_channels
-        )
-        st.session_state.rca_selected_display_channels = selected_display
-        selected_channels = [display_to_raw[d] for d in selected_display]
-
-        # Confirm and publish
-        if st.button("🚀 Publish Customer-Facing Report"):
-            st.session_state.rca_confirm_publish = True
-
-        if st.session_state.get("rca_confirm_publish") and not st.session_state.get("rca_report_published"):
-            with st.expander("🔒 Confirm Your Action", expanded=True):
-                st.markdown("You're about to publish this customer-facing report to:")
-                for ch in selected_channels:
-                    label = f"{ch} ({channel_subscribers[ch]} subs)" if ch in channel_subscribers else ch
-                    st.markdown(f"- ✅ **{label}**")
-
-                col1, col2 = st.columns(2)
-                with col1:
-                    if st.button("✅ Yes, publish now (Postmortem)"):
-                        st.session_state.rca_report_published = True
-                        st.success(f"Report published to: {', '.join(selected_channels)}")
-                with col2:
-                    if st.button("❌ Cancel (Postmortem)"):
-                        st.session_state.rca_confirm_publish = False
-                        st.info("Publish canceled.")
-
-        if st.session_state.get("rca_report_published"):
-            st.success(f"✅ Customer-Facing Postmortem published to: {', '.join(selected_channels)}")
-
-        # --- Feedback Section ---
-        st.markdown("### 🗣️ Feedback on Drafts")
-
-        if "postmortem_feedback_vote" not in st.session_state:
-            st.session_state.postmortem_feedback_vote = None
-        if "postmortem_feedback_pending" not in st.session_state:
-            st.session_state.postmortem_feedback_pending = None
-        if "postmortem_feedback_confirmed" not in st.session_state:
-            st.session_state.postmortem_feedback_confirmed = False
-        if "postmortem_feedback_comment" not in st.session_state:
-            st.session_state.postmortem_feedback_comment = ""
-
-        if not st.session_state.postmortem_feedback_confirmed:
-            col1, col2 = st.columns(2)
-            with col1:
-                if st.button("👍 Looks good (Postmortem)"):
-                    st.session_state.postmortem_feedback_pending = "up"
-            with col2:
-                if st.button("👎 Needs improvement (Postmortem)"):
-                    st.session_state.postmortem_feedback_pending = "down"
-
-        if st.session_state.postmortem_feedback_pending and not st.session_state.postmortem_feedback_confirmed:
-            label = "👍 Looks good" if st.session_state.postmortem_feedback_pending == "up" else "👎 Needs improvement"
-            st.warning(f"Confirm your feedback: **{label}**")
-            col1, col2 = st.columns(2)
-            with col1:
-                if st.button("✅ Yes, confirm (Postmortem)"):
-                    st.session_state.postmortem_feedback_vote = st.session_state.postmortem_feedback_pending
-                    st.session_state.postmortem_feedback_confirmed = True
-                    st.session_state.postmortem_feedback_pending = None
-            with col2:
-                if st.button("❌ Cancel (Postmortem)"):
-                    st.session_state.postmortem_feedback_pending = None
-
-        if st.session_state.postmortem_feedback_confirmed:
-            st.session_state.postmortem_feedback_comment = st.text_area(
-                "Optional comment:",
-                value=st.session_state.postmortem_feedback_comment,
-                placeholder="Suggestions to improve the postmortem...",
-                height=100
-            )
-
-            if st.button("📨 Submit Postmortem Feedback"):
-                vote_label = "👍 Looks good" if st.session_state.postmortem_feedback_vote == "up" else "👎 Needs improvement"
-                st.success(f"Thanks for your feedback! You voted: {vote_label}")
-                if st.session_state.postmortem_feedback_comment.strip():
-                    st.info(f"Comment: _{st.session_state.postmortem_feedback_comment.strip()}_")
-
+    # Prefer the skeleton pre-generated by the batch job when there is one
+    skeleton = lookup_draft(incident_data, get_draft_cache(), artifact=POSTMORTEM_SKELETON)
+    internal_source = draft_source(POSTMORTEM_SKELETON) if skeleton else None
+    internal_postmortem = skeleton or internal_postmortem
+
+    # Edits are kept per incident, so they survive switching to another tab and back
+    edits = st.session_state.setdefault("report_edits", {}).setdefault(incident_data["Incident ID"], {})
+    customer_draft = st.text_area("📄 Customer-Facing Report", value=edits.get("customer", customer_postmortem), height=250)
+    internal_draft = st.text_area("🔒 Internal Report", value=edits.get("internal", internal_postmortem), height=300)
+    edits.update(customer=customer_draft, internal=internal_draft)
+
+    # --- Communication Channel Section (only for customer-facing postmortem) ---
+    st.markdown("### 📣 Publish Customer-Facing Report")
+
+    publish_widget(
+        "postmortem_publish",
+        get_publish_engine(),
+        customer_draft,
+        incident_data["Incident ID"],
+        label="Choose where to publish the customer-facing report:",
+        button_label="🚀 Publish Customer-Facing Report",
+        confirm_text="You're about to publish this customer-facing report to:",
+        what="Customer-Facing Postmortem",
+        suffix="(Postmortem)",
+    )
+
+    # --- Feedback Section ---
+    st.markdown("### 🗣️ Feedback on Drafts")
+
+    feedback_widget(
+        "postmortem_feedback",
+        incident_data["Incident ID"],
+        lambda vote, comment: record_feedback(
+            incident_data, POSTMORTEM_SKELETON, vote, comment, internal_draft, internal_source
+        ),
+        suffix="(Postmortem)",
+        submit_label="📨 Submit Postmortem Feedback",
+        placeholder="Suggestions to improve the postmortem...",
+    )
+
+@traced("detail.main")
 def main():
-    # Get incident data from session state
-    if "incident_data" not in st.session_state:
-        st.error("No incident selected. Please return to the main page.")
+    show_performance_panel()
+    get_metrics_server()
+
+    # Load the incident named in the URL (?incident=INC-1234) from the store, so deep
+    # links, reloads and multiple tabs always show the current incident
+    requested = st.query_params.get("incident")
+    incident_id = parse_incident_id(requested) if requested else None
+    incident_data = get_incident_store().get(incident_id) if incident_id is not None else None
+    if incident_data is None:
+        if requested:
+            st.error(f"Incident {requested} was not found. Please return to the main page.")
+        else:
+            st.error("No incident selected. Please return to the main page.")
         if st.button("Return to Main Page"):
             st.switch_page("home.py")
         return
     
-    incident_data = st.session_state.incident_data
     show_incident_detail(incident_data)
     
     # Add a button to return to main page
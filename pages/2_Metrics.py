@@ -0,0 +1,91 @@
+import streamlit as st
+from datetime import datetime, timedelta
+
+from core.components import show_performance_panel
+from core.data import get_incident_store, get_metrics_server, load_rollups
+from core.rollups import incident_counts, mttr_hours, open_incidents, totals
+from core.schema import SEVERITIES, STATES, SERVICES
+from core.tracing import trace, traced
+
+TIME_RANGES = {"Last 24 hours": timedelta(days=1), "Last 7 days": timedelta(days=7),
+               "Last 30 days": timedelta(days=30), "All time": None}
+GRANULARITIES = {"Hourly": "h", "Daily": "D", "Weekly": "W"}
+GROUP_BY_OPTIONS = ["None", "Severity", "State", "Owning Service"]
+
+def show_metric_tiles(created, resolved, filters, start, end):
+    # Created, resolved and MTTR over the selected range; open incidents are as of now
+    summary = totals(created, resolved, filters, start, end)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Incidents created", f"{summary['created']:,}")
+    with col2:
+        st.metric("Open now", f"{summary['open']:,}")
+    with col3:
+        mttr = summary["mttr_hours"]
+        st.metric("MTTR", f"{mttr:.1f} h" if mttr is not None else "–",
+                  help=f"Mean time from Create Time to Resolved Time over {summary['resolved']:,} resolved incidents")
+
+@traced("metrics.main")
+def main():
+    st.title("📈 Incident Metrics")
+    show_performance_panel()
+    get_metrics_server()
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        time_range = st.selectbox("Time range", list(TIME_RANGES), index=2)
+    with col2:
+        granularity = st.selectbox("Granularity", list(GRANULARITIES), index=1)
+    with col3:
+        group_by = st.selectbox("Group by", GROUP_BY_OPTIONS, index=1)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        severity_filter = st.multiselect("Filter by Severity", SEVERITIES, default=[])
+    with col2:
+        state_filter = st.multiselect("Filter by State", STATES, default=[])
+    with col3:
+        service_filter = st.multiselect("Filter by Service", SERVICES, default=[])
+    filters = {"Severity": severity_filter, "State": state_filter, "Owning Service": service_filter}
+
+    # Charts read the hourly rollups the store keeps on every write, never the incidents
+    with trace("metrics.rollups"):
+        created, resolved = load_rollups(get_incident_store())
+    if created.empty:
+        st.info("No incidents yet.")
+        return
+
+    # The range ends after the current hour, so the latest incidents are included
+    end = datetime.now().replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    window = TIME_RANGES[time_range]
+    start = end - window if window is not None else created["Bucket"].min()
+    freq = GRANULARITIES[granularity]
+    by = None if group_by == "None" else group_by
+    # Resolved incidents and the open balance are not split by State
+    trend_by = None if by == "State" else by
+
+    with trace("metrics.series"):
+        counts = incident_counts(created, freq, by, filters, start, end)
+        mttr = mttr_hours(resolved, freq, trend_by, filters, start, end)
+        opened = open_incidents(created, resolved, freq, trend_by, filters, start, end)
+
+    show_metric_tiles(created, resolved, filters, start, end)
+
+    st.subheader("Incidents created")
+    st.bar_chart(counts)
+
+    st.subheader("Mean time to resolve (hours)")
+    st.line_chart(mttr)
+    st.caption("By the period incidents were resolved in.")
+
+    st.subheader("Open incidents")
+    st.line_chart(opened)
+    st.caption("Created but not yet resolved at the end of each period.")
+    if by == "State" or state_filter:
+        st.caption("MTTR and open incidents are not split or filtered by State.")
+
+    if st.button("← Return to Incidents List"):
+        st.switch_page("home.py")
+
+if __name__ == "__main__":
+    main()
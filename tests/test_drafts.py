@@ -0,0 +1,17 @@
+from core import drafts
+from core.drafts import DraftCache
+
+
+def test_hot_hits_keep_drafts_from_eviction(monkeypatch):
+    monkeypatch.setattr(drafts, "DRAFT_MEMORY_ENTRIES", 2)
+    cache = DraftCache(":memory:", max_entries=2)
+    cache.put("a", "draft a")
+    cache.put("b", "draft b")
+
+    # "a" only ever hits the in-memory LRU, which must still count as a use
+    assert cache.get("a") == "draft a"
+    cache.put("c", "draft c")
+
+    assert cache.get("a") == "draft a"
+    assert cache._hot.get("b") is None
+    assert cache.get("b") is None
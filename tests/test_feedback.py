@@ -0,0 +1,43 @@
+import sqlite3
+
+from core.feedback import UP, FeedbackLog
+
+
+class FailingConnection:
+    # Wraps a connection and fails the first `failures` inserts
+    def __init__(self, conn, failures):
+        self._conn = conn
+        self.failures = failures
+
+    def executemany(self, sql, rows):
+        if self.failures:
+            self.failures -= 1
+            raise sqlite3.OperationalError("database is locked")
+        return self._conn.executemany(sql, rows)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self._conn.__enter__()
+
+    def __exit__(self, *exc):
+        return self._conn.__exit__(*exc)
+
+
+def test_failed_batch_is_retried_not_dropped():
+    log = FeedbackLog(":memory:", flush_interval=60)  # no timed retries: only flushes write
+    log._conn = FailingConnection(log._conn, failures=2)
+
+    log.record(1, "customer_draft", UP)
+    log.flush()
+    assert len(log) == 0
+    assert log.failed_writes == 1
+
+    log.record(2, "customer_draft", UP)
+    log.flush()
+    log.flush()
+
+    assert [event["incident_id"] for event in log.events()] == [1, 2]
+    assert log.failed_writes == 2
+    assert log.dropped == 0
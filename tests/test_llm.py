@@ -0,0 +1,138 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from benchmarks.stub_llm import start_stub_server
+from core import llm
+from core.llm import LLMClient, LLMError
+
+
+@pytest.fixture
+def server():
+    server = start_stub_server()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    # Backoff delays the client asked for, without actually waiting; only the
+    # client's view of the time module is replaced, the stub server still sleeps
+    delays = []
+    monkeypatch.setattr(llm, "time", SimpleNamespace(sleep=delays.append))
+    return delays
+
+
+@pytest.fixture
+def client(server):
+    client = LLMClient("stub-key", url=server.url, backoff_base=0.01)
+    yield client
+    client.close()
+
+
+def test_pooled_connection_is_reused(server, client):
+    replies = [client.complete("ping") for _ in range(5)]
+
+    assert replies == ["Stub reply (4 prompt chars)."] * 5
+    assert server.requests == 5
+    assert server.connections == 1
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_retryable_status_is_retried(server, client, sleeps, status):
+    server.fail_first, server.fail_status = 2, status
+
+    assert client.complete("ping") == "Stub reply (4 prompt chars)."
+    assert server.requests == 3
+    assert len(sleeps) == 2
+
+
+def test_retry_after_is_honoured(server, client, sleeps):
+    server.fail_first, server.fail_status, server.retry_after = 2, 429, "1.5"
+
+    client.complete("ping")
+
+    assert sleeps == [1.5, 1.5]
+
+
+def test_retries_give_up_after_max_retries(server, sleeps):
+    server.fail_first = 10
+    client = LLMClient("stub-key", url=server.url, max_retries=2)
+
+    with pytest.raises(LLMError) as error:
+        client.complete("ping")
+
+    assert error.value.status_code == 503
+    assert server.requests == 3
+    client.close()
+
+
+def test_client_error_is_not_retried(server, client, sleeps):
+    server.fail_first, server.fail_status = 1, 400
+
+    with pytest.raises(LLMError) as error:
+        client.complete("ping")
+
+    assert error.value.status_code == 400
+    assert server.requests == 1
+    assert sleeps == []
+
+
+def test_stream_yields_chunks_in_order(server, client):
+    server.reply = "one two three four"
+
+    assert list(client.stream("ping")) == ["one ", "two ", "three ", "four "]
+
+
+def test_read_timeout_is_retried_then_raised(sleeps):
+    server = start_stub_server(latency=0.5)
+    client = LLMClient("stub-key", url=server.url, read_timeout=0.1, max_retries=2)
+    try:
+        with pytest.raises(requests.Timeout):
+            client.complete("ping")
+        assert len(sleeps) == 2
+        time.sleep(0.6)  # the stub counts a request once its latency has passed
+        assert server.requests == 3
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+
+def test_connection_error_is_retried_then_raised(sleeps):
+    server = start_stub_server()
+    url = server.url
+    server.shutdown()
+    server.server_close()
+    client = LLMClient("stub-key", url=url, max_retries=2)
+
+    with pytest.raises(requests.ConnectionError):
+        client.complete("ping")
+
+    assert len(sleeps) == 2
+    client.close()
+
+
+def test_acomplete_runs_calls_concurrently():
+    server = start_stub_server(latency=0.2)
+    client = LLMClient("stub-key", url=server.url)
+
+    async def fan_out():
+        return await asyncio.gather(*(client.acomplete("ping") for _ in range(5)))
+
+    try:
+        start = time.perf_counter()
+        replies = asyncio.run(fan_out())
+        elapsed = time.perf_counter() - start
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+    assert replies == ["Stub reply (4 prompt chars)."] * 5
+    assert server.requests == 5
+    assert elapsed < 5 * 0.2 / 2
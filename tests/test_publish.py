@@ -0,0 +1,40 @@
+from core.publish import DELIVERED, FAILED, DeliveryLog, PublishEngine, StubAdapter, stub_directory
+
+
+class FlakyAdapter(StubAdapter):
+    # Fails the recipients named in `failing`
+    name = "Email"
+    batch_size = 3
+    rate = float("inf")
+
+    def __init__(self, failing):
+        super().__init__()
+        self.failing = failing
+
+    def send_batch(self, message, recipients):
+        return {recipient: "mailbox full" for recipient in recipients if recipient in self.failing}
+
+
+def test_report_lists_failed_recipients(tmp_path):
+    path = str(tmp_path / "deliveries.sqlite3")
+    engine = PublishEngine({"Email": FlakyAdapter({"email-subscriber-4"})}, stub_directory({"Email": 7}),
+                           DeliveryLog(path))
+
+    report = engine.publish("hello", ["Email"], incident_id=1234)
+
+    assert report.summary() == {"Email": {DELIVERED: 6, FAILED: 1}}
+    assert report.failures() == {"Email": [("email-subscriber-4", "mailbox full")]}
+
+
+def test_delivery_log_survives_restart(tmp_path):
+    path = str(tmp_path / "deliveries.sqlite3")
+    engine = PublishEngine({"Email": FlakyAdapter({"email-subscriber-0"})}, stub_directory({"Email": 2}),
+                           DeliveryLog(path))
+    engine.publish("hello", ["Email"], incident_id=1234)
+
+    log = DeliveryLog(path)
+
+    assert len(log) == 2
+    failed = log.records(1234, status=FAILED)
+    assert [(r.recipient, r.error) for r in failed] == [("email-subscriber-0", "mailbox full")]
+    assert log.records(999) == []
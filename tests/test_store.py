@@ -0,0 +1,32 @@
+from core.mock_data import generate_incidents
+from core.store import MemoryIncidentStore
+
+
+def make_store():
+    store = MemoryIncidentStore()
+    store.add_incidents(generate_incidents(200, seed=1))
+    return store
+
+
+def test_update_moves_rows_between_filter_values():
+    store = make_store()
+    incident_id = int(store.incident_ids()[0])
+    store.update_incident(incident_id, {"State": "Closed"})
+    closed = store.count({"State": ["Closed"]})
+    store.update_incident(incident_id, {"State": "Escalated"})
+
+    assert store.count({"State": ["Closed"]}) == closed - 1
+    page, _ = store.query_page({"State": ["Escalated"]}, limit=10)
+    assert page["Incident ID"].tolist() == [incident_id]
+
+
+def test_update_leaves_earlier_reads_unchanged():
+    store = make_store()
+    snapshot = store._snapshot
+    rows, _ = store.query_page(limit=5)
+    incident_id = int(rows["Incident ID"].iloc[0])
+    store.update_incident(incident_id, {"Owner": "someone@example.com", "State": "Closed"})
+
+    assert snapshot.df["Owner"].iloc[0] != "someone@example.com"
+    assert store._lookup(incident_id)["Owner"] == "someone@example.com"
+    assert store._snapshot.ids is snapshot.ids
@@ -0,0 +1,25 @@
+from core import tracing
+from core.tracing import Tracer
+
+
+def test_prometheus_text_skips_missing_memory_gauges(monkeypatch):
+    monkeypatch.setattr(tracing, "memory_rss", lambda: None)
+    monkeypatch.setattr(tracing, "memory_peak_rss", lambda: None)
+    tracer = Tracer()
+    tracer.observe("stage", 0.002)
+
+    text = tracer.prometheus_text()
+
+    assert "None" not in text
+    assert "portal_memory" not in text
+    assert 'portal_stage_duration_seconds_count{stage="stage"} 1' in text
+
+
+def test_prometheus_text_reports_memory_gauges(monkeypatch):
+    monkeypatch.setattr(tracing, "memory_rss", lambda: 1024)
+    monkeypatch.setattr(tracing, "memory_peak_rss", lambda: 2048)
+
+    text = Tracer().prometheus_text()
+
+    assert "portal_memory_rss_bytes 1024\n" in text
+    assert "portal_memory_peak_rss_bytes 2048\n" in text